@@ -0,0 +1,121 @@
+import argparse
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import OwnerAnalyticsSummary, Property, PropertyTenant, User
+
+
+def compute_owner_analytics(db: Session, owner_id: str) -> OwnerAnalyticsSummary:
+    grouped_rows = db.execute(
+        select(Property.location, func.count(Property.id)).where(Property.owner_id == owner_id).group_by(Property.location)
+    ).all()
+    total_tenants = db.scalar(
+        select(func.count(PropertyTenant.id))
+        .join(Property, Property.id == PropertyTenant.property_id)
+        .where(Property.owner_id == owner_id)
+        .where(PropertyTenant.status == "active")
+    )
+    grouped = {location: count for location, count in grouped_rows}
+    return OwnerAnalyticsSummary(
+        owner_id=owner_id,
+        total_properties=sum(grouped.values()),
+        total_tenants=total_tenants or 0,
+        properties_by_location=grouped,
+    )
+
+
+# Returns the owner's summary row locked for update, and whether it was just created from the source rows.
+def _locked_summary(db: Session, owner_id: str) -> tuple[OwnerAnalyticsSummary, bool]:
+    summary = db.scalar(select(OwnerAnalyticsSummary).where(OwnerAnalyticsSummary.owner_id == owner_id).with_for_update())
+    if summary is not None:
+        return summary, False
+    # Owners that predate the summary table are materialized on their first write, from rows that already
+    # include the change being recorded. When a concurrent first write inserts the row first, the savepoint
+    # rolls back and this write locks that row and applies its change like any other.
+    db.flush()
+    summary = compute_owner_analytics(db, owner_id)
+    try:
+        with db.begin_nested():
+            db.add(summary)
+        return summary, True
+    except IntegrityError:
+        return _locked_summary(db, owner_id)
+
+
+def record_owner_created(db: Session, owner_id: str) -> None:
+    db.add(OwnerAnalyticsSummary(owner_id=owner_id, total_properties=0, total_tenants=0, properties_by_location={}))
+
+
+# The record_* helpers run inside the caller's transaction, so the summary commits (or rolls back)
+# together with the property or tenant row it describes.
+def record_property_created(db: Session, owner_id: str, location: str) -> None:
+    record_properties_created(db, owner_id, {location: 1})
+
+
+def record_properties_created(db: Session, owner_id: str, counts_by_location: dict[str, int]) -> None:
+    summary, created = _locked_summary(db, owner_id)
+    if created:
+        return
+    grouped = dict(summary.properties_by_location)
+    for location, count in counts_by_location.items():
+        grouped[location] = grouped.get(location, 0) + count
+    summary.properties_by_location = grouped
+    summary.total_properties += sum(counts_by_location.values())
+
+
+def record_tenants_activated(db: Session, owner_id: str, count: int = 1) -> None:
+    exists = db.scalar(select(OwnerAnalyticsSummary.owner_id).where(OwnerAnalyticsSummary.owner_id == owner_id))
+    if exists is None and _locked_summary(db, owner_id)[1]:
+        return
+    db.execute(
+        update(OwnerAnalyticsSummary)
+        .where(OwnerAnalyticsSummary.owner_id == owner_id)
+        .values(total_tenants=OwnerAnalyticsSummary.total_tenants + count, updated_at=datetime.utcnow())
+    )
+
+
+def rebuild_owner_analytics(db: Session, owner_ids: list[str] | None = None, check_only: bool = False) -> list[str]:
+    if owner_ids is None:
+        owner_ids = list(db.scalars(select(User.id).where(User.role == "owner")).all())
+
+    drifted: list[str] = []
+    for owner_id in owner_ids:
+        expected = compute_owner_analytics(db, owner_id)
+        current = db.get(OwnerAnalyticsSummary, owner_id)
+        if (
+            current is not None
+            and current.total_properties == expected.total_properties
+            and current.total_tenants == expected.total_tenants
+            and current.properties_by_location == expected.properties_by_location
+        ):
+            continue
+        drifted.append(owner_id)
+        if check_only:
+            continue
+        if current is None:
+            db.add(expected)
+        else:
+            current.total_properties = expected.total_properties
+            current.total_tenants = expected.total_tenants
+            current.properties_by_location = expected.properties_by_location
+    if not check_only:
+        db.commit()
+    return drifted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute owner analytics summaries from the source tables")
+    parser.add_argument("--owner-id", action="append", dest="owner_ids")
+    parser.add_argument("--check", action="store_true", help="only report owners whose summary has drifted")
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        owners = rebuild_owner_analytics(session, args.owner_ids, check_only=args.check)
+    verb = "drifted" if args.check else "rebuilt"
+    print(f"{len(owners)} owner summaries {verb}")
+    for owner in owners:
+        print(owner)
@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from .cache import REDIS_URL, CacheBackend, MemoryCacheBackend, RedisCacheBackend
+
+# Without AUTH_TOKEN_SECRET every process signs with its own random key, so tokens stop verifying after a
+# restart and are not shared between workers. Set it in any multi-worker deployment.
+AUTH_TOKEN_SECRET = os.getenv("AUTH_TOKEN_SECRET") or secrets.token_urlsafe(32)
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", str(24 * 3600)))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# Bound of the in-memory revocation list; only used without REDIS_URL.
+AUTH_REVOCATION_MAX_ENTRIES = int(os.getenv("AUTH_REVOCATION_MAX_ENTRIES", "100000"))
+
+_HEADER = base64.urlsafe_b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode()).rstrip(b"=")
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+# HS256 JWTs: verification is one HMAC over the token, so no route needs a database read to know its caller.
+# Verified tokens are kept in a small LRU so repeat requests skip even the HMAC and JSON decode; expiry and
+# revocation are still checked on every hit.
+class TokenService:
+    def __init__(
+        self,
+        secret: str = AUTH_TOKEN_SECRET,
+        ttl: int = AUTH_TOKEN_TTL_SECONDS,
+        cache_size: int = AUTH_TOKEN_CACHE_SIZE,
+        revocations: CacheBackend | None = None,
+    ) -> None:
+        self.key = secret.encode()
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._verified: OrderedDict[str, dict] = OrderedDict()
+        # Revoked token ids, each kept until the token would have expired anyway. With REDIS_URL set every worker
+        # shares the list; the in-memory default only covers the process that handled the logout.
+        self.revocations = revocations if revocations is not None else MemoryCacheBackend(AUTH_REVOCATION_MAX_ENTRIES)
+        self._lock = threading.Lock()
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return _b64encode(hmac.new(self.key, signing_input, hashlib.sha256).digest())
+
+    def issue(self, user_id: str, role: str) -> str:
+        now = int(time.time())
+        claims = {"sub": user_id, "role": role, "iat": now, "exp": now + self.ttl, "jti": uuid4().hex}
+        signing_input = _HEADER + b"." + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return (signing_input + b"." + self._sign(signing_input)).decode()
+
+    def verify(self, token: str) -> dict:
+        now = time.time()
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is not None:
+                self._verified.move_to_end(token)
+
+        if claims is None:
+            claims = self._decode(token)
+            with self._lock:
+                self._verified[token] = claims
+                while len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+
+        if claims["exp"] <= now:
+            raise InvalidToken("Token expired")
+        if self.revocations.get(claims["jti"]) is True:
+            raise InvalidToken("Token revoked")
+        return claims
+
+    def _decode(self, token: str) -> dict:
+        parts = token.encode().split(b".")
+        if len(parts) != 3 or parts[0] != _HEADER:
+            raise InvalidToken("Malformed token")
+        if not hmac.compare_digest(self._sign(parts[0] + b"." + parts[1]), parts[2]):
+            raise InvalidToken("Bad token signature")
+        try:
+            claims = json.loads(_b64decode(parts[1]))
+        except ValueError as exc:
+            raise InvalidToken("Malformed token") from exc
+        if not isinstance(claims, dict) or not {"sub", "role", "exp", "jti"} <= claims.keys():
+            raise InvalidToken("Malformed token")
+        return claims
+
+    def revoke(self, claims: dict) -> None:
+        ttl = claims["exp"] - time.time()
+        if ttl > 0:
+            self.revocations.set(claims["jti"], True, ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verified.clear()
+        self.revocations.clear()
+
+
+def _revocation_backend() -> CacheBackend:
+    if REDIS_URL:
+        import redis
+
+        return RedisCacheBackend(redis.Redis.from_url(REDIS_URL), prefix="rentory:revoked:")
+    return MemoryCacheBackend(AUTH_REVOCATION_MAX_ENTRIES)
+
+
+token_service = TokenService(revocations=_revocation_backend())
+_bearer = HTTPBearer(auto_error=False)
+
+
+def optional_claims(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> dict | None:
+    if credentials is None:
+        return None
+    try:
+        return token_service.verify(credentials.credentials)
+    except InvalidToken as exc:
+        raise HTTPException(status_code=401, detail=str(exc), headers={"WWW-Authenticate": "Bearer"}) from exc
+
+
+# For WebSocket handshakes, where the HTTPBearer dependency does not apply and browsers cannot set headers.
+def websocket_claims(authorization: str | None, access_token: str | None) -> dict:
+    scheme, _, token = (authorization or "").partition(" ")
+    token = token if scheme.lower() == "bearer" else access_token
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        return token_service.verify(token)
+    except InvalidToken as exc:
+        raise HTTPException(status_code=401, detail=str(exc)) from exc
+
+
+def require_claims(claims: dict | None = Depends(optional_claims)) -> dict:
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+
+def authorize_user(claims: dict | None, user_id: str) -> None:
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    if claims["sub"] != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed for this user")
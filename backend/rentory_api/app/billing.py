@@ -0,0 +1,414 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import NamedTuple
+from uuid import uuid4
+
+from sqlalchemy import DateTime, Select, Uuid, and_, bindparam, case, func, insert, literal, or_, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.functions import FunctionElement
+
+from .database import SessionLocal
+from .models import Bill, BillingRun, LedgerAccount, LedgerEntry, LedgerSnapshot, Property, PropertyTenant, User
+
+LEDGER_SNAPSHOT_INTERVAL = int(os.getenv("LEDGER_SNAPSHOT_INTERVAL", "50"))
+BILLING_OWNER_CHUNK = int(os.getenv("BILLING_OWNER_CHUNK", "200"))
+BILLING_CHECK_SECONDS = float(os.getenv("BILLING_CHECK_SECONDS", "3600"))
+# Set to 0 on all but one process of a multi-worker deployment; the run lock below keeps them exclusive either way.
+BILLING_SCHEDULER_ENABLED = os.getenv("BILLING_SCHEDULER_ENABLED", "1") == "1"
+# First key of the PostgreSQL advisory lock held for a billing run; the second is the period as YYYYMM.
+BILLING_LOCK_NAMESPACE = 0x62696C6C
+
+ENTRY_SIGNS = {"charge": 1, "payment": -1}
+
+logger = logging.getLogger(__name__)
+
+
+class Balance(NamedTuple):
+    balance: float
+    charged_total: float
+    paid_total: float
+    seq: int
+
+
+def _next_seq(db: Session, property_id: str, tenant_id: str) -> int:
+    # The account row is the per-(property, tenant) sequence; the UPDATE holds its row lock until commit,
+    # so entries of one account are numbered in commit order and a snapshot never misses a late entry.
+    seq = db.scalar(
+        update(LedgerAccount)
+        .where(LedgerAccount.property_id == property_id, LedgerAccount.tenant_id == tenant_id)
+        .values(last_seq=LedgerAccount.last_seq + 1)
+        .returning(LedgerAccount.last_seq)
+        .execution_options(synchronize_session=False)
+    )
+    if seq is not None:
+        return seq
+    try:
+        with db.begin_nested():
+            db.add(LedgerAccount(property_id=property_id, tenant_id=tenant_id, last_seq=1))
+        return 1
+    except IntegrityError:
+        return _next_seq(db, property_id, tenant_id)
+
+
+def post_entry(
+    db: Session,
+    property_id: str,
+    tenant_id: str,
+    entry_type: str,
+    bill_type: str,
+    amount: float,
+    reference_id: str | None = None,
+) -> LedgerEntry:
+    seq = _next_seq(db, property_id, tenant_id)
+    entry = LedgerEntry(
+        id=str(uuid4()),
+        property_id=property_id,
+        tenant_id=tenant_id,
+        seq=seq,
+        entry_type=entry_type,
+        bill_type=bill_type,
+        amount=ENTRY_SIGNS[entry_type] * amount,
+        reference_id=reference_id,
+    )
+    db.add(entry)
+    # Every LEDGER_SNAPSHOT_INTERVAL entries the running totals are frozen, so balance reads never scan more
+    # than one interval of history no matter how many years an account has.
+    if seq % LEDGER_SNAPSHOT_INTERVAL == 0:
+        db.flush()
+        _write_snapshot(db, property_id, tenant_id)
+    return entry
+
+
+def _write_snapshot(db: Session, property_id: str, tenant_id: str) -> None:
+    balance = account_balance(db, property_id, tenant_id)
+    db.add(
+        LedgerSnapshot(
+            property_id=property_id,
+            tenant_id=tenant_id,
+            seq=balance.seq,
+            balance=balance.balance,
+            charged_total=balance.charged_total,
+            paid_total=balance.paid_total,
+        )
+    )
+
+
+def _balance_statement(bounded: bool) -> Select:
+    account = (bindparam("property_id"), bindparam("tenant_id"))
+    snapshot_query = select(
+        LedgerSnapshot.seq, LedgerSnapshot.balance, LedgerSnapshot.charged_total, LedgerSnapshot.paid_total
+    ).where(LedgerSnapshot.property_id == account[0], LedgerSnapshot.tenant_id == account[1])
+    tail_query = select(
+        func.coalesce(func.sum(case((LedgerEntry.amount > 0, LedgerEntry.amount), else_=0)), 0),
+        func.coalesce(func.sum(case((LedgerEntry.amount < 0, -LedgerEntry.amount), else_=0)), 0),
+        func.max(LedgerEntry.seq),
+    ).where(LedgerEntry.property_id == account[0], LedgerEntry.tenant_id == account[1])
+    if bounded:
+        snapshot_query = snapshot_query.where(LedgerSnapshot.seq <= bindparam("through_seq"))
+        tail_query = tail_query.where(LedgerEntry.seq <= bindparam("through_seq"))
+    snapshot = snapshot_query.order_by(LedgerSnapshot.seq.desc()).limit(1).subquery()
+    tail = tail_query.where(LedgerEntry.seq > func.coalesce(select(snapshot.c.seq).scalar_subquery(), 0)).subquery()
+    return select(snapshot.c.seq, snapshot.c.balance, snapshot.c.charged_total, snapshot.c.paid_total, *tail.c).select_from(
+        tail
+    ).outerjoin(snapshot, true())
+
+
+# One round trip: the newest snapshot at or before through_seq, plus the entries after it. Built once because
+# constructing this statement costs more than running it.
+_BALANCE = _balance_statement(bounded=False)
+_BALANCE_THROUGH = _balance_statement(bounded=True)
+
+
+def account_balance(db: Session, property_id: str, tenant_id: str, through_seq: int | None = None) -> Balance:
+    params = {"property_id": property_id, "tenant_id": tenant_id}
+    if through_seq is None:
+        row = db.execute(_BALANCE, params).one()
+    else:
+        row = db.execute(_BALANCE_THROUGH, {**params, "through_seq": through_seq}).one()
+    snapshot_seq, snapshot_balance, snapshot_charged, snapshot_paid, charged, paid, last_seq = row
+    return Balance(
+        balance=(snapshot_balance or 0.0) + charged - paid,
+        charged_total=(snapshot_charged or 0.0) + charged,
+        paid_total=(snapshot_paid or 0.0) + paid,
+        seq=last_seq if last_seq is not None else snapshot_seq or 0,
+    )
+
+
+def account_statement(
+    db: Session, property_id: str, tenant_id: str, limit: int, before_seq: int | None = None
+) -> tuple[list[tuple[LedgerEntry, float]], bool]:
+    query = select(LedgerEntry).where(LedgerEntry.property_id == property_id, LedgerEntry.tenant_id == tenant_id)
+    if before_seq is not None:
+        query = query.where(LedgerEntry.seq < before_seq)
+    entries = list(db.scalars(query.order_by(LedgerEntry.seq.desc()).limit(limit + 1)).all())
+    if not entries:
+        return [], False
+
+    # One snapshot-plus-tail read gives the balance after the newest entry on the page; older rows on the
+    # page are derived by walking back through their amounts.
+    running = account_balance(db, property_id, tenant_id, through_seq=entries[0].seq).balance
+    lines = []
+    for entry in entries[:limit]:
+        lines.append((entry, running))
+        running -= entry.amount
+    return lines, len(entries) > limit
+
+
+class new_uuid(FunctionElement):
+    type = Uuid(as_uuid=False)
+    inherit_cache = True
+
+
+@compiles(new_uuid)
+def _new_uuid_default(element, compiler, **kw) -> str:
+    return "gen_random_uuid()"
+
+
+@compiles(new_uuid, "sqlite")
+def _new_uuid_sqlite(element, compiler, **kw) -> str:
+    # Same 32-hex-digit form the Uuid type stores on SQLite.
+    return "lower(hex(randomblob(16)))"
+
+
+def current_period(now: datetime | None = None) -> str:
+    return (now or datetime.utcnow()).strftime("%Y-%m")
+
+
+def _generate_owner_chunk(db: Session, period: str, owner_ids: list[str], now: datetime) -> int:
+    # Rent bills for every active tenancy of these owners, skipping accounts already billed for the period.
+    existing_bill = (
+        select(Bill.id)
+        .where(
+            Bill.property_id == PropertyTenant.property_id,
+            Bill.tenant_id == PropertyTenant.tenant_id,
+            Bill.bill_type == "rent",
+            Bill.period == period,
+        )
+        .exists()
+    )
+    bills = db.execute(
+        insert(Bill).from_select(
+            ["id", "property_id", "tenant_id", "bill_type", "amount", "status", "period", "created_at"],
+            select(
+                new_uuid(),
+                PropertyTenant.property_id,
+                PropertyTenant.tenant_id,
+                literal("rent"),
+                Property.rent,
+                literal("pending"),
+                literal(period),
+                literal(now, DateTime),
+            )
+            .join(Property, Property.id == PropertyTenant.property_id)
+            .where(Property.owner_id.in_(owner_ids), PropertyTenant.status == "active", ~existing_bill)
+            .group_by(PropertyTenant.property_id, PropertyTenant.tenant_id, Property.rent),
+        )
+    ).rowcount
+
+    # Post this period's unposted bills as ledger charges. Each account gets at most one new bill here, so
+    # bumping every affected account's sequence once and joining back to it numbers the entries set-based.
+    unposted = (
+        select(Bill.property_id, Bill.tenant_id, Bill.id, Bill.bill_type, Bill.amount)
+        .join(Property, Property.id == Bill.property_id)
+        .where(Property.owner_id.in_(owner_ids), Bill.period == period)
+        .where(~select(LedgerEntry.id).where(LedgerEntry.reference_id == Bill.id).exists())
+        .subquery()
+    )
+    db.execute(
+        insert(LedgerAccount).from_select(
+            ["property_id", "tenant_id", "last_seq"],
+            select(unposted.c.property_id, unposted.c.tenant_id, literal(0))
+            .where(
+                ~select(LedgerAccount.property_id)
+                .where(LedgerAccount.property_id == unposted.c.property_id, LedgerAccount.tenant_id == unposted.c.tenant_id)
+                .exists()
+            )
+            .distinct(),
+        )
+    )
+    db.execute(
+        update(LedgerAccount)
+        .where(
+            select(unposted.c.id)
+            .where(unposted.c.property_id == LedgerAccount.property_id, unposted.c.tenant_id == LedgerAccount.tenant_id)
+            .exists()
+        )
+        .values(last_seq=LedgerAccount.last_seq + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        insert(LedgerEntry).from_select(
+            ["id", "property_id", "tenant_id", "seq", "entry_type", "bill_type", "amount", "reference_id", "period", "created_at"],
+            select(
+                new_uuid(),
+                unposted.c.property_id,
+                unposted.c.tenant_id,
+                LedgerAccount.last_seq,
+                literal("charge"),
+                unposted.c.bill_type,
+                unposted.c.amount,
+                unposted.c.id,
+                literal(period),
+                literal(now, DateTime),
+            ).join(
+                LedgerAccount,
+                (LedgerAccount.property_id == unposted.c.property_id) & (LedgerAccount.tenant_id == unposted.c.tenant_id),
+            ),
+        )
+    )
+
+    # The few accounts whose period charge lands on a snapshot boundary get their snapshot the usual way, unless
+    # a previous attempt at this chunk already wrote it.
+    due = db.execute(
+        select(LedgerEntry.property_id, LedgerEntry.tenant_id)
+        .join(Property, Property.id == LedgerEntry.property_id)
+        .where(Property.owner_id.in_(owner_ids), LedgerEntry.period == period, LedgerEntry.entry_type == "charge")
+        .where(LedgerEntry.seq % LEDGER_SNAPSHOT_INTERVAL == 0)
+        .where(
+            ~select(LedgerSnapshot.seq)
+            .where(
+                LedgerSnapshot.property_id == LedgerEntry.property_id,
+                LedgerSnapshot.tenant_id == LedgerEntry.tenant_id,
+                LedgerSnapshot.seq == LedgerEntry.seq,
+            )
+            .exists()
+        )
+    ).all()
+    for property_id, tenant_id in due:
+        _write_snapshot(db, property_id, tenant_id)
+    return bills
+
+
+# BillingRun makes a run resumable but not exclusive: on PostgreSQL a session-level advisory lock, held on its own
+# connection for the whole run, keeps other workers from billing the same chunks concurrently.
+@contextmanager
+def _exclusive_run(bind: Engine, period: str) -> Iterator[bool]:
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+    key = int(period.replace("-", ""))
+    with bind.connect() as connection:
+        acquired = connection.scalar(select(func.pg_try_advisory_lock(BILLING_LOCK_NAMESPACE, key)))
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.scalar(select(func.pg_advisory_unlock(BILLING_LOCK_NAMESPACE, key)))
+
+
+def generate_period_bills(
+    period: str, session_factory: sessionmaker = SessionLocal, owner_chunk: int = BILLING_OWNER_CHUNK
+) -> dict:
+    with session_factory() as db:
+        with _exclusive_run(db.get_bind(), period) as acquired:
+            if not acquired:
+                logger.info("Billing run %s is already running in another process", period)
+                return {"period": period, "status": "locked", "bills": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+            return _generate_period_bills(db, period, owner_chunk)
+
+
+def _generate_period_bills(db: Session, period: str, owner_chunk: int) -> dict:
+    started = time.perf_counter()
+    generated = 0
+    run = db.get(BillingRun, period)
+    if run is None:
+        run = BillingRun(period=period, status="running")
+        db.add(run)
+        db.commit()
+    elif run.status == "done":
+        return {"period": period, "status": "done", "bills": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+
+    # Owners are paged in creation order, so owners who sign up while the run is in progress sort after the
+    # cursor and are billed by a later chunk of the same run.
+    while True:
+        query = select(User.id, User.created_at).where(User.role == "owner").order_by(User.created_at, User.id).limit(owner_chunk)
+        if run.last_owner_created_at is not None and run.last_owner_id is not None:
+            query = query.where(
+                or_(
+                    User.created_at > run.last_owner_created_at,
+                    and_(User.created_at == run.last_owner_created_at, User.id > run.last_owner_id),
+                )
+            )
+        owners = db.execute(query).all()
+        if not owners:
+            break
+        owner_ids = [owner_id for owner_id, _ in owners]
+        now = datetime.utcnow()
+        count = _generate_owner_chunk(db, period, owner_ids, now)
+        # The chunk's bills, ledger entries and the progress marker commit together; after a crash the run
+        # resumes from the last committed owner, and re-running a chunk inserts nothing twice.
+        run.last_owner_id, run.last_owner_created_at = owners[-1]
+        run.bill_count += count
+        db.commit()
+        generated += count
+
+    run.status = "done"
+    run.finished_at = datetime.utcnow()
+    db.commit()
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "period": period,
+        "status": "done",
+        "bills": generated,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(generated / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info("Billing run %s generated %s bills (%.1f rows/sec)", period, generated, result["rows_per_sec"])
+    return result
+
+
+# Checks every BILLING_CHECK_SECONDS whether the current period has been billed and runs it if not.
+class BillingScheduler:
+    def __init__(self, interval: float = BILLING_CHECK_SECONDS, session_factory: sessionmaker = SessionLocal) -> None:
+        self.interval = interval
+        self.session_factory = session_factory
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def run_pending(self) -> dict | None:
+        period = current_period()
+        with self.session_factory() as db:
+            run = db.get(BillingRun, period)
+            if run is not None and run.status == "done":
+                return None
+        return generate_period_bills(period, self.session_factory)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Billing run failed; it resumes on the next check")
+            self._stopping.wait(self.interval)
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="billing-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+
+billing_scheduler = BillingScheduler()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate rent bills for a billing period")
+    parser.add_argument("--period", default=current_period(), help="YYYY-MM, defaults to the current month")
+    args = parser.parse_args()
+    print(json.dumps(generate_period_bills(args.period)))
@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+import os
+from collections import Counter
+from collections.abc import Iterator
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from .analytics import record_properties_created
+from .database import SessionLocal
+from .image_store import InvalidImage, is_data_uri, store_data_uri
+from .models import ChatGroup, ChatGroupMember, Property
+from .revisions import OWNER_SCOPE, bump_revision
+from .schemas import PropertyCreateRequest
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+MAX_IMPORT_BYTES = int(os.getenv("MAX_IMPORT_BYTES", str(50 * 1024 * 1024)))
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+class InvalidImportFile(ValueError):
+    pass
+
+
+def import_format(content_type: str) -> str:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return "csv"
+    if media_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    raise InvalidImportFile("Send text/csv or application/x-ndjson")
+
+
+def iter_rows(text: str, file_format: str) -> Iterator[tuple[int, dict | None]]:
+    if file_format == "csv":
+        # Blank CSV cells mean "not provided", so optional fields fall back to their schema defaults.
+        for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+
+    number = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None
+            continue
+        yield number, row if isinstance(row, dict) else None
+
+
+def iter_chunks(rows: Iterator[tuple[int, dict | None]], size: int = BULK_IMPORT_CHUNK_SIZE) -> Iterator[list[tuple[int, dict | None]]]:
+    chunk: list[tuple[int, dict | None]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate(number: int, raw: dict | None) -> tuple[PropertyCreateRequest | None, dict | None]:
+    if raw is None:
+        return None, {"row": number, "status": "error", "errors": [{"loc": [], "msg": "Row is not a JSON object"}]}
+    try:
+        payload = PropertyCreateRequest.model_validate(raw)
+        if is_data_uri(payload.image_url):
+            payload.image_url = store_data_uri(payload.image_url)
+    except ValidationError as exc:
+        errors = [{"loc": list(error["loc"]), "msg": error["msg"]} for error in exc.errors()]
+        return None, {"row": number, "status": "error", "errors": errors}
+    except InvalidImage as exc:
+        return None, {"row": number, "status": "error", "errors": [{"loc": ["image_url"], "msg": str(exc)}]}
+    return payload, None
+
+
+def import_chunk(owner_id: str, chunk: list[tuple[int, dict | None]]) -> list[dict]:
+    results: list[dict] = []
+    property_rows: list[dict] = []
+    group_rows: list[dict] = []
+    member_rows: list[dict] = []
+    created: list[dict] = []
+    locations: Counter[str] = Counter()
+
+    for number, raw in chunk:
+        payload, error = _validate(number, raw)
+        if error is not None:
+            results.append(error)
+            continue
+        property_id, group_id, qr_code = str(uuid4()), str(uuid4()), f"QR-{uuid4().hex[:10]}"
+        property_rows.append(
+            {
+                "id": property_id,
+                "owner_id": owner_id,
+                "location": payload.location,
+                "name": payload.name,
+                "unit_type": payload.unit_type,
+                "description": payload.description,
+                "image_url": payload.image_url,
+                "qr_code": qr_code,
+                "capacity": payload.capacity,
+                "occupied_count": 0,
+                "rent": payload.rent,
+                "current_bill_amount": payload.rent,
+                "water_bill_status": "unpaid",
+            }
+        )
+        group_rows.append({"id": group_id, "property_id": property_id, "group_name": payload.name})
+        member_rows.append({"id": str(uuid4()), "group_id": group_id, "user_id": owner_id, "role": "owner"})
+        locations[payload.location] += 1
+        created.append({"row": number, "status": "created", "property_id": property_id, "qr_code": qr_code})
+
+    if not property_rows:
+        return results
+
+    # One executemany per table and one transaction per chunk, instead of a round trip per row.
+    with SessionLocal() as db:
+        try:
+            db.execute(insert(Property), property_rows)
+            db.execute(insert(ChatGroup), group_rows)
+            db.execute(insert(ChatGroupMember), member_rows)
+            record_properties_created(db, owner_id, locations)
+            bump_revision(db, OWNER_SCOPE, owner_id)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            failed = [{"loc": [], "msg": "Chunk could not be written; retry these rows"}]
+            created = [{"row": row["row"], "status": "error", "errors": failed} for row in created]
+
+    return sorted(results + created, key=lambda result: result["row"])
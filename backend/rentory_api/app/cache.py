@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from fastapi.encoders import jsonable_encoder
+
+from .database import run_blocking
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_GENERATION_TTL_SECONDS = float(os.getenv("CACHE_GENERATION_TTL_SECONDS", "86400"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+_MISSING = object()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Any: ...
+
+    def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    def add(self, key: str, value: Any, ttl: float) -> bool: ...
+
+    def delete(self, *keys: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Works with any client exposing the redis-py get/set/delete API (Redis, Valkey, KeyDB or a local stand-in),
+# so every worker shares one cache and sees the same invalidations. Each call is a network round trip, so it goes
+# through run_blocking.
+class RedisCacheBackend:
+    def __init__(self, client: Any, prefix: str = "rentory:cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = run_blocking(self.client.get, self.prefix + key)
+        return _MISSING if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        run_blocking(lambda: self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000))))
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        return bool(run_blocking(lambda: self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000)), nx=True)))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            run_blocking(self.client.delete, *(self.prefix + key for key in keys))
+
+    def clear(self) -> None:
+        keys = run_blocking(lambda: list(self.client.scan_iter(match=f"{self.prefix}*")))
+        if keys:
+            run_blocking(self.client.delete, *keys)
+
+    def __len__(self) -> int:
+        return run_blocking(lambda: sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*")))
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float = CACHE_TTL_SECONDS) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    # Values are stored under the key's current generation. invalidate() moves the key to a new generation, so a
+    # load that started before the invalidation writes to a slot nobody reads any more instead of re-caching stale
+    # data. Generations live in the backend, so this also holds across workers sharing Redis.
+    # Loaders that already return plain JSON values (dicts, lists, str, numbers) pass json_native=True to skip
+    # the jsonable_encoder walk, which costs more than building the values for large lists.
+    def get_or_load(self, key: str, load: Callable[[], Any], json_native: bool = False) -> Any:
+        slot = f"{key}@{self._generation(key)}"
+        value = self.backend.get(slot)
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = load() if json_native else jsonable_encoder(load())
+        if self.ttl > 0:
+            self.backend.set(slot, value, self.ttl)
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        stale = []
+        for key in keys:
+            generation = self.backend.get(f"gen:{key}")
+            self.backend.set(f"gen:{key}", uuid.uuid4().hex, CACHE_GENERATION_TTL_SECONDS)
+            if generation is not _MISSING:
+                stale.append(f"{key}@{generation}")
+        self.backend.delete(*stale)
+
+    def _generation(self, key: str) -> str:
+        generation = self.backend.get(f"gen:{key}")
+        if generation is not _MISSING:
+            return generation
+        generation = uuid.uuid4().hex
+        if self.backend.add(f"gen:{key}", generation, CACHE_GENERATION_TTL_SECONDS):
+            return generation
+        current = self.backend.get(f"gen:{key}")
+        return generation if current is _MISSING else current
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def owner_properties_key(owner_id: str) -> str:
+    return f"owner:{owner_id}:properties"
+
+
+def owner_analytics_key(owner_id: str) -> str:
+    return f"owner:{owner_id}:analytics"
+
+
+def property_details_key(property_id: str) -> str:
+    return f"property:{property_id}"
+
+
+def _default_backend() -> CacheBackend:
+    if REDIS_URL:
+        import redis
+
+        return RedisCacheBackend(redis.Redis.from_url(REDIS_URL))
+    return MemoryCacheBackend()
+
+
+response_cache = ResponseCache(_default_backend())
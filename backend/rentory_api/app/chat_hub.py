@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from typing import Protocol
+
+CHAT_SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class ChatBroker(Protocol):
+    def start(self, deliver: Callable[[str, dict], None]) -> None: ...
+
+    def publish(self, group_id: str, event: dict) -> None: ...
+
+    def close(self) -> None: ...
+
+
+# Single-process stand-in for a pub/sub broker: publishes are delivered straight back to the hub.
+# Multi-worker deployments plug in a broker that relays through a shared message bus instead.
+class LocalChatBroker:
+    def __init__(self) -> None:
+        self._deliver: Callable[[str, dict], None] | None = None
+
+    def start(self, deliver: Callable[[str, dict], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, group_id: str, event: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(group_id, event)
+
+    def close(self) -> None:
+        self._deliver = None
+
+
+class ChatSubscription:
+    def __init__(self, group_id: str, loop: asyncio.AbstractEventLoop, queue_size: int) -> None:
+        self.group_id = group_id
+        self.loop = loop
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def offer(self, event: dict) -> None:
+        # Slow consumers lose their oldest events instead of blocking the publisher;
+        # they can resync with GET /properties/{property_id}/chat?after=<cursor>.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class ChatHub:
+    def __init__(self, broker: ChatBroker | None = None, queue_size: int = CHAT_SUBSCRIBER_QUEUE_SIZE) -> None:
+        self._subscribers: dict[str, set[ChatSubscription]] = {}
+        self._lock = threading.Lock()
+        self._queue_size = queue_size
+        self.broker: ChatBroker = broker or LocalChatBroker()
+        self.broker.start(self.deliver)
+
+    def subscribe(self, group_id: str) -> ChatSubscription:
+        subscription = ChatSubscription(group_id, asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            self._subscribers.setdefault(group_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChatSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.group_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.group_id]
+
+    def subscriber_count(self, group_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(group_id, ()))
+
+    def publish(self, group_id: str, event: dict) -> None:
+        self.broker.publish(group_id, event)
+
+    def deliver(self, group_id: str, event: dict) -> None:
+        # Called from request worker threads (or a broker listener thread), so hand
+        # each event to the subscriber's own event loop.
+        with self._lock:
+            subscribers = list(self._subscribers.get(group_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+chat_hub = ChatHub()
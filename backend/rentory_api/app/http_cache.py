@@ -0,0 +1,131 @@
+import gzip
+import os
+
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional: without it responses are only gzip-compressed.
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Revalidate on every use: the client keeps its copy but asks with If-None-Match before showing it.
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+def _strip_encoding(tag: str) -> str:
+    # A compressed body is a different representation, so its strong ETag carries the coding as a suffix.
+    for coding in ("gzip", "br"):
+        suffix = f'-{coding}"'
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+# If-None-Match uses the weak comparison: W/ prefixes are ignored, and so are the content-coding suffixes.
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or _strip_encoding(tag.removeprefix("W/")) == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def _accepted_encoding(accept_encoding: str) -> str | None:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output a pure function of the body, as a strong ETag requires.
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+# Compresses complete JSON and text bodies of at least `minimum_size` bytes. Streaming responses (server-sent
+# events, NDJSON import results) are passed through untouched so their chunks are not held back.
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = _accepted_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            response_headers = [(name.lower(), value) for name, value in start["headers"]]
+            content_type = next((value for name, value in response_headers if name == b"content-type"), b"").decode("latin-1")
+            if (
+                message.get("more_body")
+                or start["status"] in (204, 206, 304)
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or any(name == b"content-encoding" for name, _ in response_headers)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = _compress(body, encoding)
+            rewritten = []
+            vary = b"Accept-Encoding"
+            for name, value in response_headers:
+                if name == b"content-length":
+                    continue
+                if name == b"vary":
+                    vary = value + b", Accept-Encoding"
+                    continue
+                if name == b"etag" and not value.startswith(b"W/"):
+                    value = value[:-1] + f'-{encoding}"'.encode()
+                rewritten.append((name, value))
+            rewritten += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary),
+            ]
+            await send({**start, "headers": rewritten})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
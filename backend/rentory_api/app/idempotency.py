@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.util import await_only
+
+from .cache import REDIS_URL, CacheBackend, MemoryCacheBackend, RedisCacheBackend
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+# How long a duplicate waits for the original request before giving up with 409.
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# Lease on the pending marker, so a worker that dies mid-request does not block its key for the full TTL.
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+IDEMPOTENCY_POLL_SECONDS = 0.02
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def _sleep(seconds: float) -> None:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        time.sleep(seconds)
+        return
+    # In DATABASE_ASYNC mode the route body runs on the event loop via run_sync; yield to it instead of blocking.
+    await_only(asyncio.sleep(seconds))
+
+
+def _fingerprint(payload: Any) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()[:32]
+
+
+# Each key holds either a pending marker, claimed with an atomic add so concurrent duplicates collapse onto one
+# execution, or the finished response body. Only successful responses are kept; a failed attempt releases the
+# key so the client's retry runs again.
+class IdempotencyStore:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS,
+        lease_seconds: float = IDEMPOTENCY_LEASE_SECONDS,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self.lease_seconds = lease_seconds
+
+    def run(self, key: str | None, scope: str, payload: Any, response: Response, handler: Callable[[], Any]) -> Any:
+        if key is None:
+            return handler()
+
+        store_key = f"{scope}:{key}"
+        fingerprint = _fingerprint(payload)
+        deadline = time.monotonic() + self.wait_seconds
+        while not self.backend.add(store_key, {"state": "pending", "fingerprint": fingerprint}, self.lease_seconds):
+            entry = self.backend.get(store_key)
+            if not isinstance(entry, dict):
+                continue
+            if entry["fingerprint"] != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if entry["state"] == "done":
+                response.headers[REPLAY_HEADER] = "true"
+                return entry["body"]
+            if time.monotonic() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            _sleep(IDEMPOTENCY_POLL_SECONDS)
+
+        try:
+            body = jsonable_encoder(handler())
+        except BaseException:
+            self.backend.delete(store_key)
+            raise
+        self.backend.set(store_key, {"state": "done", "fingerprint": fingerprint, "body": body}, self.ttl)
+        return body
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+def _default_backend() -> CacheBackend:
+    if REDIS_URL:
+        import redis
+
+        return RedisCacheBackend(redis.Redis.from_url(REDIS_URL), prefix="rentory:idempotency:")
+    return MemoryCacheBackend(IDEMPOTENCY_MAX_KEYS)
+
+
+idempotency_store = IdempotencyStore(_default_backend())
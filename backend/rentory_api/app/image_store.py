@@ -0,0 +1,262 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from io import BytesIO
+from pathlib import Path
+from typing import Protocol
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it cards only carry the original image.
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "./rentory_images")
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+IMAGE_VARIANT_WIDTHS = tuple(int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "160,480").split(","))
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+IMAGE_VARIANT_QUALITY = 80
+
+IMAGE_URL_PREFIX = "/images/"
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+
+# Leading bytes of each supported format; uploads are stored and served as what their bytes are.
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+_DATA_URI = re.compile(r"^data:(image/[\w.+-]+);base64,(.*)$", re.DOTALL)
+_IMAGE_KEY = re.compile(r"^[0-9a-f]{64}(-w[0-9]+)?\.(jpg|png|webp|gif)$")
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class BlobStore(Protocol):
+    def put(self, key: str, data: bytes) -> None: ...
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def local_path(self, key: str) -> Path | None: ...
+
+
+class LocalBlobStore:
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        return path.read_bytes() if path.exists() else None
+
+    def local_path(self, key: str) -> Path | None:
+        path = self._path(key)
+        return path if path.exists() else None
+
+
+image_store: BlobStore = LocalBlobStore(IMAGE_STORE_DIR)
+
+_variant_executor = ThreadPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants")
+_variant_jobs: dict[str, Future] = {}
+_variant_lock = threading.Lock()
+# Originals whose bytes the decoder rejected. Each one also gets a marker blob, so other workers and restarts skip
+# it too instead of re-reading and re-decoding it on every thumbnail request.
+_undecodable: set[str] = set()
+
+
+def is_image_key(key: str) -> bool:
+    return _IMAGE_KEY.match(key) is not None
+
+
+def image_key_digest(key: str) -> str:
+    return key.split(".", 1)[0]
+
+
+def variant_key(key: str, width: int) -> str:
+    return f"{image_key_digest(key)}-w{width}.webp"
+
+
+def is_variant_key(key: str) -> bool:
+    return "-w" in image_key_digest(key)
+
+
+def find_original_key(key: str) -> str | None:
+    digest = image_key_digest(key).split("-w", 1)[0]
+    for extension in CONTENT_TYPES:
+        candidate = f"{digest}.{extension}"
+        if image_store.local_path(candidate) is not None or image_store.get(candidate) is not None:
+            return candidate
+    return None
+
+
+def _undecodable_marker(key: str) -> str:
+    return f"{image_key_digest(key)}.undecodable"
+
+
+def is_undecodable(key: str) -> bool:
+    if key in _undecodable:
+        return True
+    if image_store.get(_undecodable_marker(key)) is None:
+        return False
+    _undecodable.add(key)
+    return True
+
+
+def _mark_undecodable(key: str) -> None:
+    _undecodable.add(key)
+    image_store.put(_undecodable_marker(key), b"")
+
+
+def image_variant_urls(reference: str | None) -> dict[str, str]:
+    if Image is None or reference is None or not reference.startswith(IMAGE_URL_PREFIX):
+        return {}
+    key = reference[len(IMAGE_URL_PREFIX) :]
+    # Only the in-process set is consulted here: this runs for every card, and the first thumbnail request for a
+    # marked image in this process fills the set from the marker.
+    if key in _undecodable:
+        return {}
+    return {str(width): f"{PUBLIC_BASE_URL}{IMAGE_URL_PREFIX}{variant_key(key, width)}" for width in IMAGE_VARIANT_WIDTHS}
+
+
+def generate_variants(key: str, data: bytes) -> list[str]:
+    created: list[str] = []
+    try:
+        with Image.open(BytesIO(data)) as source:
+            # Decode once, at reduced scale where the codec allows it, then derive every width from that one bitmap.
+            largest = max(IMAGE_VARIANT_WIDTHS)
+            source.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        raise InvalidImage("Image could not be decoded") from exc
+    for width in sorted(IMAGE_VARIANT_WIDTHS, reverse=True):
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, "WEBP", quality=IMAGE_VARIANT_QUALITY)
+        image_store.put(variant_key(key, width), buffer.getvalue())
+        created.append(variant_key(key, width))
+    return created
+
+
+def _run_variant_job(key: str, data: bytes) -> None:
+    try:
+        generate_variants(key, data)
+    except InvalidImage:
+        logger.warning("Image %s could not be decoded; no variants will be generated for it", key)
+        _mark_undecodable(key)
+    except Exception:
+        logger.warning("Could not generate variants for image %s", key, exc_info=True)
+    finally:
+        with _variant_lock:
+            _variant_jobs.pop(key, None)
+
+
+def schedule_variants(key: str, data: bytes | None = None) -> Future | None:
+    if Image is None:
+        return None
+    if is_undecodable(key):
+        return None
+    with _variant_lock:
+        if key in _variant_jobs:
+            return _variant_jobs[key]
+        if data is None:
+            data = image_store.get(key)
+            if data is None:
+                return None
+        job = _variant_executor.submit(_run_variant_job, key, data)
+        _variant_jobs[key] = job
+    return job
+
+
+def wait_for_variants(timeout: float | None = None) -> None:
+    with _variant_lock:
+        jobs = list(_variant_jobs.values())
+    wait(jobs, timeout=timeout)
+
+
+def sniff_extension(data: bytes) -> str | None:
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, extension in _SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return None
+
+
+def store_image(data: bytes, content_type: str) -> str:
+    if content_type.split(";", 1)[0].strip().lower() not in IMAGE_EXTENSIONS:
+        raise InvalidImage(f"Unsupported image type {content_type}")
+    if not data:
+        raise InvalidImage("Image is empty")
+    if len(data) > MAX_IMAGE_BYTES:
+        raise InvalidImage("Image is too large")
+    extension = sniff_extension(data)
+    if extension is None:
+        raise InvalidImage("Image content is not a JPEG, PNG, WebP or GIF file")
+
+    # Content addressing: identical uploads share one blob and the reference never needs invalidating.
+    key = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+    image_store.put(key, data)
+    schedule_variants(key, data)
+    return f"{IMAGE_URL_PREFIX}{key}"
+
+
+def is_data_uri(value: str | None) -> bool:
+    return value is not None and value.startswith("data:")
+
+
+def store_data_uri(value: str) -> str:
+    match = _DATA_URI.match(value)
+    if match is None:
+        raise InvalidImage("Image data URI must be base64 encoded image data")
+    try:
+        data = base64.b64decode(match.group(2), validate=True)
+    except binascii.Error as exc:
+        raise InvalidImage("Image data URI is not valid base64") from exc
+    return store_image(data, match.group(1))
+
+
+def image_path(key: str) -> Path | None:
+    return image_store.local_path(key)
+
+
+def read_image(key: str) -> bytes | None:
+    return image_store.get(key)
+
+
+def public_image_url(reference: str | None) -> str | None:
+    if reference is not None and reference.startswith(IMAGE_URL_PREFIX):
+        return f"{PUBLIC_BASE_URL}{reference}"
+    return reference
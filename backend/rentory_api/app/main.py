@@ -1,47 +1,113 @@
+import asyncio
+import json
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import defaultdict
 from datetime import datetime
 from urllib.parse import quote
-from uuid import uuid4
+from uuid import UUID, uuid4
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
-
-from .database import Base, engine, get_db
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from .analytics import compute_owner_analytics, record_owner_created, record_property_created, record_tenants_activated
+from .auth import authorize_user, require_claims, token_service, websocket_claims
+from .billing import BILLING_SCHEDULER_ENABLED, account_balance, account_statement, billing_scheduler, post_entry
+from .bulk_import import MAX_IMPORT_BYTES, InvalidImportFile, import_chunk, import_format, iter_chunks, iter_rows
+from .cache import owner_analytics_key, owner_properties_key, property_details_key, response_cache
+from .chat_hub import chat_hub
+from .database import SessionLocal, async_engine, db_endpoint, engine, get_db, run_blocking
+from .fast_json import FAST_JSON_RESPONSES, FastJSONResponse
+from .idempotency import REPLAY_HEADER, idempotency_store
+from .http_cache import ETAG_CACHE_CONTROL, CompressionMiddleware, etag_matches, not_modified
+from .image_store import (
+    CONTENT_TYPES,
+    MAX_IMAGE_BYTES,
+    IMAGE_URL_PREFIX,
+    InvalidImage,
+    find_original_key,
+    image_key_digest,
+    image_path,
+    image_variant_urls,
+    is_data_uri,
+    is_image_key,
+    is_variant_key,
+    public_image_url,
+    read_image,
+    schedule_variants,
+    store_data_uri,
+    store_image,
+    wait_for_variants,
+)
+from .maintenance import TicketConflict, record_ticket_created, status_counts, transition_ticket
+from .metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, instrument_engine, metrics
+from .migrations import migrate
 from .models import (
-    Bill,
     ChatGroup,
     ChatGroupMember,
     ChatMessage,
     MaintenanceTicket,
     Notification,
+    NotificationJob,
+    NotificationReadCursor,
+    OwnerAnalyticsSummary,
     Payment,
     Property,
     PropertyTenant,
     User,
 )
+from .notifications import notification_worker
+from .passwords import UNUSABLE_PASSWORD_HASH, PasswordHasherBusy, password_hasher
+from .revisions import OWNER_SCOPE, PROPERTY_SCOPE, bump_revision, make_etag, revision_of
+from .search import SEARCH_KINDS, search
 from .schemas import (
+    BatchGetError,
+    BatchGetRequest,
     BroadcastCreate,
     BroadcastResponse,
     ChatMessageCreate,
     ChatMessageResponse,
+    ImageUploadResponse,
     JoinRequestCreate,
     JoinRequestResponse,
+    LedgerBalanceResponse,
+    LedgerEntryResponse,
+    LedgerStatementResponse,
     LoginRequest,
     LoginResponse,
     MaintenanceCreate,
+    MaintenanceListResponse,
     MaintenanceResponse,
+    MaintenanceStatusUpdate,
+    NotificationInboxResponse,
+    NotificationJobResponse,
+    NotificationReadRequest,
+    NotificationReadResponse,
+    NotificationResponse,
     OwnerAnalyticsResponse,
     OwnerSignupRequest,
     PaymentCreate,
     PaymentResponse,
+    PropertyBatchGetResponse,
+    PropertyBatchGetResult,
     PropertyCardResponse,
     PropertyCreateRequest,
     PropertyDetailsResponse,
+    SearchHit,
+    SearchKind,
+    SearchResponse,
+    TenantBatchGetResponse,
+    TenantBatchGetResult,
     TenantDashboardResponse,
     TenantDetailsResponse,
     TenantRegistrationRequest,
     TenantSummaryResponse,
+    TicketStatus,
     WaterBillStatusUpdateRequest,
 )
 
@@ -52,11 +118,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Chat-Before-Cursor", "X-Chat-After-Cursor", "X-Chat-Has-More", "ETag", REPLAY_HEADER],
+)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+
+CHAT_PAGE_DEFAULT_LIMIT = 50
+CHAT_PAGE_MAX_LIMIT = 200
+CHAT_SSE_KEEPALIVE_SECONDS = 15
+INBOX_PAGE_DEFAULT_LIMIT = 20
+INBOX_PAGE_MAX_LIMIT = 100
+INBOX_UNREAD_CAP = 99
+STATEMENT_PAGE_DEFAULT_LIMIT = 50
+STATEMENT_PAGE_MAX_LIMIT = 200
+TICKET_PAGE_DEFAULT_LIMIT = 50
+TICKET_PAGE_MAX_LIMIT = 200
+SEARCH_PAGE_DEFAULT_LIMIT = 20
+SEARCH_PAGE_MAX_LIMIT = 50
+SEARCH_MAX_OFFSET = 500
+SEARCH_QUERY_MAX_LENGTH = 200
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PROPERTY_CARD_COLUMNS = (
+    Property.id,
+    Property.owner_id,
+    Property.location,
+    Property.name,
+    Property.unit_type,
+    Property.capacity,
+    Property.occupied_count,
+    Property.rent,
+    Property.image_url,
+    Property.qr_code,
+)
+CHAT_MESSAGE_COLUMNS = (
+    ChatMessage.id,
+    ChatMessage.group_id,
+    ChatMessage.sender_id,
+    ChatMessage.sender_name,
+    ChatMessage.text,
+    ChatMessage.image_url,
+    ChatMessage.created_at,
 )
 
 
 def _hash_password(password: str) -> str:
-    return f"plain::{password}"
+    try:
+        return password_hasher.hash(password)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail="Too many sign-in requests", headers={"Retry-After": "1"}) from exc
+
+
+def _verify_password(password: str, stored: str | None) -> bool:
+    try:
+        return password_hasher.verify(password, stored)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail="Too many sign-in requests", headers={"Retry-After": "1"}) from exc
 
 
 def _qr_code_url(qr_code: str) -> str:
@@ -73,12 +192,155 @@ def _property_card(row: Property) -> PropertyCardResponse:
         capacity=row.capacity,
         occupied_count=row.occupied_count,
         rent=row.rent,
-        image_url=row.image_url,
+        image_url=public_image_url(row.image_url),
+        thumbnail_urls=image_variant_urls(row.image_url),
         qr_code=row.qr_code,
         qr_code_url=_qr_code_url(row.qr_code),
     )
 
 
+# The FAST_JSON_RESPONSES counterparts of the response models: plain dicts with the same keys in the same order,
+# built from rows of the *_COLUMNS selects.
+def _property_card_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "owner_id": row.owner_id,
+        "location": row.location,
+        "name": row.name,
+        "unit_type": row.unit_type,
+        "capacity": row.capacity,
+        "occupied_count": row.occupied_count,
+        "rent": row.rent,
+        "image_url": public_image_url(row.image_url),
+        "thumbnail_urls": image_variant_urls(row.image_url),
+        "qr_code": row.qr_code,
+        "qr_code_url": _qr_code_url(row.qr_code),
+    }
+
+
+def _etag_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+
+
+def _tenant_summary_dict(row) -> dict:
+    return {"join_id": row.id, "tenant_id": row.tenant_id, "status": row.status, "full_name": row.full_name, "phone": row.phone}
+
+
+def _image_reference(image_url: str) -> str:
+    # Inline data URIs are moved into the blob store so the properties row only keeps a short reference.
+    if not is_data_uri(image_url):
+        return image_url
+    try:
+        return run_blocking(store_data_uri, image_url)
+    except InvalidImage as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+def _chat_message_response(row: ChatMessage) -> ChatMessageResponse:
+    return ChatMessageResponse(
+        id=row.id,
+        group_id=row.group_id,
+        sender_id=row.sender_id,
+        sender_name=row.sender_name,
+        text=row.text,
+        image_url=row.image_url,
+        created_at=row.created_at,
+    )
+
+
+def _encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), str(UUID(row_id))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _encode_chat_cursor(row: ChatMessage) -> str:
+    return _encode_cursor(row.created_at, row.id)
+
+
+def _chat_event(row: ChatMessage) -> dict:
+    return {"cursor": _encode_chat_cursor(row), "message": _chat_message_response(row).model_dump(mode="json")}
+
+
+def _chat_subscription_group(property_id: str, user_id: str) -> str:
+    # Membership is checked once when a push subscriber connects; the stream itself never touches the database.
+    with SessionLocal() as db:
+        group_id = db.scalar(select(ChatGroup.id).where(ChatGroup.property_id == property_id))
+        if group_id is None:
+            raise HTTPException(status_code=404, detail="Chat group not found")
+
+        membership_id = db.scalar(
+            select(ChatGroupMember.id).where(ChatGroupMember.group_id == group_id, ChatGroupMember.user_id == user_id)
+        )
+        if membership_id is None:
+            raise HTTPException(status_code=403, detail="User is not a member of this group")
+    return group_id
+
+
+async def _chat_sse_events(group_id: str):
+    subscription = chat_hub.subscribe(group_id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=CHAT_SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['cursor']}\nevent: message\ndata: {json.dumps(event['message'])}\n\n"
+    finally:
+        chat_hub.unsubscribe(subscription)
+
+
+def _owner_exists(owner_id: str) -> bool:
+    with SessionLocal() as db:
+        owner = db.get(User, owner_id)
+        return owner is not None and owner.role == "owner"
+
+
+async def _property_import_results(owner_id: str, chunks):
+    started = time.perf_counter()
+    created = failed = 0
+    for chunk in chunks:
+        results = await run_in_threadpool(import_chunk, owner_id, chunk)
+        chunk_created = sum(1 for result in results if result["status"] == "created")
+        if chunk_created:
+            response_cache.invalidate(owner_properties_key(owner_id), owner_analytics_key(owner_id))
+        created += chunk_created
+        failed += len(results) - chunk_created
+        for result in results:
+            yield json.dumps(result) + "\n"
+
+    elapsed = time.perf_counter() - started
+    summary = {"created": created, "failed": failed, "seconds": round(elapsed, 3)}
+    summary["rows_per_sec"] = round((created + failed) / elapsed, 1) if elapsed else 0.0
+    yield json.dumps({"summary": summary}) + "\n"
+
+
+def _inbox_tenant(db: Session, tenant_id: str) -> User:
+    tenant = db.get(User, tenant_id)
+    if tenant is None or tenant.role != "tenant":
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    return tenant
+
+
+def _unread_count(db: Session, property_id: str, read_cursor: NotificationReadCursor | None) -> int:
+    # Counts only the rows past the read cursor, and stops at the cap, so the cost does not grow with history.
+    query = select(Notification.id).where(Notification.property_id == property_id)
+    if read_cursor is not None:
+        query = query.where(
+            tuple_(Notification.created_at, Notification.id) > (read_cursor.last_read_at, read_cursor.last_read_id)
+        )
+    return db.scalar(select(func.count()).select_from(query.limit(INBOX_UNREAD_CAP + 1).subquery())) or 0
+
+
 def _ensure_chat_membership(db: Session, group_id: str, user_id: str, role: str) -> None:
     existing = db.scalar(select(ChatGroupMember).where(ChatGroupMember.group_id == group_id, ChatGroupMember.user_id == user_id))
     if existing is None:
@@ -87,7 +349,18 @@ def _ensure_chat_membership(db: Session, group_id: str, user_id: str, role: str)
 
 @app.on_event("startup")
 def startup() -> None:
-    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    notification_worker.start()
+    notification_worker.requeue_unfinished()
+    if BILLING_SCHEDULER_ENABLED:
+        billing_scheduler.start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    notification_worker.stop()
+    billing_scheduler.stop()
+    wait_for_variants(timeout=30)
 
 
 @app.get("/health")
@@ -95,7 +368,82 @@ def health() -> dict:
     return {"status": "ok", "service": "rentory-api", "db": "connected"}
 
 
+@app.get("/cache/stats")
+def cache_stats() -> dict:
+    return response_cache.stats()
+
+
+@app.get("/metrics")
+def prometheus_metrics() -> Response:
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+# Rejects a declared Content-Length over the limit up front, and stops reading chunked or under-declared bodies
+# as soon as they pass it, so an upload never costs more than `limit` bytes of memory.
+async def _read_body(request: Request, limit: int, too_large: str) -> bytes:
+    declared = request.headers.get("content-length")
+    if declared is not None:
+        if not declared.strip().isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+        if int(declared) > limit:
+            raise HTTPException(status_code=413, detail=too_large)
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail=too_large)
+    return bytes(body)
+
+
+@app.post("/images", response_model=ImageUploadResponse, status_code=201)
+async def upload_image(request: Request) -> ImageUploadResponse:
+    content_type = request.headers.get("content-type", "")
+    data = await _read_body(request, MAX_IMAGE_BYTES, "Image is too large")
+    try:
+        reference = await run_in_threadpool(store_image, data, content_type)
+    except InvalidImage as exc:
+        raise HTTPException(status_code=415, detail=str(exc)) from exc
+
+    return ImageUploadResponse(
+        image_url=reference,
+        public_url=public_image_url(reference),
+        content_type=CONTENT_TYPES[reference.rsplit(".", 1)[1]],
+        size=len(data),
+    )
+
+
+@app.get("/images/{key}")
+def get_image(key: str, request: Request) -> Response:
+    if not is_image_key(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # The key is the SHA-256 of the bytes, so it doubles as a strong validator that never changes.
+    etag = f'"{image_key_digest(key)}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = CONTENT_TYPES[key.rsplit(".", 1)[1]]
+    path = image_path(key)
+    if path is not None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    data = read_image(key)
+    if data is not None:
+        return Response(content=data, media_type=media_type, headers=headers)
+
+    source_key = find_original_key(key) if is_variant_key(key) else None
+    if source_key is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # The variant is still being rendered (or was lost): serve the original for now without letting it be cached.
+    schedule_variants(source_key)
+    return RedirectResponse(f"{IMAGE_URL_PREFIX}{source_key}", status_code=307, headers={"Cache-Control": "no-store"})
+
+
 @app.post("/auth/owners/signup", response_model=LoginResponse, status_code=201)
+@db_endpoint
 def owner_signup(payload: OwnerSignupRequest, db: Session = Depends(get_db)) -> LoginResponse:
     existing_user = db.scalar(select(User).where(User.phone == payload.phone))
     if existing_user is not None:
@@ -110,57 +458,76 @@ def owner_signup(payload: OwnerSignupRequest, db: Session = Depends(get_db)) ->
         password_hash=_hash_password(payload.password),
     )
     db.add(user)
+    record_owner_created(db, user.id)
     db.commit()
     db.refresh(user)
-    return LoginResponse(access_token=f"demo-token-{uuid4()}", role="owner", user_id=user.id)
+    return LoginResponse(access_token=token_service.issue(user.id, "owner"), role="owner", user_id=user.id)
 
 
 @app.post("/auth/tenants/register", response_model=LoginResponse, status_code=201)
+@db_endpoint
 def tenant_register(payload: TenantRegistrationRequest, db: Session = Depends(get_db)) -> LoginResponse:
-    property_row = db.scalar(select(Property).where(Property.qr_code == payload.qr_code))
-    if property_row is None:
+    target = db.execute(
+        select(Property.id, Property.owner_id, Property.capacity, Property.occupied_count, ChatGroup.id.label("group_id"))
+        .outerjoin(ChatGroup, ChatGroup.property_id == Property.id)
+        .where(Property.qr_code == payload.qr_code)
+    ).first()
+    if target is None:
         raise HTTPException(status_code=404, detail="Invalid QR code")
 
-    if property_row.occupied_count >= property_row.capacity:
+    if target.occupied_count >= target.capacity:
         raise HTTPException(status_code=409, detail="Property is full")
 
-    existing_user = db.scalar(select(User).where(User.phone == payload.phone))
+    existing_user = db.scalar(select(User.id).where(User.phone == payload.phone))
     if existing_user is not None:
         raise HTTPException(status_code=409, detail="Phone already registered")
 
-    tenant = User(
-        id=str(uuid4()),
-        role="tenant",
-        full_name=payload.full_name,
-        age=payload.age,
-        phone=payload.phone,
-        email=payload.email,
-        documents=payload.documents,
-        assigned_property_id=property_row.id,
-        password_hash=_hash_password(payload.password),
-    )
-    db.add(tenant)
-    db.flush()
-
-    link = PropertyTenant(
-        id=str(uuid4()),
-        property_id=property_row.id,
-        tenant_id=tenant.id,
-        status="active",
-        created_at=datetime.utcnow(),
+    tenant_id = str(uuid4())
+    db.add(
+        User(
+            id=tenant_id,
+            role="tenant",
+            full_name=payload.full_name,
+            age=payload.age,
+            phone=payload.phone,
+            email=payload.email,
+            documents=payload.documents,
+            assigned_property_id=target.id,
+            password_hash=_hash_password(payload.password),
+        )
     )
-    property_row.occupied_count += 1
-    db.add(link)
-
-    group = db.scalar(select(ChatGroup).where(ChatGroup.property_id == property_row.id))
-    if group is not None:
-        _ensure_chat_membership(db, group.id, tenant.id, "tenant")
+    db.add(PropertyTenant(id=str(uuid4()), property_id=target.id, tenant_id=tenant_id, status="active", created_at=datetime.utcnow()))
+    if target.group_id is not None:
+        db.add(ChatGroupMember(id=str(uuid4()), group_id=target.group_id, user_id=tenant_id, role="tenant"))
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Phone already registered") from exc
+
+    # Claim the seat with one conditional UPDATE so concurrent scans can never oversubscribe the unit.
+    # It runs after the inserts, which keeps the property row lock to the tail of the transaction.
+    claimed = db.execute(
+        update(Property)
+        .where(Property.id == target.id, Property.occupied_count < Property.capacity)
+        .values(occupied_count=Property.occupied_count + 1)
+        .returning(Property.occupied_count)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if claimed is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Property is full")
 
+    record_tenants_activated(db, target.owner_id)
+    bump_revision(db, OWNER_SCOPE, target.owner_id)
+    bump_revision(db, PROPERTY_SCOPE, target.id)
     db.commit()
-    return LoginResponse(access_token=f"demo-token-{uuid4()}", role="tenant", user_id=tenant.id)
+    response_cache.invalidate(owner_properties_key(target.owner_id), owner_analytics_key(target.owner_id), property_details_key(target.id))
+    return LoginResponse(access_token=token_service.issue(tenant_id, "tenant"), role="tenant", user_id=tenant_id)
 
 
 @app.post("/auth/login", response_model=LoginResponse)
+@db_endpoint
 def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse:
     user = db.scalar(select(User).where((User.phone == payload.identifier) | (User.email == payload.identifier)))
     if user is None:
@@ -169,47 +536,117 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse
     if user.role != payload.role:
         raise HTTPException(status_code=401, detail="Role mismatch")
 
-    if user.password_hash != _hash_password(payload.password):
+    if not _verify_password(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    return LoginResponse(access_token=f"demo-token-{uuid4()}", role=user.role, user_id=user.id)
+    response = LoginResponse(access_token=token_service.issue(user.id, user.role), role=user.role, user_id=user.id)
+    # Hashes from an older scheme or cost setting are upgraded while the plaintext is at hand.
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = _hash_password(payload.password)
+        db.commit()
+    return response
+
+
+@app.post("/auth/logout", status_code=204)
+def logout(claims: dict = Depends(require_claims)) -> Response:
+    token_service.revoke(claims)
+    return Response(status_code=204)
 
 
 @app.get("/owners/{owner_id}/properties", response_model=list[PropertyCardResponse])
-def list_properties(owner_id: str, db: Session = Depends(get_db)) -> list[PropertyCardResponse]:
-    owner = db.get(User, owner_id)
+@db_endpoint
+def list_properties(
+    owner_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> list[PropertyCardResponse]:
+    authorize_user(claims, owner_id)
+    # A revalidation costs one primary key lookup; the cards are only loaded when the revision moved on.
+    if if_none_match is not None:
+        etag = _owner_properties_etag(db, owner_id)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    # Cache entries carry the ETag of the revision they were loaded at, so a hit never pairs old cards with a new tag.
+    if FAST_JSON_RESPONSES:
+        entry = response_cache.get_or_load(
+            owner_properties_key(owner_id), lambda: _owner_property_dicts(db, owner_id), json_native=True
+        )
+        return FastJSONResponse(entry["body"], headers=_etag_headers(entry["etag"]))
+    entry = response_cache.get_or_load(owner_properties_key(owner_id), lambda: _load_owner_properties(db, owner_id))
+    response.headers.update(_etag_headers(entry["etag"]))
+    return entry["body"]
+
+
+def _owner_properties_etag(db: Session, owner_id: str) -> str:
+    owner = db.execute(select(User.role, revision_of(OWNER_SCOPE, User.id).label("revision")).where(User.id == owner_id)).first()
     if owner is None or owner.role != "owner":
         raise HTTPException(status_code=404, detail="Owner not found")
+    return make_etag(OWNER_SCOPE, owner_id, owner.revision)
+
 
+def _load_owner_properties(db: Session, owner_id: str) -> dict:
+    # The revision is read before the rows: a write landing in between leaves newer cards under an older tag,
+    # which only costs the client one extra download.
+    etag = _owner_properties_etag(db, owner_id)
     rows = db.scalars(select(Property).where(Property.owner_id == owner_id)).all()
-    return [_property_card(row) for row in rows]
+    return {"etag": etag, "body": [_property_card(row) for row in rows]}
 
 
-@app.get("/owners/{owner_id}/analytics", response_model=OwnerAnalyticsResponse)
-def owner_analytics(owner_id: str, db: Session = Depends(get_db)) -> OwnerAnalyticsResponse:
-    owner = db.get(User, owner_id)
-    if owner is None or owner.role != "owner":
-        raise HTTPException(status_code=404, detail="Owner not found")
+def _owner_property_dicts(db: Session, owner_id: str) -> dict:
+    etag = _owner_properties_etag(db, owner_id)
+    rows = db.execute(select(*PROPERTY_CARD_COLUMNS).where(Property.owner_id == owner_id))
+    return {"etag": etag, "body": [_property_card_dict(row) for row in rows]}
 
-    grouped_rows = db.execute(
-        select(Property.location, func.count(Property.id)).where(Property.owner_id == owner_id).group_by(Property.location)
-    ).all()
-    total_tenants = db.scalar(
-        select(func.count(PropertyTenant.id))
-        .join(Property, Property.id == PropertyTenant.property_id)
-        .where(Property.owner_id == owner_id)
-        .where(PropertyTenant.status == "active")
-    )
 
-    grouped = {location: count for location, count in grouped_rows}
+@app.get("/owners/{owner_id}/analytics", response_model=OwnerAnalyticsResponse)
+@db_endpoint
+def owner_analytics(
+    owner_id: str, claims: dict = Depends(require_claims), db: Session = Depends(get_db)
+) -> OwnerAnalyticsResponse:
+    authorize_user(claims, owner_id)
+    return response_cache.get_or_load(owner_analytics_key(owner_id), lambda: _load_owner_analytics(db, owner_id))
+
+
+def _load_owner_analytics(db: Session, owner_id: str) -> OwnerAnalyticsResponse:
+    # Served from the materialized per-owner summary; only owners without one yet fall back to aggregating.
+    summary = db.get(OwnerAnalyticsSummary, owner_id)
+    if summary is None:
+        owner = db.get(User, owner_id)
+        if owner is None or owner.role != "owner":
+            raise HTTPException(status_code=404, detail="Owner not found")
+        summary = compute_owner_analytics(db, owner_id)
+
     return OwnerAnalyticsResponse(
-        grouped_by_place=grouped,
-        total_properties=sum(grouped.values()),
-        total_tenants=total_tenants or 0,
+        grouped_by_place=summary.properties_by_location,
+        total_properties=summary.total_properties,
+        total_tenants=summary.total_tenants,
     )
 
 
+@app.get("/owners/{owner_id}/search", response_model=SearchResponse)
+@db_endpoint
+def owner_search(
+    owner_id: str,
+    q: str = Query(min_length=1, max_length=SEARCH_QUERY_MAX_LENGTH),
+    kind: SearchKind | None = None,
+    property_id: str | None = None,
+    limit: int = Query(default=SEARCH_PAGE_DEFAULT_LIMIT, ge=1, le=SEARCH_PAGE_MAX_LIMIT),
+    offset: int = Query(default=0, ge=0, le=SEARCH_MAX_OFFSET),
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> SearchResponse:
+    authorize_user(claims, owner_id)
+    # Ranked results have no stable keyset to page on, so pages are offsets into the ranking, capped so a
+    # deep page never asks the index for more than SEARCH_MAX_OFFSET + limit rows per kind.
+    hits, has_more = search(db, owner_id, q, (kind,) if kind else SEARCH_KINDS, property_id, limit, offset)
+    return SearchResponse(results=[SearchHit(**hit) for hit in hits], next_offset=offset + limit if has_more else None)
+
+
 @app.post("/owners/{owner_id}/properties", response_model=PropertyCardResponse, status_code=201)
+@db_endpoint
 def create_property(owner_id: str, payload: PropertyCreateRequest, db: Session = Depends(get_db)) -> PropertyCardResponse:
     owner = db.get(User, owner_id)
     if owner is None or owner.role != "owner":
@@ -222,7 +659,7 @@ def create_property(owner_id: str, payload: PropertyCreateRequest, db: Session =
         name=payload.name,
         unit_type=payload.unit_type,
         description=payload.description,
-        image_url=payload.image_url,
+        image_url=_image_reference(payload.image_url),
         qr_code=f"QR-{uuid4().hex[:10]}",
         capacity=payload.capacity,
         occupied_count=0,
@@ -241,33 +678,85 @@ def create_property(owner_id: str, payload: PropertyCreateRequest, db: Session =
     db.add(chat_group)
     db.flush()
     _ensure_chat_membership(db, chat_group.id, owner_id, "owner")
+    record_property_created(db, owner_id, property_row.location)
+    bump_revision(db, OWNER_SCOPE, owner_id)
 
     db.commit()
     db.refresh(property_row)
+    response_cache.invalidate(owner_properties_key(owner_id), owner_analytics_key(owner_id))
     return _property_card(property_row)
 
 
+@app.post("/owners/{owner_id}/properties:import")
+async def import_properties(owner_id: str, request: Request) -> StreamingResponse:
+    if not await run_in_threadpool(_owner_exists, owner_id):
+        raise HTTPException(status_code=404, detail="Owner not found")
+
+    try:
+        file_format = import_format(request.headers.get("content-type", ""))
+    except InvalidImportFile as exc:
+        raise HTTPException(status_code=415, detail=str(exc)) from exc
+
+    body = await _read_body(request, MAX_IMPORT_BYTES, "Import file is too large")
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8") from exc
+
+    # One NDJSON result line per input row, flushed after each chunk commits, then a summary line.
+    return StreamingResponse(
+        _property_import_results(owner_id, iter_chunks(iter_rows(text, file_format))),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.get("/properties/{property_id}", response_model=PropertyDetailsResponse)
-def get_property(property_id: str, db: Session = Depends(get_db)) -> PropertyDetailsResponse:
-    row = db.get(Property, property_id)
-    if row is None:
+@db_endpoint
+def get_property(
+    property_id: str, response: Response, if_none_match: str | None = Header(default=None), db: Session = Depends(get_db)
+) -> PropertyDetailsResponse:
+    if if_none_match is not None:
+        revision = db.scalar(select(revision_of(PROPERTY_SCOPE, Property.id)).where(Property.id == property_id))
+        if revision is None:
+            raise HTTPException(status_code=404, detail="Property not found")
+        etag = make_etag(PROPERTY_SCOPE, property_id, revision)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if FAST_JSON_RESPONSES:
+        entry = response_cache.get_or_load(
+            property_details_key(property_id), lambda: _property_details_dict(db, property_id), json_native=True
+        )
+        return FastJSONResponse(entry["body"], headers=_etag_headers(entry["etag"]))
+    entry = response_cache.get_or_load(property_details_key(property_id), lambda: _load_property_details(db, property_id))
+    response.headers.update(_etag_headers(entry["etag"]))
+    return entry["body"]
+
+
+def _load_property_details(db: Session, property_id: str) -> dict:
+    # The property, its owner's phone, the chat group name and the revision come back in one joined row.
+    result = db.execute(
+        select(Property, User.phone, ChatGroup.group_name, revision_of(PROPERTY_SCOPE, Property.id))
+        .outerjoin(Property.owner)
+        .outerjoin(ChatGroup, ChatGroup.property_id == Property.id)
+        .where(Property.id == property_id)
+    ).first()
+    if result is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    owner = db.get(User, row.owner_id)
-    chat_group = db.scalar(select(ChatGroup).where(ChatGroup.property_id == property_id))
-    tenants = db.execute(
-        select(PropertyTenant.id, PropertyTenant.tenant_id, PropertyTenant.status, User.full_name, User.phone)
-        .join(User, User.id == PropertyTenant.tenant_id)
-        .where(PropertyTenant.property_id == property_id)
-    ).all()
+    row, owner_phone, chat_group_name, revision = result
+    details = _property_details_response(row, owner_phone, chat_group_name, _property_tenant_rows(db, property_id))
+    return {"etag": make_etag(PROPERTY_SCOPE, property_id, revision), "body": details}
+
 
+def _property_details_response(row: Property, owner_phone: str | None, chat_group_name: str | None, tenants) -> PropertyDetailsResponse:
     return PropertyDetailsResponse(
         property=_property_card(row),
         description=row.description,
         current_bill_amount=row.current_bill_amount,
         water_bill_status=row.water_bill_status,
-        owner_phone=owner.phone if owner else "",
-        chat_group_name=chat_group.group_name if chat_group else row.name,
+        owner_phone=owner_phone or "",
+        chat_group_name=chat_group_name or row.name,
         tenants=[
             TenantSummaryResponse(
                 join_id=t.id,
@@ -281,23 +770,140 @@ def get_property(property_id: str, db: Session = Depends(get_db)) -> PropertyDet
     )
 
 
+def _property_tenant_rows(db: Session, property_id: str) -> list:
+    return db.execute(
+        select(PropertyTenant.id, PropertyTenant.tenant_id, PropertyTenant.status, User.full_name, User.phone)
+        .join(User, User.id == PropertyTenant.tenant_id)
+        .where(PropertyTenant.property_id == property_id)
+    ).all()
+
+
+def _property_details_dict(db: Session, property_id: str) -> dict:
+    row = db.execute(
+        select(
+            *PROPERTY_CARD_COLUMNS,
+            Property.description,
+            Property.current_bill_amount,
+            Property.water_bill_status,
+            User.phone.label("owner_phone"),
+            ChatGroup.group_name,
+            revision_of(PROPERTY_SCOPE, Property.id).label("revision"),
+        )
+        .outerjoin(User, User.id == Property.owner_id)
+        .outerjoin(ChatGroup, ChatGroup.property_id == Property.id)
+        .where(Property.id == property_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    details = {
+        "property": _property_card_dict(row),
+        "description": row.description,
+        "current_bill_amount": row.current_bill_amount,
+        "water_bill_status": row.water_bill_status,
+        "owner_phone": row.owner_phone or "",
+        "chat_group_name": row.group_name or row.name,
+        "tenants": [_tenant_summary_dict(t) for t in _property_tenant_rows(db, property_id)],
+    }
+    return {"etag": make_etag(PROPERTY_SCOPE, property_id, row.revision), "body": details}
+
+
+def _canonical_ids(ids: list[str]) -> dict[str, str | None]:
+    # Ids that are not UUIDs get a per-id 400 instead of failing the whole IN query; the rest are normalized to
+    # the form the database returns, so "ABC..." in a request still matches its row.
+    canonical: dict[str, str | None] = {}
+    for item in ids:
+        try:
+            canonical[item] = str(UUID(item))
+        except ValueError:
+            canonical[item] = None
+    return canonical
+
+
+@app.post("/properties:batchGet", response_model=PropertyBatchGetResponse)
+@db_endpoint
+def batch_get_properties(payload: BatchGetRequest, db: Session = Depends(get_db)) -> PropertyBatchGetResponse:
+    canonical = _canonical_ids(payload.ids)
+    property_ids = sorted({item for item in canonical.values() if item is not None})
+    found: dict[str, PropertyDetailsResponse] = {}
+    # Two queries for the whole batch, one per table: the joined property rows, then every tenant of those properties.
+    if property_ids:
+        rows = db.execute(
+            select(Property, User.phone, ChatGroup.group_name)
+            .outerjoin(Property.owner)
+            .outerjoin(ChatGroup, ChatGroup.property_id == Property.id)
+            .where(Property.id.in_(property_ids))
+        ).all()
+        tenants_by_property = defaultdict(list)
+        for tenant in db.execute(
+            select(PropertyTenant.property_id, PropertyTenant.id, PropertyTenant.tenant_id, PropertyTenant.status, User.full_name, User.phone)
+            .join(User, User.id == PropertyTenant.tenant_id)
+            .where(PropertyTenant.property_id.in_(property_ids))
+        ):
+            tenants_by_property[tenant.property_id].append(tenant)
+        for row, owner_phone, chat_group_name in rows:
+            found[row.id] = _property_details_response(row, owner_phone, chat_group_name, tenants_by_property[row.id])
+
+    results = []
+    for item in payload.ids:
+        if canonical[item] is None:
+            results.append(PropertyBatchGetResult(id=item, error=BatchGetError(status=400, detail="Invalid property id")))
+        elif canonical[item] in found:
+            results.append(PropertyBatchGetResult(id=item, property=found[canonical[item]]))
+        else:
+            results.append(PropertyBatchGetResult(id=item, error=BatchGetError(status=404, detail="Property not found")))
+    return PropertyBatchGetResponse(results=results)
+
+
 @app.patch("/properties/{property_id}/water-bill")
+@db_endpoint
 def update_water_bill_status(property_id: str, payload: WaterBillStatusUpdateRequest, db: Session = Depends(get_db)) -> dict:
     row = db.get(Property, property_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
     row.water_bill_status = payload.status
+    bump_revision(db, PROPERTY_SCOPE, property_id)
     db.commit()
+    response_cache.invalidate(property_details_key(property_id))
     return {"property_id": property_id, "water_bill_status": payload.status}
 
 
+# Tenants linked to one of `owner_id`'s properties (or to `property_id` only), among `tenant_ids`.
+def _owner_tenant_links(owner_id: str, tenant_ids: list[str], property_id: str | None = None):
+    query = (
+        select(PropertyTenant.tenant_id)
+        .join(Property, Property.id == PropertyTenant.property_id)
+        .where(Property.owner_id == owner_id, PropertyTenant.tenant_id.in_(tenant_ids))
+    )
+    if property_id is not None:
+        query = query.where(PropertyTenant.property_id == property_id)
+    return query
+
+
+# Tenants read their own records; owners only those of tenants linked to their properties.
+def authorize_tenant_read(db: Session, claims: dict, tenant_id: str, property_id: str | None = None) -> None:
+    if claims["role"] != "owner":
+        authorize_user(claims, tenant_id)
+    elif not db.scalar(select(_owner_tenant_links(claims["sub"], [tenant_id], property_id).exists())):
+        raise HTTPException(status_code=403, detail="Not allowed for this user")
+
+
 @app.get("/tenants/{tenant_id}", response_model=TenantDetailsResponse)
-def get_tenant(tenant_id: str, db: Session = Depends(get_db)) -> TenantDetailsResponse:
+@db_endpoint
+def get_tenant(
+    tenant_id: str, claims: dict = Depends(require_claims), db: Session = Depends(get_db)
+) -> TenantDetailsResponse:
+    # Owners look up the tenants who scan their QR codes; tenants only see themselves.
+    authorize_tenant_read(db, claims, tenant_id)
     tenant = db.get(User, tenant_id)
     if tenant is None or tenant.role != "tenant":
         raise HTTPException(status_code=404, detail="Tenant not found")
 
+    return _tenant_details_response(tenant)
+
+
+def _tenant_details_response(tenant: User) -> TenantDetailsResponse:
     return TenantDetailsResponse(
         id=tenant.id,
         full_name=tenant.full_name,
@@ -308,50 +914,262 @@ def get_tenant(tenant_id: str, db: Session = Depends(get_db)) -> TenantDetailsRe
     )
 
 
+@app.post("/tenants:batchGet", response_model=TenantBatchGetResponse)
+@db_endpoint
+def batch_get_tenants(
+    payload: BatchGetRequest, claims: dict = Depends(require_claims), db: Session = Depends(get_db)
+) -> TenantBatchGetResponse:
+    canonical = _canonical_ids(payload.ids)
+    # The same rules as GET /tenants/{tenant_id}, applied per id: tenants only see themselves, owners only tenants
+    # linked to one of their properties.
+    denied: dict[str, HTTPException] = {}
+    owner_id = claims["sub"] if claims["role"] == "owner" else None
+    if owner_id is None:
+        for item in {item for item in canonical.values() if item is not None}:
+            try:
+                authorize_user(claims, item)
+            except HTTPException as exc:
+                denied[item] = exc
+
+    tenant_ids = sorted({item for item in canonical.values() if item is not None and item not in denied})
+    found: dict[str, TenantDetailsResponse] = {}
+    if tenant_ids:
+        query = select(User).where(User.id.in_(tenant_ids), User.role == "tenant")
+        if owner_id is not None:
+            query = query.where(User.id.in_(_owner_tenant_links(owner_id, tenant_ids)))
+        for tenant in db.scalars(query):
+            found[tenant.id] = _tenant_details_response(tenant)
+    if owner_id is not None:
+        # Like the single read, an owner learns nothing about tenants outside their properties, not even existence.
+        forbidden = HTTPException(status_code=403, detail="Not allowed for this user")
+        denied.update({item: forbidden for item in tenant_ids if item not in found})
+
+    results = []
+    for item in payload.ids:
+        key = canonical[item]
+        if key is None:
+            results.append(TenantBatchGetResult(id=item, error=BatchGetError(status=400, detail="Invalid tenant id")))
+        elif key in denied:
+            results.append(TenantBatchGetResult(id=item, error=BatchGetError(status=denied[key].status_code, detail=denied[key].detail)))
+        elif key in found:
+            results.append(TenantBatchGetResult(id=item, tenant=found[key]))
+        else:
+            results.append(TenantBatchGetResult(id=item, error=BatchGetError(status=404, detail="Tenant not found")))
+    return TenantBatchGetResponse(results=results)
+
+
 @app.get("/tenants/{tenant_id}/dashboard", response_model=TenantDashboardResponse)
-def tenant_dashboard(tenant_id: str, db: Session = Depends(get_db)) -> TenantDashboardResponse:
-    tenant = db.get(User, tenant_id)
-    if tenant is None or tenant.role != "tenant":
+@db_endpoint
+def tenant_dashboard(
+    tenant_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> TenantDashboardResponse:
+    authorize_user(claims, tenant_id)
+    # The dashboard shows the assigned property's card, so it is as fresh as that property's revision.
+    revision = revision_of(PROPERTY_SCOPE, User.assigned_property_id)
+    if if_none_match is not None:
+        probe = db.execute(select(User.role, User.assigned_property_id, revision).where(User.id == tenant_id)).first()
+        if probe is not None and probe.role == "tenant" and probe.assigned_property_id is not None:
+            etag = make_etag("dashboard", tenant_id, probe.assigned_property_id, probe[2])
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    owner = aliased(User)
+    result = db.execute(
+        select(User.role, User.assigned_property_id, Property, owner.phone, revision)
+        .outerjoin(Property, Property.id == User.assigned_property_id)
+        .outerjoin(owner, Property.owner.of_type(owner))
+        .where(User.id == tenant_id)
+    ).first()
+    if result is None or result.role != "tenant":
         raise HTTPException(status_code=404, detail="Tenant not found")
 
-    if tenant.assigned_property_id is None:
+    _, assigned_property_id, property_row, owner_phone, property_revision = result
+    if assigned_property_id is None:
         raise HTTPException(status_code=404, detail="Tenant has no property assigned")
 
-    property_row = db.get(Property, tenant.assigned_property_id)
     if property_row is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    owner = db.get(User, property_row.owner_id)
+    response.headers.update(_etag_headers(make_etag("dashboard", tenant_id, assigned_property_id, property_revision)))
     return TenantDashboardResponse(
         property=_property_card(property_row),
-        owner_phone=owner.phone if owner else "",
+        owner_phone=owner_phone or "",
         rent=property_row.rent,
     )
 
 
+@app.get("/tenants/{tenant_id}/notifications", response_model=NotificationInboxResponse)
+@db_endpoint
+def tenant_notifications(
+    tenant_id: str,
+    limit: int = Query(default=INBOX_PAGE_DEFAULT_LIMIT, ge=1, le=INBOX_PAGE_MAX_LIMIT),
+    before: str | None = None,
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> NotificationInboxResponse:
+    authorize_user(claims, tenant_id)
+    tenant = _inbox_tenant(db, tenant_id)
+    read_cursor = db.get(NotificationReadCursor, tenant_id)
+    last_read_cursor = _encode_cursor(read_cursor.last_read_at, read_cursor.last_read_id) if read_cursor else None
+    if tenant.assigned_property_id is None:
+        return NotificationInboxResponse(
+            notifications=[], unread_count=0, unread_capped=False, next_cursor=None, last_read_cursor=last_read_cursor
+        )
+
+    # Feed pages are range scans of ix_notifications_property_created (property_id, created_at, id).
+    query = select(Notification).where(Notification.property_id == tenant.assigned_property_id)
+    if before is not None:
+        query = query.where(tuple_(Notification.created_at, Notification.id) < _decode_cursor(before))
+    rows = list(
+        db.scalars(query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1)).all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    read_key = (read_cursor.last_read_at, read_cursor.last_read_id) if read_cursor else None
+    unread_count = _unread_count(db, tenant.assigned_property_id, read_cursor)
+    return NotificationInboxResponse(
+        notifications=[
+            NotificationResponse(
+                id=row.id,
+                property_id=row.property_id,
+                title=row.title,
+                body=row.body,
+                created_at=row.created_at,
+                read=read_key is not None and (row.created_at, row.id) <= read_key,
+            )
+            for row in rows
+        ],
+        unread_count=min(unread_count, INBOX_UNREAD_CAP),
+        unread_capped=unread_count > INBOX_UNREAD_CAP,
+        next_cursor=_encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+        last_read_cursor=last_read_cursor,
+    )
+
+
+@app.post("/tenants/{tenant_id}/notifications/read", response_model=NotificationReadResponse)
+@db_endpoint
+def mark_tenant_notifications_read(
+    tenant_id: str,
+    payload: NotificationReadRequest,
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> NotificationReadResponse:
+    authorize_user(claims, tenant_id)
+    tenant = _inbox_tenant(db, tenant_id)
+    if payload.cursor is not None:
+        target = _decode_cursor(payload.cursor)
+    elif tenant.assigned_property_id is not None:
+        newest = db.execute(
+            select(Notification.created_at, Notification.id)
+            .where(Notification.property_id == tenant.assigned_property_id)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())
+            .limit(1)
+        ).first()
+        target = tuple(newest) if newest is not None else None
+    else:
+        target = None
+
+    # Marking read moves a single per-user cursor forward; no per-notification rows are touched.
+    read_cursor = db.get(NotificationReadCursor, tenant_id)
+    if target is not None:
+        if read_cursor is None:
+            read_cursor = NotificationReadCursor(user_id=tenant_id, last_read_at=target[0], last_read_id=target[1])
+            db.add(read_cursor)
+        elif target > (read_cursor.last_read_at, read_cursor.last_read_id):
+            read_cursor.last_read_at, read_cursor.last_read_id = target
+        db.commit()
+
+    unread_count = _unread_count(db, tenant.assigned_property_id, read_cursor) if tenant.assigned_property_id else 0
+    return NotificationReadResponse(
+        last_read_cursor=_encode_cursor(read_cursor.last_read_at, read_cursor.last_read_id) if read_cursor else None,
+        unread_count=min(unread_count, INBOX_UNREAD_CAP),
+        unread_capped=unread_count > INBOX_UNREAD_CAP,
+    )
+
+
 @app.get("/properties/{property_id}/chat", response_model=list[ChatMessageResponse])
-def list_chat_messages(property_id: str, db: Session = Depends(get_db)) -> list[ChatMessageResponse]:
-    group = db.scalar(select(ChatGroup).where(ChatGroup.property_id == property_id))
+@db_endpoint
+def list_chat_messages(
+    property_id: str,
+    response: Response,
+    limit: int = Query(default=CHAT_PAGE_DEFAULT_LIMIT, ge=1, le=CHAT_PAGE_MAX_LIMIT),
+    before: str | None = None,
+    after: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> list[ChatMessageResponse]:
+    if before is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+
+    # The newest message's id versions the whole group; it is one index seek, fetched with the group lookup.
+    latest_id = (
+        select(ChatMessage.id)
+        .where(ChatMessage.group_id == ChatGroup.id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    group = db.execute(select(ChatGroup.id, latest_id).where(ChatGroup.property_id == property_id)).first()
     if group is None:
         raise HTTPException(status_code=404, detail="Chat group not found")
 
-    rows = db.scalars(select(ChatMessage).where(ChatMessage.group_id == group.id).order_by(ChatMessage.created_at)).all()
-    return [
-        ChatMessageResponse(
-            id=row.id,
-            group_id=row.group_id,
-            sender_id=row.sender_id,
-            sender_name=row.sender_name,
-            text=row.text,
-            image_url=row.image_url,
-            created_at=row.created_at,
-        )
-        for row in rows
-    ]
+    group_id = group[0]
+    etag = make_etag("chat", group_id, group[1], limit, before, after)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(_etag_headers(etag))
+
+    # Keyset pagination on (created_at, id): every page is an index range scan of at most limit + 1 rows.
+    key = tuple_(ChatMessage.created_at, ChatMessage.id)
+    query = (select(*CHAT_MESSAGE_COLUMNS) if FAST_JSON_RESPONSES else select(ChatMessage)).where(ChatMessage.group_id == group_id)
+    if after is not None:
+        query = query.where(key > _decode_cursor(after))
+        query = query.order_by(ChatMessage.created_at, ChatMessage.id)
+    else:
+        if before is not None:
+            query = query.where(key < _decode_cursor(before))
+        query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+
+    result = db.execute(query.limit(limit + 1))
+    rows = list(result.all() if FAST_JSON_RESPONSES else result.scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after is None:
+        rows.reverse()
+
+    if rows:
+        response.headers["X-Chat-Before-Cursor"] = _encode_chat_cursor(rows[0])
+        response.headers["X-Chat-After-Cursor"] = _encode_chat_cursor(rows[-1])
+    elif after is not None:
+        response.headers["X-Chat-After-Cursor"] = after
+    response.headers["X-Chat-Has-More"] = "true" if has_more else "false"
+    if FAST_JSON_RESPONSES:
+        # A returned Response skips the merge of headers set on the injected one, so they are carried over here.
+        return FastJSONResponse([row._asdict() for row in rows], headers=response.headers)
+    return [_chat_message_response(row) for row in rows]
 
 
 @app.post("/properties/{property_id}/chat", response_model=ChatMessageResponse, status_code=201)
-def post_chat_message(property_id: str, payload: ChatMessageCreate, db: Session = Depends(get_db)) -> ChatMessageResponse:
+@db_endpoint
+def post_chat_message(
+    property_id: str,
+    payload: ChatMessageCreate,
+    response: Response,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> ChatMessageResponse:
+    # A replayed send returns the stored message and is not published to live subscribers a second time.
+    return idempotency_store.run(
+        idempotency_key, f"chat:{property_id}", payload, response, lambda: _post_chat_message(db, property_id, payload)
+    )
+
+
+def _post_chat_message(db: Session, property_id: str, payload: ChatMessageCreate) -> ChatMessageResponse:
     group = db.scalar(select(ChatGroup).where(ChatGroup.property_id == property_id))
     if group is None:
         raise HTTPException(status_code=404, detail="Chat group not found")
@@ -381,18 +1199,54 @@ def post_chat_message(property_id: str, payload: ChatMessageCreate, db: Session
     db.commit()
     db.refresh(row)
 
-    return ChatMessageResponse(
-        id=row.id,
-        group_id=row.group_id,
-        sender_id=row.sender_id,
-        sender_name=row.sender_name,
-        text=row.text,
-        image_url=row.image_url,
-        created_at=row.created_at,
+    chat_hub.publish(group.id, _chat_event(row))
+    return _chat_message_response(row)
+
+
+# The subscriber is the token's subject; a user_id, if one is still sent, has to match it.
+@app.websocket("/properties/{property_id}/chat/ws")
+async def chat_websocket(
+    websocket: WebSocket, property_id: str, user_id: str | None = None, access_token: str | None = None
+) -> None:
+    try:
+        claims = websocket_claims(websocket.headers.get("authorization"), access_token)
+        authorize_user(claims, user_id or claims["sub"])
+        group_id = await run_in_threadpool(_chat_subscription_group, property_id, claims["sub"])
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
+        return
+
+    await websocket.accept()
+    subscription = chat_hub.subscribe(group_id)
+
+    async def forward_events() -> None:
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    forwarder = asyncio.create_task(forward_events())
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forwarder.cancel()
+        chat_hub.unsubscribe(subscription)
+
+
+@app.get("/properties/{property_id}/chat/stream")
+async def chat_event_stream(property_id: str, user_id: str | None = None, claims: dict = Depends(require_claims)) -> StreamingResponse:
+    authorize_user(claims, user_id or claims["sub"])
+    group_id = await run_in_threadpool(_chat_subscription_group, property_id, claims["sub"])
+    return StreamingResponse(
+        _chat_sse_events(group_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.post("/properties/{property_id}/tenants/join-requests", response_model=JoinRequestResponse, status_code=201)
+@db_endpoint
 def request_join_property(property_id: str, payload: JoinRequestCreate, db: Session = Depends(get_db)) -> JoinRequestResponse:
     property_row = db.get(Property, property_id)
     if property_row is None:
@@ -406,7 +1260,7 @@ def request_join_property(property_id: str, payload: JoinRequestCreate, db: Sess
             full_name="Tenant User",
             phone=f"tenant-{payload.tenant_id}",
             email=f"{payload.tenant_id}@rentory.local",
-            password_hash=_hash_password("demo"),
+            password_hash=UNUSABLE_PASSWORD_HASH,
         )
         db.add(tenant)
 
@@ -418,8 +1272,10 @@ def request_join_property(property_id: str, payload: JoinRequestCreate, db: Sess
         created_at=datetime.utcnow(),
     )
     db.add(row)
+    bump_revision(db, PROPERTY_SCOPE, property_id)
     db.commit()
     db.refresh(row)
+    response_cache.invalidate(property_details_key(property_id))
 
     return JoinRequestResponse(
         id=row.id,
@@ -431,7 +1287,17 @@ def request_join_property(property_id: str, payload: JoinRequestCreate, db: Sess
 
 
 @app.post("/payments", response_model=PaymentResponse, status_code=201)
-def create_payment(payload: PaymentCreate, db: Session = Depends(get_db)) -> PaymentResponse:
+@db_endpoint
+def create_payment(
+    payload: PaymentCreate,
+    response: Response,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> PaymentResponse:
+    return idempotency_store.run(idempotency_key, "payments", payload, response, lambda: _create_payment(db, payload))
+
+
+def _create_payment(db: Session, payload: PaymentCreate) -> PaymentResponse:
     if db.get(Property, payload.property_id) is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
@@ -443,7 +1309,7 @@ def create_payment(payload: PaymentCreate, db: Session = Depends(get_db)) -> Pay
             full_name="Tenant User",
             phone=f"tenant-{payload.tenant_id}",
             email=f"{payload.tenant_id}@rentory.local",
-            password_hash=_hash_password("demo"),
+            password_hash=UNUSABLE_PASSWORD_HASH,
         )
         db.add(tenant)
 
@@ -454,16 +1320,9 @@ def create_payment(payload: PaymentCreate, db: Session = Depends(get_db)) -> Pay
         bill_type=payload.bill_type,
         amount=payload.amount,
     )
-    bill = Bill(
-        id=str(uuid4()),
-        property_id=payload.property_id,
-        tenant_id=payload.tenant_id,
-        bill_type=payload.bill_type,
-        amount=payload.amount,
-        status="paid",
-    )
     db.add(payment)
-    db.add(bill)
+    # The payment is credited to the tenant's ledger instead of being copied into a "paid" bill row.
+    post_entry(db, payload.property_id, payload.tenant_id, "payment", payload.bill_type, payload.amount, payment.id)
     db.commit()
     db.refresh(payment)
 
@@ -477,35 +1336,114 @@ def create_payment(payload: PaymentCreate, db: Session = Depends(get_db)) -> Pay
     )
 
 
+@app.get("/properties/{property_id}/tenants/{tenant_id}/balance", response_model=LedgerBalanceResponse)
+@db_endpoint
+def tenant_balance(
+    property_id: str, tenant_id: str, claims: dict = Depends(require_claims), db: Session = Depends(get_db)
+) -> LedgerBalanceResponse:
+    authorize_tenant_read(db, claims, tenant_id, property_id)
+    balance = account_balance(db, property_id, tenant_id)
+    return LedgerBalanceResponse(
+        property_id=property_id,
+        tenant_id=tenant_id,
+        balance=balance.balance,
+        charged_total=balance.charged_total,
+        paid_total=balance.paid_total,
+        as_of_seq=balance.seq,
+    )
+
+
+@app.get("/properties/{property_id}/tenants/{tenant_id}/statement", response_model=LedgerStatementResponse)
+@db_endpoint
+def tenant_statement(
+    property_id: str,
+    tenant_id: str,
+    limit: int = Query(default=STATEMENT_PAGE_DEFAULT_LIMIT, ge=1, le=STATEMENT_PAGE_MAX_LIMIT),
+    before: int | None = Query(default=None, ge=1),
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> LedgerStatementResponse:
+    authorize_tenant_read(db, claims, tenant_id, property_id)
+    lines, has_more = account_statement(db, property_id, tenant_id, limit, before)
+    return LedgerStatementResponse(
+        entries=[
+            LedgerEntryResponse(
+                seq=entry.seq,
+                entry_type=entry.entry_type,
+                bill_type=entry.bill_type,
+                amount=entry.amount,
+                balance_after=balance_after,
+                reference_id=entry.reference_id,
+                created_at=entry.created_at,
+            )
+            for entry, balance_after in lines
+        ],
+        next_before=lines[-1][0].seq if has_more else None,
+    )
+
+
 @app.post("/notifications/broadcast", response_model=BroadcastResponse, status_code=202)
+@db_endpoint
 def broadcast(payload: BroadcastCreate, db: Session = Depends(get_db)) -> BroadcastResponse:
     owner = db.get(User, payload.owner_id)
     if owner is None or owner.role != "owner":
         raise HTTPException(status_code=404, detail="Owner not found")
 
-    target_property_ids = payload.property_ids
-    if not target_property_ids:
-        target_property_ids = [p.id for p in db.scalars(select(Property).where(Property.owner_id == payload.owner_id)).all()]
-
-    created_ids: list[str] = []
-    for property_id in target_property_ids:
-        notification = Notification(
-            id=str(uuid4()),
-            owner_id=payload.owner_id,
-            property_id=property_id,
-            title=payload.title,
-            body=payload.body,
-        )
-        db.add(notification)
-        created_ids.append(notification.id)
-
+    if not notification_worker.accepting():
+        raise HTTPException(status_code=503, detail="Notification queue is full", headers={"Retry-After": "5"})
+
+    # Only the job is written here; the worker expands it to per-property notifications and per-tenant
+    # deliveries, so the request costs the same for one property or ten thousand.
+    job_id = str(uuid4())
+    job = NotificationJob(
+        id=job_id,
+        owner_id=payload.owner_id,
+        title=payload.title,
+        body=payload.body,
+        property_ids=payload.property_ids or None,
+        status="queued",
+    )
+    db.add(job)
     db.commit()
-    return BroadcastResponse(queued=True, notification_ids=created_ids)
+    notification_worker.enqueue(job_id)
+    return BroadcastResponse(queued=True, job_id=job_id, notification_ids=[])
+
+
+@app.get("/notifications/jobs/{job_id}", response_model=NotificationJobResponse)
+@db_endpoint
+def get_notification_job(job_id: str, db: Session = Depends(get_db)) -> NotificationJobResponse:
+    job = db.get(NotificationJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Notification job not found")
+
+    return NotificationJobResponse(
+        id=job.id,
+        owner_id=job.owner_id,
+        status=job.status,
+        attempts=job.attempts,
+        notification_count=job.notification_count,
+        delivery_count=job.delivery_count,
+        error=job.error,
+        created_at=job.created_at,
+    )
 
 
 @app.post("/maintenance-tickets", response_model=MaintenanceResponse, status_code=201)
-def create_maintenance(payload: MaintenanceCreate, db: Session = Depends(get_db)) -> MaintenanceResponse:
-    if db.get(Property, payload.property_id) is None:
+@db_endpoint
+def create_maintenance(
+    payload: MaintenanceCreate,
+    response: Response,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> MaintenanceResponse:
+    return idempotency_store.run(
+        idempotency_key, "maintenance-tickets", payload, response, lambda: _create_maintenance(db, payload)
+    )
+
+
+def _create_maintenance(db: Session, payload: MaintenanceCreate) -> MaintenanceResponse:
+    owner_id = db.scalar(select(Property.owner_id).where(Property.id == payload.property_id))
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
     tenant = db.get(User, payload.tenant_id)
@@ -516,22 +1454,28 @@ def create_maintenance(payload: MaintenanceCreate, db: Session = Depends(get_db)
             full_name="Tenant User",
             phone=f"tenant-{payload.tenant_id}",
             email=f"{payload.tenant_id}@rentory.local",
-            password_hash=_hash_password("demo"),
+            password_hash=UNUSABLE_PASSWORD_HASH,
         )
         db.add(tenant)
 
     row = MaintenanceTicket(
         id=str(uuid4()),
         property_id=payload.property_id,
+        owner_id=owner_id,
         tenant_id=payload.tenant_id,
         issue_title=payload.issue_title,
         issue_description=payload.issue_description,
         status="open",
+        created_at=datetime.utcnow(),
     )
     db.add(row)
+    record_ticket_created(db, owner_id, payload.property_id)
+    response = _maintenance_response(row)
     db.commit()
-    db.refresh(row)
+    return response
+
 
+def _maintenance_response(row: MaintenanceTicket) -> MaintenanceResponse:
     return MaintenanceResponse(
         id=row.id,
         property_id=row.property_id,
@@ -541,3 +1485,81 @@ def create_maintenance(payload: MaintenanceCreate, db: Session = Depends(get_db)
         status=row.status,
         created_at=row.created_at,
     )
+
+
+@app.patch("/maintenance-tickets/{ticket_id}", response_model=MaintenanceResponse)
+@db_endpoint
+def update_maintenance_status(
+    ticket_id: str,
+    payload: MaintenanceStatusUpdate,
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> MaintenanceResponse:
+    ticket = db.get(MaintenanceTicket, ticket_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    authorize_user(claims, ticket.owner_id or db.scalar(select(Property.owner_id).where(Property.id == ticket.property_id)))
+    try:
+        row = transition_ticket(db, ticket_id, payload.status, payload.expected_status)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail="Ticket not found") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except TicketConflict as exc:
+        raise HTTPException(status_code=409, detail=f"Ticket is now {exc.current_status}") from exc
+
+    response = _maintenance_response(row)
+    db.commit()
+    return response
+
+
+def _ticket_page(
+    db: Session, scope, status_filter: str | None, limit: int, before: str | None
+) -> tuple[list[MaintenanceResponse], str | None]:
+    query = select(MaintenanceTicket).where(scope)
+    if status_filter is not None:
+        query = query.where(MaintenanceTicket.status == status_filter)
+    if before is not None:
+        query = query.where(tuple_(MaintenanceTicket.created_at, MaintenanceTicket.id) < _decode_cursor(before))
+    rows = list(
+        db.scalars(query.order_by(MaintenanceTicket.created_at.desc(), MaintenanceTicket.id.desc()).limit(limit + 1)).all()
+    )
+    next_cursor = _encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return [_maintenance_response(row) for row in rows[:limit]], next_cursor
+
+
+@app.get("/owners/{owner_id}/maintenance-tickets", response_model=MaintenanceListResponse)
+@db_endpoint
+def list_owner_maintenance(
+    owner_id: str,
+    status_filter: TicketStatus | None = Query(default=None, alias="status"),
+    limit: int = Query(default=TICKET_PAGE_DEFAULT_LIMIT, ge=1, le=TICKET_PAGE_MAX_LIMIT),
+    before: str | None = None,
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> MaintenanceListResponse:
+    authorize_user(claims, owner_id)
+    # Pages are range scans of ix_maintenance_tickets_owner_status / _owner_created; counts come from the
+    # maintained per-property counters rather than COUNT(*) over the tickets.
+    tickets, next_cursor = _ticket_page(db, MaintenanceTicket.owner_id == owner_id, status_filter, limit, before)
+    return MaintenanceListResponse(tickets=tickets, counts=status_counts(db, owner_id=owner_id), next_cursor=next_cursor)
+
+
+@app.get("/properties/{property_id}/maintenance-tickets", response_model=MaintenanceListResponse)
+@db_endpoint
+def list_property_maintenance(
+    property_id: str,
+    status_filter: TicketStatus | None = Query(default=None, alias="status"),
+    limit: int = Query(default=TICKET_PAGE_DEFAULT_LIMIT, ge=1, le=TICKET_PAGE_MAX_LIMIT),
+    before: str | None = None,
+    claims: dict = Depends(require_claims),
+    db: Session = Depends(get_db),
+) -> MaintenanceListResponse:
+    owner_id = db.scalar(select(Property.owner_id).where(Property.id == property_id))
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    authorize_user(claims, owner_id)
+    tickets, next_cursor = _ticket_page(db, MaintenanceTicket.property_id == property_id, status_filter, limit, before)
+    return MaintenanceListResponse(
+        tickets=tickets, counts=status_counts(db, property_id=property_id), next_cursor=next_cursor
+    )
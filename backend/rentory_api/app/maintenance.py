@@ -0,0 +1,115 @@
+import argparse
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .database import SessionLocal
+from .models import MaintenanceStatusCount, MaintenanceTicket, Property
+
+TICKET_STATUSES = ("open", "in_progress", "resolved", "closed")
+TICKET_TRANSITIONS = {
+    "open": {"in_progress", "resolved", "closed"},
+    "in_progress": {"open", "resolved", "closed"},
+    "resolved": {"open", "closed"},
+    "closed": {"open"},
+}
+
+
+class TicketConflict(Exception):
+    def __init__(self, current_status: str) -> None:
+        super().__init__(current_status)
+        self.current_status = current_status
+
+
+# Counters never go below zero: a ticket created before the counters existed has nothing to take away from its
+# old status until rebuild_status_counts() has run, and the migration runs it once for such databases.
+def _bump_count(db: Session, owner_id: str, property_id: str, status: str, delta: int) -> None:
+    updated = db.execute(
+        update(MaintenanceStatusCount)
+        .where(MaintenanceStatusCount.property_id == property_id, MaintenanceStatusCount.status == status)
+        .values(count=case((MaintenanceStatusCount.count + delta < 0, 0), else_=MaintenanceStatusCount.count + delta))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(MaintenanceStatusCount(property_id=property_id, status=status, owner_id=owner_id, count=max(delta, 0)))
+    except IntegrityError:
+        _bump_count(db, owner_id, property_id, status, delta)
+
+
+# The record/transition helpers run inside the caller's transaction, so the counters commit (or roll back)
+# together with the ticket row they describe.
+def record_ticket_created(db: Session, owner_id: str, property_id: str) -> None:
+    _bump_count(db, owner_id, property_id, "open", 1)
+
+
+def transition_ticket(db: Session, ticket_id: str, to_status: str, expected_status: str | None = None) -> MaintenanceTicket:
+    ticket = db.get(MaintenanceTicket, ticket_id)
+    if ticket is None:
+        raise LookupError(ticket_id)
+    from_status = expected_status or ticket.status
+    if to_status not in TICKET_TRANSITIONS.get(from_status, ()):
+        raise ValueError(f"Cannot move a ticket from {from_status} to {to_status}")
+
+    # Compare-and-set: the update only applies if nobody moved the ticket since `from_status` was read.
+    moved = db.execute(
+        update(MaintenanceTicket)
+        .where(MaintenanceTicket.id == ticket_id, MaintenanceTicket.status == from_status)
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not moved:
+        db.rollback()
+        raise TicketConflict(db.scalar(select(MaintenanceTicket.status).where(MaintenanceTicket.id == ticket_id)))
+
+    owner_id = ticket.owner_id or db.scalar(select(Property.owner_id).where(Property.id == ticket.property_id))
+    _bump_count(db, owner_id, ticket.property_id, from_status, -1)
+    _bump_count(db, owner_id, ticket.property_id, to_status, 1)
+    set_committed_value(ticket, "status", to_status)
+    return ticket
+
+
+def status_counts(db: Session, owner_id: str | None = None, property_id: str | None = None) -> dict[str, int]:
+    query = select(MaintenanceStatusCount.status, func.sum(MaintenanceStatusCount.count))
+    if owner_id is not None:
+        query = query.where(MaintenanceStatusCount.owner_id == owner_id)
+    if property_id is not None:
+        query = query.where(MaintenanceStatusCount.property_id == property_id)
+    counts = dict.fromkeys(TICKET_STATUSES, 0)
+    counts.update({status: int(count) for status, count in db.execute(query.group_by(MaintenanceStatusCount.status))})
+    return counts
+
+
+# Fills in owner_id on tickets created before it existed and recomputes every counter from the tickets.
+def rebuild_status_counts(db: Session) -> int:
+    db.execute(
+        update(MaintenanceTicket)
+        .where(MaintenanceTicket.owner_id.is_(None))
+        .values(owner_id=select(Property.owner_id).where(Property.id == MaintenanceTicket.property_id).scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(delete(MaintenanceStatusCount))
+    rows = db.execute(
+        insert(MaintenanceStatusCount).from_select(
+            ["property_id", "status", "owner_id", "count"],
+            select(
+                MaintenanceTicket.property_id,
+                MaintenanceTicket.status,
+                MaintenanceTicket.owner_id,
+                func.count(MaintenanceTicket.id),
+            ).group_by(MaintenanceTicket.property_id, MaintenanceTicket.status, MaintenanceTicket.owner_id),
+        )
+    ).rowcount
+    db.commit()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute maintenance ticket status counters from the tickets table")
+    parser.parse_args()
+    with SessionLocal() as session:
+        print(f"{rebuild_status_counts(session)} status counters rebuilt")
@@ -0,0 +1,312 @@
+import bisect
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Requests slower than this are written out as folded stacks; 0 leaves the sampling profiler off.
+PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "0"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "./rentory_profiles"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+STATEMENT_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: one count per bucket (non-cumulative; summed on render), then sum and count.
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]:g}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, kind: str = "gauge") -> None:
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount: int) -> None:
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", f"{self.name} {self.value}"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.value = 0
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners cannot grow the series without bound.
+    return getattr(route, "path", None) or "unmatched"
+
+
+@dataclass
+class RequestStats:
+    scope: dict
+    started: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_seconds: float = 0.0
+    threads: set[int] = field(default_factory=set)
+    samples: Counter = field(default_factory=Counter)
+
+    # The router records the matched route on the ASGI scope before the endpoint runs.
+    @property
+    def route(self) -> str:
+        return _route_label(self.scope)
+
+
+# Set by the middleware for the length of a request. The stats object is mutated in place, so SQL run in a
+# threadpool thread or an AsyncSession greenlet (both see a copy of this context) is counted on the request.
+_current_request: ContextVar[RequestStats | None] = ContextVar("rentory_request_stats", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.request_seconds = Histogram(
+            "rentory_http_request_duration_seconds",
+            "Time from receiving a request to sending the last body chunk.",
+            ("method", "route", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.request_db_seconds = Histogram(
+            "rentory_http_request_db_seconds",
+            "Time a request spent executing SQL; the rest of its latency is ORM, validation and serialization.",
+            ("route",),
+            LATENCY_BUCKETS,
+        )
+        self.request_statements = Histogram(
+            "rentory_http_request_db_statements",
+            "SQL statements executed per request.",
+            ("route",),
+            COUNT_BUCKETS,
+        )
+        self.statement_seconds = Histogram(
+            "rentory_db_statement_duration_seconds",
+            "SQL statement execution time, by calling route (or background) and statement kind.",
+            ("route", "operation"),
+            STATEMENT_BUCKETS,
+        )
+        self.in_flight = Gauge("rentory_http_requests_in_flight", "Requests currently being handled.")
+        self.profiles = Gauge("rentory_slow_request_profiles_total", "Slow request profiles written to PROFILE_DIR.", "counter")
+        self._metrics = (
+            self.request_seconds,
+            self.request_db_seconds,
+            self.request_statements,
+            self.statement_seconds,
+            self.in_flight,
+            self.profiles,
+        )
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("rentory_statement_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["rentory_statement_started"].pop()
+    stats = _current_request.get()
+    operation = statement.lstrip()[:6].upper()
+    if operation not in STATEMENT_OPERATIONS:
+        operation = "OTHER"
+    metrics.statement_seconds.observe(elapsed, stats.route if stats is not None else "background", operation)
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        stats.threads.add(threading.get_ident())
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time so the stack stays aligned.
+    started = context.connection.info.get("rentory_statement_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(bind: Engine) -> None:
+    if event.contains(bind, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+    event.listen(bind, "after_cursor_execute", _after_cursor_execute)
+    event.listen(bind, "handle_error", _handle_error)
+
+
+def _folded_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+# Samples the stacks of the threads each in-flight request has been seen on (the event loop thread, plus any
+# thread that ran SQL for it) and writes requests slower than the threshold out in the folded format that
+# flamegraph.pl, speedscope and inferno read. The event loop thread is shared, so under concurrency its
+# samples are attributed to every request in flight at the time.
+class SlowRequestProfiler:
+    def __init__(
+        self,
+        threshold_ms: float = PROFILE_SLOW_REQUEST_MS,
+        interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS,
+        directory: Path = PROFILE_DIR,
+    ) -> None:
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self._requests: dict[int, RequestStats] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def begin(self, stats: RequestStats) -> None:
+        with self._lock:
+            self._requests[id(stats)] = stats
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def end(self, stats: RequestStats, method: str, duration: float) -> Path | None:
+        with self._lock:
+            self._requests.pop(id(stats), None)
+            if not self._requests:
+                self._wake.clear()
+            samples = Counter(stats.samples)
+        if duration < self.threshold or not samples:
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        route = re.sub(r"[^A-Za-z0-9]+", "_", stats.route).strip("_") or "root"
+        path = self.directory / f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{route}-{duration * 1000:.0f}ms.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.most_common()))
+        metrics.profiles.add(1)
+        return path
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for stats in self._requests.values():
+                    for thread_id in stats.threads:
+                        frame = frames.get(thread_id)
+                        if frame is not None and thread_id != own:
+                            stats.samples[_folded_stack(frame)] += 1
+
+
+profiler = SlowRequestProfiler()
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        stats.threads.add(threading.get_ident())
+        token = _current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight.add(1)
+        if profiler.enabled:
+            profiler.begin(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - stats.started
+            _current_request.reset(token)
+            metrics.in_flight.add(-1)
+            route = stats.route
+            metrics.request_seconds.observe(duration, scope["method"], route, str(status_code))
+            metrics.request_db_seconds.observe(stats.db_seconds, route)
+            metrics.request_statements.observe(stats.statements, route)
+            if profiler.enabled:
+                profiler.end(stats, scope["method"], duration)
@@ -0,0 +1,96 @@
+from sqlalchemy import func, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .database import Base, engine
+from .image_store import InvalidImage, store_data_uri
+from .maintenance import rebuild_status_counts
+from .models import MaintenanceStatusCount, MaintenanceTicket, Property
+from .revisions import OWNER_SCOPE, PROPERTY_SCOPE, bump_revision
+
+
+# create_all() never alters existing tables, so nullable columns added to app/models.py later are added here.
+def ensure_columns(bind: Engine) -> list[str]:
+    inspector = inspect(bind)
+    added: list[str] = []
+    for table in Base.metadata.tables.values():
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+# create_all() only builds indexes together with brand-new tables, so databases created before an
+# index was declared in app/models.py need this pass to pick it up. It is idempotent and runs on startup.
+def ensure_indexes(bind: Engine) -> list[str]:
+    inspector = inspect(bind)
+    created: list[str] = []
+    for table in Base.metadata.tables.values():
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda item: item.name):
+            if index.name in existing:
+                continue
+            index.create(bind)
+            created.append(index.name)
+    return created
+
+
+# Moves inline data-URI images written before the blob store existed out of the properties table.
+# Rows whose data URI cannot be decoded are left untouched.
+def externalize_property_images(bind: Engine, batch_size: int = 100) -> int:
+    moved = 0
+    last_id: str | None = None
+    with Session(bind) as db:
+        while True:
+            query = select(Property).where(Property.image_url.like("data:%"))
+            # No lower bound on the first batch: "" is not a valid UUID literal on PostgreSQL.
+            if last_id is not None:
+                query = query.where(Property.id > last_id)
+            rows = db.scalars(query.order_by(Property.id).limit(batch_size)).all()
+            if not rows:
+                return moved
+            for row in rows:
+                try:
+                    row.image_url = store_data_uri(row.image_url)
+                    bump_revision(db, PROPERTY_SCOPE, row.id)
+                    bump_revision(db, OWNER_SCOPE, row.owner_id)
+                    moved += 1
+                except InvalidImage:
+                    pass
+            last_id = rows[-1].id
+            db.commit()
+
+
+# Databases with tickets from before the status counters existed get their counters built from the tickets once;
+# afterwards every ticket is counted exactly once and the totals agree.
+def backfill_status_counts(bind: Engine) -> bool:
+    with Session(bind) as db:
+        tickets = db.scalar(select(func.count(MaintenanceTicket.id)))
+        counted = db.scalar(select(func.coalesce(func.sum(MaintenanceStatusCount.count), 0)))
+        if tickets == counted:
+            return False
+        rebuild_status_counts(db)
+        return True
+
+
+def migrate(bind: Engine) -> list[str]:
+    Base.metadata.create_all(bind=bind)
+    changes = ensure_columns(bind) + ensure_indexes(bind)
+    if backfill_status_counts(bind):
+        changes.append("maintenance_status_counts")
+    return changes
+
+
+if __name__ == "__main__":
+    for name in migrate(engine):
+        print(f"added {name}")
+    print(f"moved {externalize_property_images(engine)} inline property images to the image store")
@@ -1,13 +1,19 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, Uuid
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, Uuid, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
+from .search import create_search_index, drop_search_index
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_email", "email"),
+        # Billing runs page through owners in creation order.
+        Index("ix_users_role_created", "role", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     role: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -23,6 +29,7 @@ class User(Base):
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (Index("ix_properties_owner_location", "owner_id", "location"),)
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     owner_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
@@ -43,7 +50,11 @@ class Property(Base):
 
 class PropertyTenant(Base):
     __tablename__ = "property_tenants"
-    __table_args__ = (UniqueConstraint("property_id", "tenant_id", name="uq_property_tenant"),)
+    __table_args__ = (
+        UniqueConstraint("property_id", "tenant_id", name="uq_property_tenant"),
+        Index("ix_property_tenants_property_status", "property_id", "status"),
+        Index("ix_property_tenants_tenant_id", "tenant_id"),
+    )
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), nullable=False)
@@ -63,7 +74,10 @@ class ChatGroup(Base):
 
 class ChatGroupMember(Base):
     __tablename__ = "chat_group_members"
-    __table_args__ = (UniqueConstraint("group_id", "user_id", name="uq_chat_group_member"),)
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", name="uq_chat_group_member"),
+        Index("ix_chat_group_members_user_id", "user_id"),
+    )
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     group_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("chat_groups.id"), nullable=False)
@@ -74,6 +88,7 @@ class ChatGroupMember(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (Index("ix_chat_messages_group_created", "group_id", "created_at", "id"),)
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     group_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("chat_groups.id"), nullable=False)
@@ -86,6 +101,11 @@ class ChatMessage(Base):
 
 class Bill(Base):
     __tablename__ = "bills"
+    __table_args__ = (
+        Index("ix_bills_property_tenant_created", "property_id", "tenant_id", "created_at"),
+        # One generated bill per account, type and billing period; rows without a period are not constrained.
+        Index("uq_bills_account_period", "property_id", "tenant_id", "bill_type", "period", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), nullable=False)
@@ -93,11 +113,13 @@ class Bill(Base):
     bill_type: Mapped[str] = mapped_column(String(20), nullable=False)
     amount: Mapped[float] = mapped_column(Float, nullable=False)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="paid")
+    period: Mapped[str | None] = mapped_column(String(7), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (Index("ix_payments_property_tenant_paid", "property_id", "tenant_id", "paid_at"),)
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), nullable=False)
@@ -109,6 +131,10 @@ class Payment(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_owner_created", "owner_id", "created_at"),
+        Index("ix_notifications_property_created", "property_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     owner_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
@@ -120,11 +146,152 @@ class Notification(Base):
 
 class MaintenanceTicket(Base):
     __tablename__ = "maintenance_tickets"
+    __table_args__ = (
+        Index("ix_maintenance_tickets_property_status", "property_id", "status", "created_at"),
+        Index("ix_maintenance_tickets_owner_status", "owner_id", "status", "created_at", "id"),
+        Index("ix_maintenance_tickets_owner_created", "owner_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
     property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), nullable=False)
+    # Copied from the property so owner-wide queues are a single index range scan.
+    owner_id: Mapped[str | None] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=True)
     tenant_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
     issue_title: Mapped[str] = mapped_column(String(160), nullable=False)
     issue_description: Mapped[str | None] = mapped_column(Text, nullable=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="open")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class OwnerAnalyticsSummary(Base):
+    __tablename__ = "owner_analytics_summaries"
+
+    owner_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), primary_key=True)
+    total_properties: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_tenants: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    properties_by_location: Mapped[dict[str, int]] = mapped_column(JSON, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NotificationJob(Base):
+    __tablename__ = "notification_jobs"
+    __table_args__ = (Index("ix_notification_jobs_status", "status"),)
+
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+    owner_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
+    title: Mapped[str] = mapped_column(String(160), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    property_ids: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_property_id: Mapped[str | None] = mapped_column(Uuid(as_uuid=False), nullable=True)
+    notification_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delivery_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set while a worker holds the job; another worker may take a "running" job over only once the lease expired.
+    lease_owner: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NotificationDelivery(Base):
+    __tablename__ = "notification_deliveries"
+    __table_args__ = (
+        UniqueConstraint("notification_id", "user_id", name="uq_notification_delivery"),
+        Index("ix_notification_deliveries_status", "status", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+    notification_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("notifications.id"), nullable=False)
+    user_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
+    channel: Mapped[str] = mapped_column(String(20), nullable=False, default="push")
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class NotificationReadCursor(Base):
+    __tablename__ = "notification_read_cursors"
+
+    user_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), primary_key=True)
+    last_read_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_read_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class LedgerAccount(Base):
+    __tablename__ = "ledger_accounts"
+
+    property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), primary_key=True)
+    last_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        UniqueConstraint("property_id", "tenant_id", "seq", name="uq_ledger_entries_account_seq"),
+        Index("ix_ledger_entries_reference", "reference_id"),
+    )
+
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+    property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), nullable=False)
+    tenant_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    entry_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    bill_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    reference_id: Mapped[str | None] = mapped_column(Uuid(as_uuid=False), nullable=True)
+    # Billing period of charges posted by a billing run; None for payments and charges posted one at a time.
+    period: Mapped[str | None] = mapped_column(String(7), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class LedgerSnapshot(Base):
+    __tablename__ = "ledger_snapshots"
+
+    property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    balance: Mapped[float] = mapped_column(Float, nullable=False)
+    charged_total: Mapped[float] = mapped_column(Float, nullable=False)
+    paid_total: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class BillingRun(Base):
+    __tablename__ = "billing_runs"
+
+    period: Mapped[str] = mapped_column(String(7), primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="running")
+    last_owner_id: Mapped[str | None] = mapped_column(Uuid(as_uuid=False), nullable=True)
+    last_owner_created_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    bill_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class MaintenanceStatusCount(Base):
+    __tablename__ = "maintenance_status_counts"
+    __table_args__ = (Index("ix_maintenance_status_counts_owner", "owner_id", "status"),)
+
+    property_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("properties.id"), primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), primary_key=True)
+    owner_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Version counters behind the ETags of cached read endpoints: "owner" rows change with an owner's property cards,
+# "property" rows with a property's details. Writes bump them in their own transaction.
+class ResourceRevision(Base):
+    __tablename__ = "resource_revisions"
+
+    scope: Mapped[str] = mapped_column(String(20), primary_key=True)
+    resource_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# The search index (FTS5 tables and triggers on SQLite, GIN indexes on PostgreSQL) is created and dropped
+# together with the tables it covers.
+event.listen(Base.metadata, "after_create", create_search_index)
+event.listen(Base.metadata, "before_drop", drop_search_index)
@@ -0,0 +1,253 @@
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Protocol
+from uuid import uuid4
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from .database import SessionLocal, run_blocking
+from .models import Notification, NotificationDelivery, NotificationJob, Property, PropertyTenant
+
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "1000"))
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "500"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_RETRY_DELAY_SECONDS = float(os.getenv("NOTIFICATION_RETRY_DELAY_SECONDS", "2"))
+NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "1"))
+NOTIFICATION_LEASE_SECONDS = float(os.getenv("NOTIFICATION_LEASE_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(RuntimeError):
+    pass
+
+
+class JobQueue(Protocol):
+    def put(self, job_id: str, timeout: float | None = None) -> None: ...
+
+    def get(self, timeout: float | None = None) -> str: ...
+
+    def full(self) -> bool: ...
+
+    def qsize(self) -> int: ...
+
+
+# Bounded in-process queue; a broker-backed queue with the same methods can replace it for multi-worker deployments.
+class LocalJobQueue:
+    def __init__(self, maxsize: int = NOTIFICATION_QUEUE_SIZE) -> None:
+        self._queue: queue.Queue[str] = queue.Queue(maxsize=maxsize)
+
+    def put(self, job_id: str, timeout: float | None = None) -> None:
+        self._queue.put(job_id, timeout=timeout)
+
+    def get(self, timeout: float | None = None) -> str:
+        return self._queue.get(timeout=timeout)
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+class NotificationWorker:
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        session_factory: sessionmaker = SessionLocal,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+        retry_delay: float = NOTIFICATION_RETRY_DELAY_SECONDS,
+        lease_seconds: float = NOTIFICATION_LEASE_SECONDS,
+    ) -> None:
+        self.queue = job_queue
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    def accepting(self) -> bool:
+        return not self.queue.full()
+
+    def enqueue(self, job_id: str) -> bool:
+        try:
+            run_blocking(self.queue.put, job_id, 1)
+        except queue.Full:
+            # The job row stays queued and is picked up again by requeue_unfinished() on the next start.
+            logger.warning("Notification queue is full; job %s left for recovery", job_id)
+            return False
+        return True
+
+    # Every worker process runs this on start. Enqueueing the same job in several processes is harmless because
+    # process() claims it with a conditional UPDATE; "running" jobs are only picked up once their lease ran out.
+    def requeue_unfinished(self) -> int:
+        with self.session_factory() as db:
+            job_ids = db.scalars(select(NotificationJob.id).where(self._claimable(datetime.utcnow()))).all()
+        return sum(1 for job_id in job_ids if self.enqueue(job_id))
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            NotificationJob.status == "queued",
+            and_(
+                NotificationJob.status == "running",
+                or_(NotificationJob.lease_expires_at.is_(None), NotificationJob.lease_expires_at < now),
+            ),
+        )
+
+    def start(self, threads: int = NOTIFICATION_WORKERS) -> None:
+        self._stopping.clear()
+        for index in range(threads):
+            thread = threading.Thread(target=self._run, name=f"notification-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads.clear()
+
+    def run_until_empty(self) -> int:
+        processed = 0
+        while True:
+            try:
+                job_id = self.queue.get(timeout=0)
+            except queue.Empty:
+                return processed
+            self.process(job_id)
+            processed += 1
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.process(job_id)
+
+    def process(self, job_id: str) -> None:
+        lease_owner = str(uuid4())
+        with self.session_factory() as db:
+            now = datetime.utcnow()
+            claimed = db.execute(
+                update(NotificationJob)
+                .where(NotificationJob.id == job_id, self._claimable(now))
+                .values(
+                    status="running",
+                    attempts=NotificationJob.attempts + 1,
+                    lease_owner=lease_owner,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                )
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return
+            job = db.get(NotificationJob, job_id)
+
+            try:
+                while self._fan_out_batch(db, job, lease_owner):
+                    pass
+                if not self._update_held(db, job_id, lease_owner, status="done", lease_owner=None, lease_expires_at=None):
+                    raise LeaseLost(job_id)
+                db.commit()
+            except LeaseLost:
+                db.rollback()
+                logger.warning("Notification job %s was taken over by another worker", job_id)
+            except Exception as exc:
+                db.rollback()
+                self._retry_or_fail(db, job_id, lease_owner, exc)
+
+    # Updates the job only while `holder` still holds its lease, so a worker whose lease expired cannot commit
+    # progress over the worker that took the job over.
+    def _update_held(self, db: Session, job_id: str, holder: str, **values) -> bool:
+        result = db.execute(
+            update(NotificationJob)
+            .where(NotificationJob.id == job_id, NotificationJob.lease_owner == holder)
+            .values(updated_at=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def _target_properties(self, db: Session, job: NotificationJob) -> list[str]:
+        query = select(Property.id).where(Property.owner_id == job.owner_id)
+        if job.property_ids:
+            query = query.where(Property.id.in_(job.property_ids))
+        if job.last_property_id is not None:
+            query = query.where(Property.id > job.last_property_id)
+        return list(db.scalars(query.order_by(Property.id).limit(self.batch_size)).all())
+
+    def _fan_out_batch(self, db: Session, job: NotificationJob, lease_owner: str) -> bool:
+        property_ids = self._target_properties(db, job)
+        if not property_ids:
+            return False
+
+        now = datetime.utcnow()
+        notification_rows = [
+            {"id": str(uuid4()), "owner_id": job.owner_id, "property_id": property_id, "title": job.title, "body": job.body, "created_at": now}
+            for property_id in property_ids
+        ]
+        notification_by_property = {row["property_id"]: row["id"] for row in notification_rows}
+        tenants = db.execute(
+            select(PropertyTenant.property_id, PropertyTenant.tenant_id)
+            .where(PropertyTenant.property_id.in_(property_ids))
+            .where(PropertyTenant.status == "active")
+        ).all()
+        delivery_rows = [
+            {"id": str(uuid4()), "notification_id": notification_by_property[property_id], "user_id": tenant_id, "created_at": now}
+            for property_id, tenant_id in tenants
+        ]
+
+        # The batch, the job's progress marker and the lease renewal commit together, so a retry resumes after the
+        # last committed batch instead of notifying the same properties twice, and a batch from a worker that lost
+        # its lease is rolled back.
+        db.execute(insert(Notification), notification_rows)
+        if delivery_rows:
+            db.execute(insert(NotificationDelivery), delivery_rows)
+        held = self._update_held(
+            db,
+            job.id,
+            lease_owner,
+            last_property_id=property_ids[-1],
+            notification_count=job.notification_count + len(notification_rows),
+            delivery_count=job.delivery_count + len(delivery_rows),
+            lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+        )
+        if not held:
+            raise LeaseLost(job.id)
+        db.commit()
+        return len(property_ids) == self.batch_size
+
+    def _retry_or_fail(self, db: Session, job_id: str, lease_owner: str, exc: Exception) -> None:
+        job = db.get(NotificationJob, job_id, populate_existing=True)
+        if job is None or job.lease_owner != lease_owner:
+            return
+        job.error = repr(exc)
+        job.lease_owner = None
+        job.lease_expires_at = None
+        if job.attempts >= self.max_attempts:
+            job.status = "failed"
+            db.commit()
+            logger.error("Notification job %s failed after %s attempts", job_id, job.attempts)
+            return
+
+        job.status = "queued"
+        db.commit()
+        delay = self.retry_delay * 2 ** (job.attempts - 1)
+        logger.warning("Notification job %s failed (attempt %s); retrying in %.1fs", job_id, job.attempts, delay)
+        if delay <= 0:
+            self.enqueue(job_id)
+        else:
+            timer = threading.Timer(delay, self.enqueue, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+
+
+notification_worker = NotificationWorker(LocalJobQueue())
@@ -0,0 +1,182 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from sqlalchemy.util import await_only
+
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "scrypt")
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2**15)))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "600000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Kept well below Starlette's 40-thread pool, which sync request threads share while they wait for a hash.
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(min(PASSWORD_HASH_WORKERS * 2, 16))))
+PASSWORD_HASH_WAIT_SECONDS = float(os.getenv("PASSWORD_HASH_WAIT_SECONDS", "0.5"))
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+LEGACY_PREFIX = "plain::"
+# Stored for accounts created on someone else's behalf (join requests, payments, tickets for unknown phones):
+# no password matches it, so they cannot sign in until they register.
+UNUSABLE_PASSWORD_HASH = "!"
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=2 * 128 * r * n * p + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+# Stored formats are self-describing, so cost settings can change without invalidating existing hashes:
+#   scrypt$<n>$<r>$<p>$<salt>$<key>
+#   pbkdf2_sha256$<iterations>$<salt>$<key>
+#   plain::<password>  (rows written before hashing existed; upgraded on the next successful login)
+def compute_hash(password: str, scheme: str = PASSWORD_HASH_SCHEME) -> str:
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "scrypt":
+        key = _scrypt(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+        return f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}${_b64encode(salt)}${_b64encode(key)}"
+    if scheme == "pbkdf2_sha256":
+        key = _pbkdf2(password, salt, PASSWORD_PBKDF2_ITERATIONS)
+        return f"pbkdf2_sha256${PASSWORD_PBKDF2_ITERATIONS}${_b64encode(salt)}${_b64encode(key)}"
+    raise ValueError(f"Unknown password hash scheme {scheme}")
+
+
+def is_usable(stored: str | None) -> bool:
+    return bool(stored) and stored != UNUSABLE_PASSWORD_HASH
+
+
+def check_hash(password: str, stored: str | None) -> bool:
+    if not is_usable(stored):
+        return False
+    if stored.startswith(LEGACY_PREFIX):
+        return hmac.compare_digest(stored[len(LEGACY_PREFIX) :].encode(), password.encode())
+
+    scheme, _, params = stored.partition("$")
+    try:
+        if scheme == "scrypt":
+            n, r, p, salt, key = params.split("$")
+            candidate = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+        elif scheme == "pbkdf2_sha256":
+            iterations, salt, key = params.split("$")
+            candidate = _pbkdf2(password, _b64decode(salt), int(iterations))
+        else:
+            return False
+    except ValueError:
+        return False
+    return hmac.compare_digest(candidate, _b64decode(key))
+
+
+def needs_rehash(stored: str) -> bool:
+    if PASSWORD_HASH_SCHEME == "scrypt":
+        return not stored.startswith(f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$")
+    if PASSWORD_HASH_SCHEME == "pbkdf2_sha256":
+        return not stored.startswith(f"pbkdf2_sha256${PASSWORD_PBKDF2_ITERATIONS}$")
+    return False
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# hashlib releases the GIL while deriving keys, so a small thread pool gives real parallelism. Only
+# `workers` derivations run at once and at most `max_pending` may wait, which keeps a login storm from
+# tying up every request thread; beyond that callers get PasswordHasherBusy and the API answers 503.
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        wait_seconds: float = PASSWORD_HASH_WAIT_SECONDS,
+    ) -> None:
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Event-loop callers waiting for a slot; every release wakes them to retry.
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._waiters_lock = threading.Lock()
+
+    def _release(self) -> None:
+        self._slots.release()
+        with self._waiters_lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:  # the waiter's loop has been closed since it gave up
+                pass
+
+    async def _acquire_async(self) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+        while True:
+            waiter = loop.create_future()
+            with self._waiters_lock:
+                if self._slots.acquire(blocking=False):
+                    return True
+                self._waiters.append((loop, waiter))
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return False
+
+    def _run(self, function, *args):
+        try:
+            asyncio.get_running_loop()
+            on_loop = True
+        except RuntimeError:
+            on_loop = False
+        # A blocking wait for a slot on the event loop would stall every other request, so there it is awaited.
+        # Request threads do not wait at all: each one parked here is a threadpool thread no other request can use.
+        acquired = await_only(self._acquire_async()) if on_loop else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise PasswordHasherBusy("Too many password operations in flight")
+        try:
+            future: Future = self._executor.submit(function, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        if not on_loop:
+            return future.result()
+        # Async mode runs route bodies via AsyncSession.run_sync on the event loop; await the pool there
+        # instead of blocking the loop for the length of a key derivation.
+        return await_only(asyncio.wrap_future(future))
+
+    def hash(self, password: str) -> str:
+        return self._run(compute_hash, password)
+
+    def verify(self, password: str, stored: str | None) -> bool:
+        if not is_usable(stored):
+            return False
+        return self._run(check_hash, password, stored)
+
+    def needs_rehash(self, stored: str) -> bool:
+        return needs_rehash(stored)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,50 @@
+import hashlib
+import os
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from .models import ResourceRevision
+
+OWNER_SCOPE = "owner"
+PROPERTY_SCOPE = "property"
+# Part of every ETag: changing it makes clients refetch after a release that changes a response shape.
+ETAG_SALT = os.getenv("ETAG_SALT", "1")
+
+
+def bump_revision(db: Session, scope: str, resource_id: str) -> None:
+    updated = db.execute(
+        update(ResourceRevision)
+        .where(ResourceRevision.scope == scope, ResourceRevision.resource_id == resource_id)
+        .values(revision=ResourceRevision.revision + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(ResourceRevision(scope=scope, resource_id=resource_id, revision=1))
+    except IntegrityError:
+        bump_revision(db, scope, resource_id)
+
+
+# A column expression for the revision of `resource_id`, so the read endpoints fetch it in the query they
+# already run. Resources that were never written to are at revision 0.
+def revision_of(scope: str, resource_id) -> ColumnElement[int]:
+    return func.coalesce(
+        select(ResourceRevision.revision)
+        .where(ResourceRevision.scope == scope, ResourceRevision.resource_id == resource_id)
+        .scalar_subquery(),
+        0,
+    )
+
+
+def current_revision(db: Session, scope: str, resource_id: str) -> int:
+    return db.scalar(select(revision_of(scope, resource_id)))
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.sha256(":".join([ETAG_SALT, *map(str, parts)]).encode()).hexdigest()[:24]
+    return f'"{digest}"'
@@ -3,6 +3,8 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+BATCH_GET_MAX_IDS = 100
+
 
 class LoginRequest(BaseModel):
     identifier: str = Field(min_length=3)
@@ -43,6 +45,13 @@ class PropertyCreateRequest(BaseModel):
     description: str | None = None
 
 
+class ImageUploadResponse(BaseModel):
+    image_url: str
+    public_url: str
+    content_type: str
+    size: int
+
+
 class PropertyCardResponse(BaseModel):
     id: str
     owner_id: str
@@ -53,6 +62,7 @@ class PropertyCardResponse(BaseModel):
     occupied_count: int
     rent: float
     image_url: str | None
+    thumbnail_urls: dict[str, str] = Field(default_factory=dict)
     qr_code: str
     qr_code_url: str
 
@@ -90,6 +100,35 @@ class TenantDetailsResponse(BaseModel):
     documents: str | None
 
 
+class BatchGetRequest(BaseModel):
+    ids: list[str] = Field(min_length=1, max_length=BATCH_GET_MAX_IDS)
+
+
+class BatchGetError(BaseModel):
+    status: int
+    detail: str
+
+
+class PropertyBatchGetResult(BaseModel):
+    id: str
+    property: PropertyDetailsResponse | None = None
+    error: BatchGetError | None = None
+
+
+class PropertyBatchGetResponse(BaseModel):
+    results: list[PropertyBatchGetResult]
+
+
+class TenantBatchGetResult(BaseModel):
+    id: str
+    tenant: TenantDetailsResponse | None = None
+    error: BatchGetError | None = None
+
+
+class TenantBatchGetResponse(BaseModel):
+    results: list[TenantBatchGetResult]
+
+
 class WaterBillStatusUpdateRequest(BaseModel):
     status: Literal["paid", "unpaid"]
 
@@ -122,6 +161,30 @@ class PaymentResponse(BaseModel):
     paid_at: datetime
 
 
+class LedgerBalanceResponse(BaseModel):
+    property_id: str
+    tenant_id: str
+    balance: float
+    charged_total: float
+    paid_total: float
+    as_of_seq: int
+
+
+class LedgerEntryResponse(BaseModel):
+    seq: int
+    entry_type: str
+    bill_type: str
+    amount: float
+    balance_after: float
+    reference_id: str | None
+    created_at: datetime
+
+
+class LedgerStatementResponse(BaseModel):
+    entries: list[LedgerEntryResponse]
+    next_before: int | None
+
+
 class BroadcastCreate(BaseModel):
     owner_id: str
     title: str
@@ -131,9 +194,48 @@ class BroadcastCreate(BaseModel):
 
 class BroadcastResponse(BaseModel):
     queued: bool
+    job_id: str
     notification_ids: list[str]
 
 
+class NotificationJobResponse(BaseModel):
+    id: str
+    owner_id: str
+    status: str
+    attempts: int
+    notification_count: int
+    delivery_count: int
+    error: str | None
+    created_at: datetime
+
+
+class NotificationResponse(BaseModel):
+    id: str
+    property_id: str | None
+    title: str
+    body: str
+    created_at: datetime
+    read: bool
+
+
+class NotificationInboxResponse(BaseModel):
+    notifications: list[NotificationResponse]
+    unread_count: int
+    unread_capped: bool
+    next_cursor: str | None
+    last_read_cursor: str | None
+
+
+class NotificationReadRequest(BaseModel):
+    cursor: str | None = None
+
+
+class NotificationReadResponse(BaseModel):
+    last_read_cursor: str | None
+    unread_count: int
+    unread_capped: bool
+
+
 class MaintenanceCreate(BaseModel):
     property_id: str
     tenant_id: str
@@ -151,6 +253,20 @@ class MaintenanceResponse(BaseModel):
     created_at: datetime
 
 
+TicketStatus = Literal["open", "in_progress", "resolved", "closed"]
+
+
+class MaintenanceStatusUpdate(BaseModel):
+    status: TicketStatus
+    expected_status: TicketStatus | None = None
+
+
+class MaintenanceListResponse(BaseModel):
+    tickets: list[MaintenanceResponse]
+    counts: dict[str, int]
+    next_cursor: str | None
+
+
 class ChatMessageCreate(BaseModel):
     sender_id: str
     text: str | None = None
@@ -167,6 +283,24 @@ class ChatMessageResponse(BaseModel):
     created_at: datetime
 
 
+SearchKind = Literal["property", "tenant", "message"]
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: str
+    property_id: str
+    title: str
+    detail: str
+    created_at: datetime | None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    results: list[SearchHit]
+    next_offset: int | None
+
+
 class TenantDashboardResponse(BaseModel):
     property: PropertyCardResponse
     owner_phone: str
@@ -0,0 +1,243 @@
+import functools
+import re
+
+from sqlalchemy import DateTime, Float, String, Uuid, bindparam, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+SEARCH_KINDS = ("property", "tenant", "message")
+SEARCH_MAX_TERMS = 8
+# Terms shorter than this match whole words only; a one-letter prefix would match most of the corpus.
+SEARCH_MIN_PREFIX = 2
+
+# SQLite: one FTS5 table per kind, kept in step with the source tables by triggers. FTS rowids come from
+# search_refs rather than the source tables' implicit rowids, which VACUUM may renumber. The `scope` column
+# holds "o<owner id> p<property id>" tokens so an owner's matches are narrowed inside the index itself.
+_FTS_OPTIONS = "prefix='2 3 4 5 6', tokenize='unicode61 remove_diacritics 2'"
+_PROPERTY_SCOPE = "'o' || {row}.owner_id || ' p' || {row}.id"
+_MESSAGE_SCOPE = (
+    "(SELECT 'o' || p.owner_id || ' p' || p.id FROM chat_groups g JOIN properties p ON p.id = g.property_id "
+    "WHERE g.id = {row}.group_id)"
+)
+_SQLITE_DDL = (
+    "CREATE TABLE IF NOT EXISTS search_refs (doc INTEGER PRIMARY KEY, ref_id CHAR(32) NOT NULL UNIQUE)",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS search_properties USING fts5(scope, name, location, {_FTS_OPTIONS})",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS search_users USING fts5(full_name, phone, {_FTS_OPTIONS})",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS search_messages USING fts5(scope, body, {_FTS_OPTIONS})",
+    f"""CREATE TRIGGER IF NOT EXISTS search_properties_ai AFTER INSERT ON properties BEGIN
+        INSERT INTO search_refs (ref_id) VALUES (new.id);
+        INSERT INTO search_properties (rowid, scope, name, location)
+        VALUES (last_insert_rowid(), {_PROPERTY_SCOPE.format(row="new")}, new.name, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_properties_au AFTER UPDATE OF name, location ON properties BEGIN
+        UPDATE search_properties SET name = new.name, location = new.location
+        WHERE rowid = (SELECT doc FROM search_refs WHERE ref_id = old.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_properties_ad AFTER DELETE ON properties BEGIN
+        DELETE FROM search_properties WHERE rowid = (SELECT doc FROM search_refs WHERE ref_id = old.id);
+        DELETE FROM search_refs WHERE ref_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_users_ai AFTER INSERT ON users BEGIN
+        INSERT INTO search_refs (ref_id) VALUES (new.id);
+        INSERT INTO search_users (rowid, full_name, phone) VALUES (last_insert_rowid(), new.full_name, new.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_users_au AFTER UPDATE OF full_name, phone ON users BEGIN
+        UPDATE search_users SET full_name = new.full_name, phone = new.phone
+        WHERE rowid = (SELECT doc FROM search_refs WHERE ref_id = old.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_users_ad AFTER DELETE ON users BEGIN
+        DELETE FROM search_users WHERE rowid = (SELECT doc FROM search_refs WHERE ref_id = old.id);
+        DELETE FROM search_refs WHERE ref_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS search_messages_ai AFTER INSERT ON chat_messages WHEN new.text IS NOT NULL BEGIN
+        INSERT INTO search_refs (ref_id) VALUES (new.id);
+        INSERT INTO search_messages (rowid, scope, body)
+        VALUES (last_insert_rowid(), {_MESSAGE_SCOPE.format(row="new")}, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_messages_ad AFTER DELETE ON chat_messages BEGIN
+        DELETE FROM search_messages WHERE rowid = (SELECT doc FROM search_refs WHERE ref_id = old.id);
+        DELETE FROM search_refs WHERE ref_id = old.id;
+    END""",
+)
+# Indexes rows that existed before the search tables were created. Without search_refs any surviving FTS
+# rows are unreachable, so they are cleared and rebuilt too.
+_SQLITE_BACKFILL = (
+    "DELETE FROM search_properties",
+    "DELETE FROM search_users",
+    "DELETE FROM search_messages",
+    "INSERT INTO search_refs (ref_id) SELECT id FROM properties",
+    f"""INSERT INTO search_properties (rowid, scope, name, location)
+        SELECT r.doc, {_PROPERTY_SCOPE.format(row="p")}, p.name, p.location
+        FROM properties p JOIN search_refs r ON r.ref_id = p.id""",
+    "INSERT INTO search_refs (ref_id) SELECT id FROM users",
+    """INSERT INTO search_users (rowid, full_name, phone)
+        SELECT r.doc, u.full_name, u.phone FROM users u JOIN search_refs r ON r.ref_id = u.id""",
+    "INSERT INTO search_refs (ref_id) SELECT id FROM chat_messages WHERE text IS NOT NULL",
+    f"""INSERT INTO search_messages (rowid, scope, body)
+        SELECT r.doc, {_MESSAGE_SCOPE.format(row="m")}, m.text FROM chat_messages m JOIN search_refs r ON r.ref_id = m.id""",
+)
+_SQLITE_TABLES = ("search_properties", "search_users", "search_messages", "search_refs")
+
+# PostgreSQL: GIN indexes over the same tsvector expressions the queries below use, so nothing extra is
+# written per row. The 'simple' configuration keeps names and phone numbers unstemmed.
+_PROPERTY_VECTOR = "to_tsvector('simple', {t}name || ' ' || {t}location)"
+_USER_VECTOR = "to_tsvector('simple', {t}full_name || ' ' || {t}phone)"
+_MESSAGE_VECTOR = "to_tsvector('simple', coalesce({t}text, ''))"
+_POSTGRES_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_properties_search ON properties USING gin (({_PROPERTY_VECTOR.format(t='')}))",
+    f"CREATE INDEX IF NOT EXISTS ix_users_search ON users USING gin (({_USER_VECTOR.format(t='')}))",
+    f"CREATE INDEX IF NOT EXISTS ix_chat_messages_search ON chat_messages USING gin (({_MESSAGE_VECTOR.format(t='')}))",
+)
+
+# Properties and messages are ranked inside the FTS table first, so only the top rows are joined back.
+_SQLITE_QUERIES = {
+    "property": """
+        SELECT p.id AS id, p.id AS property_id, p.name AS title, p.location AS detail, NULL AS created_at, f.score
+        FROM (
+            SELECT rowid AS doc, -bm25(search_properties, 0.0, 2.0, 1.0) AS score FROM search_properties
+            WHERE search_properties MATCH :match ORDER BY score DESC LIMIT :limit
+        ) f
+        JOIN search_refs r ON r.doc = f.doc
+        JOIN properties p ON p.id = r.ref_id""",
+    "tenant": """
+        SELECT u.id AS id, pt.property_id, u.full_name AS title, u.phone AS detail, u.created_at,
+               -bm25(search_users, 2.0, 1.0) AS score
+        FROM search_users
+        JOIN search_refs r ON r.doc = search_users.rowid
+        JOIN users u ON u.id = r.ref_id
+        JOIN property_tenants pt ON pt.tenant_id = u.id AND pt.status = 'active'
+        JOIN properties p ON p.id = pt.property_id
+        WHERE search_users MATCH :match AND p.owner_id = :owner_id""",
+    "message": """
+        SELECT m.id AS id, g.property_id, m.sender_name AS title, m.text AS detail, m.created_at, f.score
+        FROM (
+            SELECT rowid AS doc, -bm25(search_messages, 0.0, 1.0) AS score FROM search_messages
+            WHERE search_messages MATCH :match ORDER BY score DESC LIMIT :limit
+        ) f
+        JOIN search_refs r ON r.doc = f.doc
+        JOIN chat_messages m ON m.id = r.ref_id
+        JOIN chat_groups g ON g.id = m.group_id""",
+}
+_POSTGRES_QUERIES = {
+    "property": f"""
+        SELECT p.id AS id, p.id AS property_id, p.name AS title, p.location AS detail, NULL AS created_at,
+               ts_rank({_PROPERTY_VECTOR.format(t='p.')}, q) AS score
+        FROM properties p, to_tsquery('simple', :match) q
+        WHERE {_PROPERTY_VECTOR.format(t='p.')} @@ q AND p.owner_id = :owner_id""",
+    "tenant": f"""
+        SELECT u.id AS id, pt.property_id, u.full_name AS title, u.phone AS detail, u.created_at,
+               ts_rank({_USER_VECTOR.format(t='u.')}, q) AS score
+        FROM users u
+        JOIN property_tenants pt ON pt.tenant_id = u.id AND pt.status = 'active'
+        JOIN properties p ON p.id = pt.property_id,
+        to_tsquery('simple', :match) q
+        WHERE {_USER_VECTOR.format(t='u.')} @@ q AND p.owner_id = :owner_id""",
+    "message": f"""
+        SELECT m.id AS id, g.property_id, m.sender_name AS title, m.text AS detail, m.created_at,
+               ts_rank({_MESSAGE_VECTOR.format(t='m.')}, q) AS score
+        FROM chat_messages m
+        JOIN chat_groups g ON g.id = m.group_id
+        JOIN properties p ON p.id = g.property_id,
+        to_tsquery('simple', :match) q
+        WHERE {_MESSAGE_VECTOR.format(t='m.')} @@ q AND p.owner_id = :owner_id""",
+}
+
+
+def create_search_index(target, connection: Connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        existed = inspect(connection).has_table("search_refs")
+        for statement in _SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not existed:
+            for statement in _SQLITE_BACKFILL:
+                connection.exec_driver_sql(statement)
+    elif connection.dialect.name == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def drop_search_index(target, connection: Connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        for table in _SQLITE_TABLES:
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
+
+
+def search_terms(query: str) -> list[str]:
+    return re.findall(r"[^\W_]+", query.lower())[:SEARCH_MAX_TERMS]
+
+
+def _token(prefix: str, row_id: str) -> str:
+    return prefix + re.sub(r"[^0-9a-z]", "", row_id.lower())
+
+
+# Only the last term is a prefix: earlier words are complete by the time the next one is typed, and an exact
+# term is far cheaper to match than a prefix of a frequent word, which FTS5 expands into one merged doclist.
+def _match_expression(dialect: str, kind: str, terms: list[str], owner_id: str, property_id: str | None) -> str:
+    *complete, last = terms
+    prefix = len(last) >= SEARCH_MIN_PREFIX
+    if dialect == "postgresql":
+        return " & ".join([*complete, f"{last}:*" if prefix else last])
+    words = " ".join([*(f'"{term}"' for term in complete), f'"{last}"*' if prefix else f'"{last}"'])
+    if kind == "tenant":
+        return words
+    scope = f'"{_token("o", owner_id)}"'
+    if property_id is not None:
+        scope = f'({scope} "{_token("p", property_id)}")'
+    columns = "{name location}" if kind == "property" else "body"
+    return f"scope : {scope} AND {columns} : ({words})"
+
+
+@functools.lru_cache(maxsize=None)
+def _statement(dialect: str, kind: str, by_property: bool) -> TextClause:
+    sql = (_POSTGRES_QUERIES if dialect == "postgresql" else _SQLITE_QUERIES)[kind]
+    # SQLite narrows properties and messages to a property through the scope token in the MATCH expression.
+    if by_property and (dialect == "postgresql" or kind == "tenant"):
+        sql += " AND p.id = :property_id"
+    sql += " ORDER BY score DESC, id LIMIT :limit"
+    ids = [bindparam(name, type_=Uuid(as_uuid=False)) for name in ("owner_id", "property_id") if f":{name}" in sql]
+    return (
+        text(sql)
+        .bindparams(*ids)
+        .columns(
+            id=Uuid(as_uuid=False),
+            property_id=Uuid(as_uuid=False),
+            title=String,
+            detail=String,
+            created_at=DateTime,
+            score=Float,
+        )
+    )
+
+
+# Each kind is ranked by its own index (bm25 on SQLite, ts_rank on PostgreSQL, both higher-is-better here)
+# and the per-kind top rows are merged, so one page costs one indexed query per kind.
+def search(
+    db: Session,
+    owner_id: str,
+    query: str,
+    kinds: tuple[str, ...] = SEARCH_KINDS,
+    property_id: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> tuple[list[dict], bool]:
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    dialect = db.get_bind().dialect.name
+    hits: list[dict] = []
+    for kind in kinds:
+        rows = db.execute(
+            _statement(dialect, kind, property_id is not None),
+            {
+                "match": _match_expression(dialect, kind, terms, owner_id, property_id),
+                "owner_id": owner_id,
+                "property_id": property_id,
+                "limit": offset + limit + 1,
+            },
+        )
+        hits.extend({"kind": kind, **row._asdict()} for row in rows)
+
+    hits.sort(key=lambda hit: (-hit["score"], hit["kind"], hit["id"]))
+    return hits[offset : offset + limit], len(hits) > offset + limit
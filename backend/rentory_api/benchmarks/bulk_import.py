@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import time
+
+
+def property_row(index: int) -> dict:
+    return {
+        "location": f"Area {index % 25}",
+        "name": f"Imported Unit {index}",
+        "unit_type": "2BHK",
+        "capacity": 2 + index % 3,
+        "rent": 8000 + index % 5000,
+        "image_url": f"https://example.com/units/{index}.jpg",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rows/sec for bulk property import versus one POST per property")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./rentory_bench.db"))
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--single-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from fastapi.testclient import TestClient
+
+    from app.database import Base, engine
+    from app.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    with TestClient(app) as client:
+        owner_id = client.post(
+            "/auth/owners/signup",
+            json={"full_name": "Import Owner", "phone": f"import-{time.time_ns()}", "password": "1234"},
+        ).json()["user_id"]
+
+        started = time.perf_counter()
+        for index in range(args.single_rows):
+            client.post(f"/owners/{owner_id}/properties", json=property_row(index))
+        single_elapsed = time.perf_counter() - started
+
+        body = "\n".join(json.dumps(property_row(index)) for index in range(args.rows))
+        started = time.perf_counter()
+        response = client.post(
+            f"/owners/{owner_id}/properties:import", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        bulk_elapsed = time.perf_counter() - started
+        summary = json.loads(response.text.splitlines()[-1])["summary"]
+
+    result = {
+        "database_url": args.database_url.split("@")[-1],
+        "single_post": {"rows": args.single_rows, "rows_per_sec": round(args.single_rows / single_elapsed, 1)},
+        "bulk_import": {"rows": summary["created"], "failed": summary["failed"], "rows_per_sec": round(args.rows / bulk_elapsed, 1)},
+    }
+    result["speedup"] = round(result["bulk_import"]["rows_per_sec"] / result["single_post"]["rows_per_sec"], 1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
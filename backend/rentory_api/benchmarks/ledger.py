@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+
+# Monthly rent and water charges plus the tenant's payments, with snapshots written at the same cadence
+# post_entry() uses, so the tables look like an account that has been billed for `years` years.
+def synthetic_history(property_id: str, tenant_id: str, years: int, interval: int, rng: random.Random):
+    entries, snapshots = [], []
+    charged = paid = 0.0
+    seq = 0
+    started = datetime(2026, 1, 1) - timedelta(days=365 * years)
+    for month in range(years * 12):
+        created_at = started + timedelta(days=30 * month)
+        rent, water = 12000.0, float(rng.randrange(200, 900))
+        movements = [("charge", "rent", rent), ("charge", "water", water)]
+        movements.append(("payment", "rent", rent if rng.random() < 0.9 else rent / 2))
+        movements.append(("payment", "water", water))
+        for entry_type, bill_type, amount in movements:
+            seq += 1
+            signed = amount if entry_type == "charge" else -amount
+            charged += max(signed, 0)
+            paid += max(-signed, 0)
+            entries.append(
+                {
+                    "id": str(uuid4()),
+                    "property_id": property_id,
+                    "tenant_id": tenant_id,
+                    "seq": seq,
+                    "entry_type": entry_type,
+                    "bill_type": bill_type,
+                    "amount": signed,
+                    "created_at": created_at,
+                }
+            )
+            if seq % interval == 0:
+                snapshots.append(
+                    {
+                        "property_id": property_id,
+                        "tenant_id": tenant_id,
+                        "seq": seq,
+                        "balance": charged - paid,
+                        "charged_total": charged,
+                        "paid_total": paid,
+                        "created_at": created_at,
+                    }
+                )
+    return entries, snapshots, seq
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ledger balance lookups/sec: snapshot plus tail versus summing full history")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./rentory_bench.db"))
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from sqlalchemy import bindparam, func, insert, select
+
+    from app.billing import LEDGER_SNAPSHOT_INTERVAL, account_balance
+    from app.database import Base, SessionLocal, engine
+    from app.models import LedgerAccount, LedgerEntry, LedgerSnapshot, Property, User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    owner_id = str(uuid4())
+    accounts = []
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        db.add(User(id=owner_id, role="owner", full_name="Ledger Owner", phone="ledger-owner", password_hash="-"))
+        db.flush()
+        entry_count = 0
+        for index in range(args.accounts):
+            property_id, tenant_id = str(uuid4()), str(uuid4())
+            db.add(
+                Property(
+                    id=property_id, owner_id=owner_id, location="Kochi", name=f"Unit {index}", unit_type="1BHK", capacity=1,
+                    rent=12000, qr_code=f"ledger-{index}",
+                )
+            )
+            db.add(User(id=tenant_id, role="tenant", full_name=f"Tenant {index}", phone=f"ledger-{index}", password_hash="-"))
+            db.flush()
+            entries, snapshots, last_seq = synthetic_history(property_id, tenant_id, args.years, LEDGER_SNAPSHOT_INTERVAL, rng)
+            db.execute(insert(LedgerEntry), entries)
+            if snapshots:
+                db.execute(insert(LedgerSnapshot), snapshots)
+            db.add(LedgerAccount(property_id=property_id, tenant_id=tenant_id, last_seq=last_seq))
+            accounts.append((property_id, tenant_id))
+            entry_count += len(entries)
+        db.commit()
+    generate_elapsed = time.perf_counter() - started
+
+    full_history = select(func.sum(LedgerEntry.amount)).where(
+        LedgerEntry.property_id == bindparam("property_id"), LedgerEntry.tenant_id == bindparam("tenant_id")
+    )
+    samples = [rng.choice(accounts) for _ in range(args.lookups)]
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        snapshot_balances = [account_balance(db, property_id, tenant_id).balance for property_id, tenant_id in samples]
+        snapshot_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        full_balances = [
+            db.scalar(full_history, {"property_id": property_id, "tenant_id": tenant_id}) for property_id, tenant_id in samples
+        ]
+        full_elapsed = time.perf_counter() - started
+
+    assert all(abs(a - b) < 0.01 for a, b in zip(snapshot_balances, full_balances))
+    result = {
+        "database_url": args.database_url.split("@")[-1],
+        "accounts": args.accounts,
+        "entries_per_account": entry_count // args.accounts,
+        "snapshot_interval": LEDGER_SNAPSHOT_INTERVAL,
+        "generated_entries_per_sec": round(entry_count / generate_elapsed, 1),
+        "snapshot_plus_tail": {"lookups_per_sec": round(args.lookups / snapshot_elapsed, 1)},
+        "full_history_sum": {"lookups_per_sec": round(args.lookups / full_elapsed, 1)},
+    }
+    result["speedup"] = round(result["snapshot_plus_tail"]["lookups_per_sec"] / result["full_history_sum"]["lookups_per_sec"], 2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
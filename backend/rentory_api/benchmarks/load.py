@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+API_ROOT = Path(__file__).resolve().parents[1]
+# Every benchmark server signs with this key, so tokens issued by one server (or by the harness) verify on the next.
+BENCH_TOKEN_SECRET = os.getenv("AUTH_TOKEN_SECRET", "rentory-bench-secret")
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def seed(base_url: str, properties: int, tenants_per_property: int, messages_per_property: int) -> dict:
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        owner = client.post(
+            "/auth/owners/signup",
+            json={"full_name": "Bench Owner", "phone": f"bench-{time.time_ns()}", "password": "1234"},
+        ).json()
+        property_ids: list[str] = []
+        tenant_ids: list[str] = []
+        tenant_tokens: list[str] = []
+        for index in range(properties):
+            card = client.post(
+                f"/owners/{owner['user_id']}/properties",
+                json={
+                    "location": f"Area {index % 5}",
+                    "name": f"Bench Property {index}",
+                    "unit_type": "2BHK",
+                    "capacity": tenants_per_property,
+                    "rent": 10000 + index,
+                    "image_url": "https://example.com/bench.jpg",
+                },
+            ).json()
+            property_ids.append(card["id"])
+            for tenant_index in range(tenants_per_property):
+                tenant = client.post(
+                    "/auth/tenants/register",
+                    json={
+                        "qr_code": card["qr_code"],
+                        "full_name": f"Bench Tenant {index}-{tenant_index}",
+                        "age": 30,
+                        "phone": f"bt-{time.time_ns()}",
+                        "documents": "id.png",
+                        "password": "1234",
+                    },
+                ).json()
+                tenant_ids.append(tenant["user_id"])
+                tenant_tokens.append(tenant["access_token"])
+            for message_index in range(messages_per_property):
+                client.post(f"/properties/{card['id']}/chat", json={"sender_id": owner["user_id"], "text": f"note {message_index}"})
+    return {
+        "owner_id": owner["user_id"],
+        "owner_token": owner["access_token"],
+        "property_ids": property_ids,
+        "tenant_ids": tenant_ids,
+        "tenant_tokens": tenant_tokens,
+    }
+
+
+async def run_load(base_url: str, fixture: dict, concurrency: int, duration: float) -> dict:
+    owner_headers = {"Authorization": f"Bearer {fixture['owner_token']}"}
+    requests = [(f"/owners/{fixture['owner_id']}/{view}", owner_headers) for view in ("properties", "analytics")]
+    requests += [(f"/properties/{property_id}", None) for property_id in fixture["property_ids"]]
+    requests += [(f"/properties/{property_id}/chat", None) for property_id in fixture["property_ids"]]
+    requests += [
+        (f"/tenants/{tenant_id}/dashboard", {"Authorization": f"Bearer {token}"})
+        for tenant_id, token in zip(fixture["tenant_ids"], fixture["tenant_tokens"])
+    ]
+
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker(seed_value: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed_value)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                path, headers = rng.choice(requests)
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def start_server(database_url: str, async_mode: bool, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "DATABASE_ASYNC": "1" if async_mode else "0",
+        "AUTH_TOKEN_SECRET": BENCH_TOKEN_SECRET,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_ROOT,
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sync and async database modes at the same concurrency")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./rentory_bench.db"))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--properties", type=int, default=20)
+    parser.add_argument("--tenants-per-property", type=int, default=3)
+    parser.add_argument("--messages-per-property", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results: dict = {"database_url": args.database_url.split("@")[-1], "concurrency": args.concurrency}
+    fixture = None
+    for mode in ("sync", "async"):
+        server = start_server(args.database_url, mode == "async", args.port)
+        try:
+            if fixture is None:
+                fixture = seed(base_url, args.properties, args.tenants_per_property, args.messages_per_property)
+            results[mode] = asyncio.run(run_load(base_url, fixture, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import passwords
+
+
+def logins_per_sec(stored: str, seconds: float, workers: int) -> float:
+    def verify_for(deadline: float) -> int:
+        count = 0
+        while time.perf_counter() < deadline:
+            passwords.check_hash("correct horse", stored)
+            count += 1
+        return count
+
+    deadline = time.perf_counter() + seconds
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(verify_for, [deadline] * workers))
+    return total / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Password verifications (logins) per second at each KDF cost setting")
+    parser.add_argument("--scrypt-n", default="16384,32768,65536")
+    parser.add_argument("--pbkdf2-iterations", default="210000,600000")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    settings = [("scrypt", "PASSWORD_SCRYPT_N", int(n)) for n in args.scrypt_n.split(",")]
+    settings += [("pbkdf2_sha256", "PASSWORD_PBKDF2_ITERATIONS", int(n)) for n in args.pbkdf2_iterations.split(",")]
+
+    results = []
+    for scheme, setting, cost in settings:
+        setattr(passwords, setting, cost)
+        stored = passwords.compute_hash("correct horse", scheme)
+        single = logins_per_sec(stored, args.seconds, 1)
+        pooled = logins_per_sec(stored, args.seconds, args.workers)
+        results.append(
+            {
+                "scheme": scheme,
+                "cost": cost,
+                "ms_per_login": round(1000 / single, 1),
+                "logins_per_sec_per_core": round(single, 1),
+                "logins_per_sec_pooled": round(pooled, 1),
+                "workers": args.workers,
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.analytics import rebuild_owner_analytics
+from app.billing import LEDGER_SNAPSHOT_INTERVAL
+from app.database import Base
+from app.models import (
+    ChatGroup,
+    ChatGroupMember,
+    ChatMessage,
+    LedgerAccount,
+    LedgerEntry,
+    LedgerSnapshot,
+    Payment,
+    Property,
+    PropertyTenant,
+    User,
+)
+from app.passwords import compute_hash
+
+BENCH_PASSWORD = "bench-password"
+LOCATIONS = ["Kochi", "Kakkanad", "Edappally", "Aluva", "Vyttila", "Thrissur", "Kottayam", "Kollam"]
+UNIT_TYPES = ["1BHK", "2BHK", "3BHK", "Studio", "PG"]
+MESSAGE_WORDS = ["water", "rent", "bill", "pump", "leak", "power", "gate", "parking", "paid", "due", "please", "fixed"]
+BILL_TYPES = ("rent", "water", "electricity")
+INSERT_BATCH = 5000
+LOAD_ORDER = (Property, User, ChatGroup, ChatGroupMember, PropertyTenant, ChatMessage, Payment, LedgerAccount, LedgerEntry, LedgerSnapshot)
+
+
+@dataclass
+class PortfolioSize:
+    owners: int = 50
+    properties_per_owner: int = 10
+    tenants_per_property: int = 4
+    messages_per_property: int = 200
+    payments_per_tenant: int = 24
+
+
+@dataclass
+class Portfolio:
+    size: PortfolioSize
+    owner_ids: list[str] = field(default_factory=list)
+    # (property_id, owner_id) and (tenant_id, property_id, phone) tuples, for drawing request targets.
+    properties: list[tuple[str, str]] = field(default_factory=list)
+    tenants: list[tuple[str, str, str]] = field(default_factory=list)
+    rows: dict[str, int] = field(default_factory=dict)
+    seed_seconds: float = 0.0
+
+
+class _Loader:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.pending: dict[type, list[dict]] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, model: type, row: dict) -> None:
+        batch = self.pending.setdefault(model, [])
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        # Parents go before children so foreign keys hold on databases that enforce them. Owners are flushed
+        # on their own before any property exists, which breaks the users <-> properties cycle.
+        for model in LOAD_ORDER:
+            batch = self.pending.get(model)
+            if batch:
+                self.db.execute(insert(model), batch)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(batch)
+                batch.clear()
+
+
+# Builds the portfolio with set-based inserts straight into the tables rather than through the API, so a
+# portfolio of millions of rows loads in seconds. Ids and content come from one seeded RNG: the same size and
+# seed produce the same rows on every commit, which keeps results comparable.
+def seed_portfolio(bind: Engine, size: PortfolioSize, seed: int = 7) -> Portfolio:
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    new_id = lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    # One hash shared by every user: hashing per row would dominate the load time at the configured cost.
+    password_hash = compute_hash(BENCH_PASSWORD)
+    epoch = datetime(2026, 1, 1)
+    portfolio = Portfolio(size)
+
+    Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+    with Session(bind) as db:
+        loader = _Loader(db)
+        for owner_index in range(size.owners):
+            owner_id = new_id()
+            portfolio.owner_ids.append(owner_id)
+            loader.add(
+                User,
+                {
+                    "id": owner_id,
+                    "role": "owner",
+                    "full_name": f"Owner {owner_index}",
+                    "phone": f"8{owner_index:09d}",
+                    "email": f"owner{owner_index}@bench.rentory.local",
+                    "password_hash": password_hash,
+                    "created_at": epoch,
+                },
+            )
+        loader.flush()
+
+        tenant_index = 0
+        for owner_index, owner_id in enumerate(portfolio.owner_ids):
+            for property_index in range(size.properties_per_owner):
+                property_id, group_id = new_id(), new_id()
+                name = f"{rng.choice(LOCATIONS)} Residency {owner_index}-{property_index}"
+                rent = float(rng.randrange(6000, 30000, 500))
+                portfolio.properties.append((property_id, owner_id))
+                loader.add(
+                    Property,
+                    {
+                        "id": property_id,
+                        "owner_id": owner_id,
+                        "location": rng.choice(LOCATIONS),
+                        "name": name,
+                        "unit_type": rng.choice(UNIT_TYPES),
+                        "image_url": "https://example.com/bench.jpg",
+                        "qr_code": f"bench-{owner_index}-{property_index}",
+                        # One seat is left free on every property for registration runs.
+                        "capacity": size.tenants_per_property + 1,
+                        "occupied_count": size.tenants_per_property,
+                        "rent": rent,
+                        "created_at": epoch,
+                    },
+                )
+                loader.add(ChatGroup, {"id": group_id, "property_id": property_id, "group_name": name, "created_at": epoch})
+                loader.add(ChatGroupMember, {"id": new_id(), "group_id": group_id, "user_id": owner_id, "role": "owner", "joined_at": epoch})
+
+                members = [(owner_id, f"Owner {owner_index}")]
+                for _ in range(size.tenants_per_property):
+                    tenant_id, phone = new_id(), f"9{tenant_index:09d}"
+                    full_name = f"Tenant {tenant_index}"
+                    tenant_index += 1
+                    portfolio.tenants.append((tenant_id, property_id, phone))
+                    members.append((tenant_id, full_name))
+                    loader.add(
+                        User,
+                        {
+                            "id": tenant_id,
+                            "role": "tenant",
+                            "full_name": full_name,
+                            "phone": phone,
+                            "age": rng.randint(20, 60),
+                            "documents": "id.png",
+                            "assigned_property_id": property_id,
+                            "password_hash": password_hash,
+                            "created_at": epoch,
+                        },
+                    )
+                    loader.add(
+                        PropertyTenant,
+                        {"id": new_id(), "property_id": property_id, "tenant_id": tenant_id, "status": "active", "created_at": epoch},
+                    )
+                    loader.add(ChatGroupMember, {"id": new_id(), "group_id": group_id, "user_id": tenant_id, "role": "tenant", "joined_at": epoch})
+                    _add_ledger_history(loader, rng, new_id, property_id, tenant_id, rent, size.payments_per_tenant, epoch)
+
+                for message_index in range(size.messages_per_property):
+                    sender_id, sender_name = rng.choice(members)
+                    loader.add(
+                        ChatMessage,
+                        {
+                            "id": new_id(),
+                            "group_id": group_id,
+                            "sender_id": sender_id,
+                            "sender_name": sender_name,
+                            "text": " ".join(rng.choices(MESSAGE_WORDS, k=rng.randint(3, 12))),
+                            "created_at": epoch + timedelta(minutes=message_index),
+                        },
+                    )
+        loader.flush()
+
+        rebuild_owner_analytics(db)
+        db.commit()
+        portfolio.rows = loader.counts
+
+    portfolio.seed_seconds = time.perf_counter() - started
+    return portfolio
+
+
+# A month of history is a rent charge and the tenant paying it, numbered and snapshotted the way
+# post_entry() would have written them.
+def _add_ledger_history(loader: _Loader, rng: random.Random, new_id, property_id: str, tenant_id: str, rent: float, months: int, epoch: datetime) -> None:
+    seq = 0
+    charged = paid = 0.0
+    started = epoch - timedelta(days=30 * months)
+    for month in range(months):
+        created_at = started + timedelta(days=30 * month)
+        payment_id = new_id()
+        bill_type = rng.choice(BILL_TYPES)
+        amount = rent if bill_type == "rent" else float(rng.randrange(200, 1500))
+        loader.add(
+            Payment,
+            {"id": payment_id, "property_id": property_id, "tenant_id": tenant_id, "bill_type": bill_type, "amount": amount, "paid_at": created_at},
+        )
+        for entry_type, signed, reference_id in (("charge", amount, None), ("payment", -amount, payment_id)):
+            seq += 1
+            charged += max(signed, 0)
+            paid += max(-signed, 0)
+            loader.add(
+                LedgerEntry,
+                {
+                    "id": new_id(),
+                    "property_id": property_id,
+                    "tenant_id": tenant_id,
+                    "seq": seq,
+                    "entry_type": entry_type,
+                    "bill_type": bill_type,
+                    "amount": signed,
+                    "reference_id": reference_id,
+                    "created_at": created_at,
+                },
+            )
+            if seq % LEDGER_SNAPSHOT_INTERVAL == 0:
+                loader.add(
+                    LedgerSnapshot,
+                    {
+                        "property_id": property_id,
+                        "tenant_id": tenant_id,
+                        "seq": seq,
+                        "balance": charged - paid,
+                        "charged_total": charged,
+                        "paid_total": paid,
+                        "created_at": created_at,
+                    },
+                )
+    if seq:
+        loader.add(LedgerAccount, {"property_id": property_id, "tenant_id": tenant_id, "last_seq": seq})
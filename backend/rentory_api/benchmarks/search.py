@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+COMMON_WORDS = [
+    "water", "rent", "bill", "pump", "tank", "leak", "power", "cut", "gate", "key", "parking", "paid", "due",
+    "today", "tomorrow", "please", "check", "fixed", "broken", "light", "fan", "lift", "cleaning", "garbage",
+    "maintenance", "plumber", "electrician", "meeting", "notice", "visitor", "guest", "noise", "wifi", "router",
+]
+SYLLABLES = ["ka", "lo", "ri", "me", "na", "tu", "shi", "va", "ro", "pe", "mi", "da", "go", "le", "su", "an"]
+
+
+# A Zipf-like vocabulary: a few dozen everyday words carry most of the traffic and a long tail of invented
+# words (think names and places) each appear a handful of times.
+def vocabulary(rng: random.Random, size: int) -> tuple[list[str], list[float]]:
+    words, seen = list(COMMON_WORDS), set(COMMON_WORDS)
+    while len(words) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if word not in seen:
+            words.append(word)
+            seen.add(word)
+    cumulative, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    return words, cumulative
+
+
+def percentiles(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    pick = lambda fraction: ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(pick(0.95) * 1000, 2),
+        "p99_ms": round(pick(0.99) * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ranked chat search latency over a synthetic message corpus")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./rentory_bench.db"))
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--properties-per-owner", type=int, default=10)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from sqlalchemy import insert, select
+
+    from app.database import Base, SessionLocal, engine
+    from app.models import ChatGroup, ChatMessage, Property, User
+    from app.search import search
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(11)
+    words, cum_weights = vocabulary(rng, args.vocabulary)
+
+    owners, groups = [], []
+    with SessionLocal() as db:
+        for owner_index in range(args.owners):
+            owner_id = str(uuid4())
+            db.add(User(id=owner_id, role="owner", full_name=f"Owner {owner_index}", phone=f"search-{owner_index}", password_hash="-"))
+            owner_groups = []
+            for property_index in range(args.properties_per_owner):
+                property_id, group_id = str(uuid4()), str(uuid4())
+                db.add(
+                    Property(
+                        id=property_id, owner_id=owner_id, location="Kochi", name=f"Block {owner_index}-{property_index}",
+                        unit_type="1BHK", capacity=10, rent=9000, qr_code=f"search-{owner_index}-{property_index}",
+                    )
+                )
+                db.add(ChatGroup(id=group_id, property_id=property_id, group_name=f"Block {owner_index}-{property_index}"))
+                owner_groups.append(group_id)
+            owners.append((owner_id, owner_groups))
+            groups.extend((owner_id, group_id) for group_id in owner_groups)
+        db.commit()
+
+        started = time.perf_counter()
+        created_at = datetime(2026, 1, 1)
+        batch = []
+        for index in range(args.messages):
+            owner_id, group_id = rng.choice(groups)
+            batch.append(
+                {
+                    "id": str(uuid4()),
+                    "group_id": group_id,
+                    "sender_id": owner_id,
+                    "sender_name": "Owner",
+                    "text": " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(4, 14))),
+                    "created_at": created_at + timedelta(seconds=index),
+                }
+            )
+            if len(batch) == 10000:
+                db.execute(insert(ChatMessage), batch)
+                batch.clear()
+        if batch:
+            db.execute(insert(ChatMessage), batch)
+        db.commit()
+        index_elapsed = time.perf_counter() - started
+
+    query_sets = {
+        "common_word": lambda: rng.choice(COMMON_WORDS[:8]),
+        "rare_word": lambda: rng.choice(words[200:2000]),
+        "prefix": lambda: rng.choice(COMMON_WORDS)[:3],
+        "two_words": lambda: " ".join(rng.sample(COMMON_WORDS, 2)),
+    }
+    result = {
+        "database_url": args.database_url.split("@")[-1],
+        "messages": args.messages,
+        "owners": args.owners,
+        "groups": len(groups),
+        "indexed_messages_per_sec": round(args.messages / index_elapsed, 1),
+        "ranked_search": {},
+    }
+    with SessionLocal() as db:
+        for name, make_query in query_sets.items():
+            samples, hits = [], 0
+            for _ in range(args.queries):
+                owner_id, _groups = rng.choice(owners)
+                query = make_query()
+                started = time.perf_counter()
+                page, _more = search(db, owner_id, query, ("message",), limit=20)
+                samples.append(time.perf_counter() - started)
+                hits += len(page)
+            result["ranked_search"][name] = {**percentiles(samples), "avg_hits": round(hits / args.queries, 1)}
+
+        # What search costs without an index: a LIKE scan over the owner's chat groups, newest first.
+        samples = []
+        for _ in range(args.scan_queries):
+            owner_id, owner_groups = rng.choice(owners)
+            pattern = f"%{rng.choice(words[200:2000])}%"
+            started = time.perf_counter()
+            db.execute(
+                select(ChatMessage.id)
+                .where(ChatMessage.group_id.in_(owner_groups), ChatMessage.text.like(pattern))
+                .order_by(ChatMessage.created_at.desc())
+                .limit(20)
+            ).all()
+            samples.append(time.perf_counter() - started)
+        result["like_scan_rare_word"] = percentiles(samples)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
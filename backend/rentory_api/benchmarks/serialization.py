@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import httpx
+
+from .load import _percentile
+
+
+async def _measure(client: httpx.AsyncClient, path: str, requests: int) -> tuple[list[float], bytes]:
+    body = b""
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+        body = response.content
+    return samples, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response model validation versus FAST_JSON_RESPONSES on the large list endpoints")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./rentory_bench.db"))
+    parser.add_argument("--properties", type=int, default=200, help="Properties of the measured owner")
+    parser.add_argument("--tenants-per-property", type=int, default=20)
+    parser.add_argument("--chat-limit", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app import main as api
+    from app.auth import token_service
+    from app.cache import response_cache
+    from app.database import engine
+
+    from .portfolio import PortfolioSize, seed_portfolio
+
+    size = PortfolioSize(
+        owners=1,
+        properties_per_owner=args.properties,
+        tenants_per_property=args.tenants_per_property,
+        messages_per_property=args.chat_limit,
+        payments_per_tenant=0,
+    )
+    portfolio = seed_portfolio(engine, size)
+    owner_id = portfolio.owner_ids[0]
+    property_id = portfolio.properties[0][0]
+    paths = {
+        "owner_properties": f"/owners/{owner_id}/properties",
+        "property_details": f"/properties/{property_id}",
+        "chat_list": f"/properties/{property_id}/chat?limit={args.chat_limit}",
+    }
+
+    async def run() -> dict:
+        results: dict = {}
+        transport = httpx.ASGITransport(app=api.app)
+        # The owner's token rides on every request; the property and chat reads simply ignore it.
+        headers = {"Authorization": f"Bearer {token_service.issue(owner_id, 'owner')}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            # Uncached runs measure the loader plus serialization; cached runs only the encoding of a stored body.
+            for cached in (False, True):
+                response_cache.ttl = 30 if cached else 0
+                for name, path in paths.items():
+                    if cached and name == "chat_list":
+                        continue
+                    label = f"{name}_cached" if cached else name
+                    bodies, entry = {}, {}
+                    for mode, fast in (("validated", False), ("fast", True)):
+                        api.FAST_JSON_RESPONSES = fast
+                        response_cache.clear()
+                        await _measure(client, path, 5)
+                        samples, bodies[mode] = await _measure(client, path, args.requests)
+                        entry[mode] = {
+                            "requests_per_sec": round(len(samples) / sum(samples), 1),
+                            "p50_ms": round(statistics.median(samples) * 1000, 3),
+                            "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                        }
+                    entry["bytes"] = len(bodies["fast"])
+                    entry["identical"] = bodies["fast"] == bodies["validated"]
+                    entry["speedup"] = round(entry["fast"]["requests_per_sec"] / entry["validated"]["requests_per_sec"], 2)
+                    results[label] = entry
+        return results
+
+    result = {
+        "database_url": args.database_url.split("@")[-1],
+        "properties": args.properties,
+        "tenants_per_property": args.tenants_per_property,
+        "chat_limit": args.chat_limit,
+        "endpoints": asyncio.run(run()),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+
+from .load import API_ROOT, BENCH_TOKEN_SECRET, _percentile, start_server
+
+# Each scenario turns an RNG and the seeded portfolio into one request: (method, path, JSON body or None, and the
+# user whose bearer token it is sent with, or None).
+Scenario = Callable[[random.Random, dict], tuple[str, str, dict | None, str | None]]
+
+
+def _owner_dashboard(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    owner_id = rng.choice(fixture["owner_ids"])
+    return "GET", rng.choice([f"/owners/{owner_id}/properties", f"/owners/{owner_id}/analytics"]), None, owner_id
+
+
+def _tenant_dashboard(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    tenant_id, _property_id, _phone = rng.choice(fixture["tenants"])
+    return "GET", f"/tenants/{tenant_id}/dashboard", None, tenant_id
+
+
+def _property_details(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    property_id, _owner_id = rng.choice(fixture["properties"])
+    return "GET", f"/properties/{property_id}", None, None
+
+
+def _chat_list(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    property_id, _owner_id = rng.choice(fixture["properties"])
+    return "GET", f"/properties/{property_id}/chat", None, None
+
+
+def _chat_post(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    tenant_id, property_id, _phone = rng.choice(fixture["tenants"])
+    return "POST", f"/properties/{property_id}/chat", {"sender_id": tenant_id, "text": f"bench message {rng.getrandbits(32)}"}, None
+
+
+def _payment(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    tenant_id, property_id, _phone = rng.choice(fixture["tenants"])
+    payload = {"property_id": property_id, "tenant_id": tenant_id, "bill_type": rng.choice(["rent", "water"]), "amount": 500.0}
+    return "POST", "/payments", payload, None
+
+
+def _tenant_balance(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    tenant_id, property_id, _phone = rng.choice(fixture["tenants"])
+    return "GET", f"/properties/{property_id}/tenants/{tenant_id}/balance", None, tenant_id
+
+
+def _login(rng: random.Random, fixture: dict) -> tuple[str, str, dict | None, str | None]:
+    _tenant_id, _property_id, phone = rng.choice(fixture["tenants"])
+    return "POST", "/auth/login", {"identifier": phone, "password": fixture["password"], "role": "tenant"}, None
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "owner_dashboard": _owner_dashboard,
+    "tenant_dashboard": _tenant_dashboard,
+    "property_details": _property_details,
+    "chat_list": _chat_list,
+    "chat_post": _chat_post,
+    "payment_post": _payment,
+    "tenant_balance": _tenant_balance,
+    "login": _login,
+}
+
+
+async def run_scenario(base_url: str, fixture: dict, scenario: Scenario, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker(rng: random.Random, deadline: float, record: bool) -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                method, path, body, user_id = scenario(rng, fixture)
+                headers = {"Authorization": f"Bearer {fixture['tokens'][user_id]}"} if user_id else None
+                started = time.perf_counter()
+                response = await client.request(method, path, json=body, headers=headers)
+                if record:
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code >= 400:
+                        errors += 1
+
+        # Every worker draws from its own seeded RNG, so two runs issue the same request sequence.
+        rngs = [random.Random(seed * 1000 + index) for index in range(concurrency)]
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(worker(rng, deadline, False) for rng in rngs))
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(worker(rng, deadline, True) for rng in rngs))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        return {"requests": 0, "errors": 0}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def _git_revision() -> dict:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=API_ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _change(current: float | None, baseline: float | None) -> float | None:
+    if not current or not baseline:
+        return None
+    return round((current - baseline) / baseline * 100, 1)
+
+
+# Percent change per scenario against an earlier run's JSON; positive throughput and negative latency are better.
+def compare(result: dict, baseline: dict) -> dict:
+    changes = {}
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        changes[name] = {
+            f"{metric}_change_pct": _change(current.get(metric), previous.get(metric))
+            for metric in ("requests_per_sec", "p50_ms", "p95_ms", "p99_ms")
+        }
+    return {"commit": baseline.get("commit"), "scenarios": changes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a synthetic portfolio and drive the hot endpoints at fixed concurrency")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./rentory_bench.db"))
+    parser.add_argument("--async-mode", action="store_true", help="Run the API with DATABASE_ASYNC=1")
+    parser.add_argument("--owners", type=int, default=50)
+    parser.add_argument("--properties-per-owner", type=int, default=10)
+    parser.add_argument("--tenants-per-property", type=int, default=4)
+    parser.add_argument("--messages-per-property", type=int, default=200)
+    parser.add_argument("--payments-per-tenant", type=int, default=24)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds per scenario before the run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path, help="Write the JSON result here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="Earlier result to report percent changes against")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from sqlalchemy import create_engine
+
+    from app.auth import TokenService
+
+    from .portfolio import BENCH_PASSWORD, PortfolioSize, seed_portfolio
+
+    size = PortfolioSize(
+        owners=args.owners,
+        properties_per_owner=args.properties_per_owner,
+        tenants_per_property=args.tenants_per_property,
+        messages_per_property=args.messages_per_property,
+        payments_per_tenant=args.payments_per_tenant,
+    )
+    bind = create_engine(args.database_url)
+    portfolio = seed_portfolio(bind, size, args.seed)
+    bind.dispose()
+    # Tokens are signed here with the servers' key, so the measured requests skip login.
+    signer = TokenService(secret=BENCH_TOKEN_SECRET, ttl=24 * 3600)
+    tokens = {owner_id: signer.issue(owner_id, "owner") for owner_id in portfolio.owner_ids}
+    tokens.update({tenant_id: signer.issue(tenant_id, "tenant") for tenant_id, _property_id, _phone in portfolio.tenants})
+    fixture = {
+        "owner_ids": portfolio.owner_ids,
+        "properties": portfolio.properties,
+        "tenants": portfolio.tenants,
+        "password": BENCH_PASSWORD,
+        "tokens": tokens,
+    }
+
+    result = {
+        **_git_revision(),
+        "python": platform.python_version(),
+        "database_url": args.database_url.split("@")[-1],
+        "async_mode": args.async_mode,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "seed": args.seed,
+        "portfolio": {"rows": portfolio.rows, "seed_seconds": round(portfolio.seed_seconds, 1)},
+        "scenarios": {},
+    }
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.database_url, args.async_mode, args.port)
+    try:
+        for name in names:
+            # The per-scenario seed depends on the scenario, not on which subset was selected.
+            seed = args.seed + list(SCENARIOS).index(name)
+            result["scenarios"][name] = asyncio.run(
+                run_scenario(base_url, fixture, SCENARIOS[name], args.concurrency, args.duration, args.warmup, seed)
+            )
+            print(f"{name}: {result['scenarios'][name]}", file=sys.stderr)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.baseline is not None:
+        result["baseline"] = compare(result, json.loads(args.baseline.read_text()))
+    output = json.dumps(result, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import json
+import random
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image, ImageFilter
+
+from app import image_store
+from app.image_store import IMAGE_VARIANT_WIDTHS, LocalBlobStore, generate_variants, variant_key
+
+
+# Photo-like test images: smooth gradients plus blurred noise, so JPEG sizes resemble real camera uploads.
+def synthetic_photo(width: int, height: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), 64).convert("RGB").filter(ImageFilter.GaussianBlur(1))
+    tint = Image.new("RGB", (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    image = Image.blend(Image.blend(base, noise, 0.5), tint, 0.3)
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes per owner dashboard load with and without thumbnail variants")
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--width", type=int, default=2400)
+    parser.add_argument("--height", type=int, default=1600)
+    args = parser.parse_args()
+
+    image_store.image_store = LocalBlobStore(tempfile.mkdtemp(prefix="rentory-bench-images-"))
+    originals = [synthetic_photo(args.width, args.height, seed) for seed in range(args.cards)]
+
+    started = time.perf_counter()
+    keys = []
+    for index, data in enumerate(originals):
+        key = f"{index:064x}.jpg"
+        image_store.image_store.put(key, data)
+        generate_variants(key, data)
+        keys.append(key)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "cards": args.cards,
+        "source_resolution": f"{args.width}x{args.height}",
+        "variant_generation_ms_per_image": round(elapsed / args.cards * 1000, 2),
+        "dashboard_bytes": {"original": sum(len(data) for data in originals)},
+    }
+    for width in IMAGE_VARIANT_WIDTHS:
+        result["dashboard_bytes"][f"w{width}"] = sum(len(image_store.image_store.get(variant_key(key, width))) for key in keys)
+    for name, size in list(result["dashboard_bytes"].items())[1:]:
+        result[f"reduction_{name}"] = round(result["dashboard_bytes"]["original"] / size, 1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,86 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import base64
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
 
 os.environ["DATABASE_URL"] = "sqlite:///./rentory_test.db"
+os.environ["IMAGE_STORE_DIR"] = tempfile.mkdtemp(prefix="rentory-images-")
+os.environ["PASSWORD_SCRYPT_N"] = "1024"
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, func, insert, select, update
+from starlette.websockets import WebSocketDisconnect
 
-from app.database import Base, SessionLocal, engine
+from app import analytics, billing
+from app import main as main_module
+from app.analytics import rebuild_owner_analytics
+from app.auth import InvalidToken, TokenService, token_service
+from app.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache, response_cache
+from app.database import Base, SessionLocal, async_engine, engine
+from app.idempotency import idempotency_store
 from app.main import app
-from app.models import Property, User
+from app.maintenance import rebuild_status_counts, status_counts
+from app.metrics import metrics, profiler
+from app.migrations import backfill_status_counts
+from app.models import (
+    Bill,
+    BillingRun,
+    LedgerEntry,
+    LedgerSnapshot,
+    MaintenanceStatusCount,
+    Notification,
+    NotificationDelivery,
+    NotificationJob,
+    OwnerAnalyticsSummary,
+    Payment,
+    Property,
+    PropertyTenant,
+    User,
+)
+from app.notifications import LocalJobQueue, NotificationWorker, notification_worker
+from app.passwords import PasswordHasher
 
 client = TestClient(app)
 
 
+@contextmanager
+def count_queries():
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [engine] if async_engine is None else [async_engine.sync_engine]
+    for bind in engines:
+        event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for bind in engines:
+            event.remove(bind, "before_cursor_execute", record)
+
+
+def bearer(user_id: str, role: str = "owner") -> dict:
+    return {"Authorization": f"Bearer {token_service.issue(user_id, role)}"}
+
+
 def setup_function():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    idempotency_store.clear()
 
 
 def test_health():
@@ -43,7 +104,8 @@ def test_property_image_field_supports_long_data_uris():
     assert owner_signup.status_code == 201
     owner_id = owner_signup.json()["user_id"]
 
-    long_data_uri = "data:image/jpeg;base64," + ("A" * 5000)
+    jpeg_bytes = b"\xff\xd8\xff\xe0" + bytes(3746)
+    long_data_uri = "data:image/jpeg;base64," + base64.b64encode(jpeg_bytes).decode()
     create_property = client.post(
         f"/owners/{owner_id}/properties",
         json={
@@ -58,9 +120,75 @@ def test_property_image_field_supports_long_data_uris():
     )
 
     assert create_property.status_code == 201
-    assert create_property.json()["image_url"] == long_data_uri
+    image_url = create_property.json()["image_url"]
+    assert image_url.startswith("/images/") and len(image_url) < 100
     assert Property.__table__.c.image_url.type.length is None
 
+    db = SessionLocal()
+    assert db.get(Property, create_property.json()["id"]).image_url == image_url
+    db.close()
+
+    image = client.get(image_url)
+    assert image.status_code == 200
+    assert image.headers["content-type"] == "image/jpeg"
+    assert image.content == jpeg_bytes
+
+
+def test_image_upload_is_content_addressed_and_cacheable():
+    png_bytes = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+    upload = client.post("/images", content=png_bytes, headers={"Content-Type": "image/png"})
+    assert upload.status_code == 201
+    image_url = upload.json()["image_url"]
+    assert upload.json()["size"] == len(png_bytes)
+
+    duplicate = client.post("/images", content=png_bytes, headers={"Content-Type": "image/png"})
+    assert duplicate.json()["image_url"] == image_url
+
+    image = client.get(image_url)
+    assert image.status_code == 200
+    assert image.content == png_bytes
+    assert "immutable" in image.headers["cache-control"]
+    etag = image.headers["etag"]
+
+    not_modified = client.get(image_url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    partial = client.get(image_url, headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == png_bytes[:8]
+
+    assert client.get(image_url, headers={"If-None-Match": f'W/"x", {etag}'}).status_code == 304
+    assert client.get(image_url, headers={"If-None-Match": f'"x{etag[1:]}'}).status_code == 200
+
+    unsupported = client.post("/images", content=b"%PDF-1.4", headers={"Content-Type": "application/pdf"})
+    assert unsupported.status_code == 415
+    disguised = client.post("/images", content=b"<svg onload=alert(1)>", headers={"Content-Type": "image/png"})
+    assert disguised.status_code == 415
+    # The bytes decide the stored type, not the label a client put on them.
+    relabelled = client.post("/images", content=b"GIF89a" + bytes(32), headers={"Content-Type": "image/png"})
+    assert relabelled.json()["image_url"].endswith(".gif")
+    assert relabelled.json()["content_type"] == "image/gif"
+    assert client.get("/images/not-a-key.png").status_code == 404
+
+
+def test_image_upload_rejects_bad_lengths_and_caps_streamed_bodies(monkeypatch):
+    png_bytes = b"\x89PNG\r\n\x1a\n" + bytes(64)
+    invalid = client.post("/images", content=png_bytes, headers={"Content-Type": "image/png", "Content-Length": "lots"})
+    assert invalid.status_code == 400
+
+    monkeypatch.setattr(main_module, "MAX_IMAGE_BYTES", 100)
+    declared = client.post("/images", content=png_bytes * 2, headers={"Content-Type": "image/png"})
+    assert declared.status_code == 413
+
+    def chunks():
+        for _ in range(50):
+            yield png_bytes
+
+    streamed = client.post("/images", content=chunks(), headers={"Content-Type": "image/png"})
+    assert streamed.status_code == 413
+    assert "content-length" not in streamed.request.headers
+
 def test_owner_and_property_flow_with_analytics_and_chat():
     owner_signup = client.post(
         "/auth/owners/signup",
@@ -140,12 +268,24 @@ def test_owner_property_qr_chat_and_tenant_registration_flow():
     assert chat_list.status_code == 200
     assert len(chat_list.json()) == 2
 
-    detail_resp = client.get(f"/properties/{property_id}")
+    with count_queries() as detail_queries:
+        detail_resp = client.get(f"/properties/{property_id}")
     assert detail_resp.status_code == 200
+    assert len(detail_queries) == 2
     payload = detail_resp.json()
     assert payload["property"]["qr_code"] == property_data["qr_code"]
     assert payload["property"]["qr_code_url"].startswith("https://api.qrserver.com")
     assert payload["tenants"][0]["tenant_id"] == tenant_id
+    assert payload["owner_phone"] == "900000001"
+
+    with count_queries() as dashboard_queries:
+        dashboard = client.get(f"/tenants/{tenant_id}/dashboard", headers=bearer(tenant_id, "tenant"))
+    assert dashboard.status_code == 200
+    assert len(dashboard_queries) == 1
+    assert dashboard.json()["property"]["id"] == property_id
+    assert dashboard.json()["owner_phone"] == "900000001"
+
+    assert client.get(f"/tenants/{owner_id}/dashboard", headers=bearer(owner_id, "tenant")).status_code == 404
 
 
 def test_qr_capacity_limit_and_existing_integrations():
@@ -238,3 +378,1283 @@ def test_qr_capacity_limit_and_existing_integrations():
         },
     )
     assert broadcast_resp.status_code == 202
+
+
+def test_chat_keyset_pagination_and_since_polling():
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={
+            "full_name": "Chat Owner",
+            "phone": "900000300",
+            "email": "chat-owner@rentory.local",
+            "password": "1234",
+        },
+    )
+    owner_id = owner_signup.json()["user_id"]
+    create_property = client.post(
+        f"/owners/{owner_id}/properties",
+        json={
+            "location": "Vyttila",
+            "name": "Busy Building",
+            "unit_type": "2BHK",
+            "capacity": 4,
+            "rent": 18000,
+            "image_url": "https://example.com/busy.jpg",
+        },
+    )
+    property_id = create_property.json()["id"]
+
+    for index in range(5):
+        response = client.post(f"/properties/{property_id}/chat", json={"sender_id": owner_id, "text": f"message {index}"})
+        assert response.status_code == 201
+
+    latest = client.get(f"/properties/{property_id}/chat", params={"limit": 2})
+    assert latest.status_code == 200
+    assert [m["text"] for m in latest.json()] == ["message 3", "message 4"]
+    assert latest.headers["X-Chat-Has-More"] == "true"
+
+    older = client.get(f"/properties/{property_id}/chat", params={"limit": 2, "before": latest.headers["X-Chat-Before-Cursor"]})
+    assert [m["text"] for m in older.json()] == ["message 1", "message 2"]
+
+    oldest = client.get(f"/properties/{property_id}/chat", params={"limit": 2, "before": older.headers["X-Chat-Before-Cursor"]})
+    assert [m["text"] for m in oldest.json()] == ["message 0"]
+    assert oldest.headers["X-Chat-Has-More"] == "false"
+
+    since_cursor = latest.headers["X-Chat-After-Cursor"]
+    nothing_new = client.get(f"/properties/{property_id}/chat", params={"after": since_cursor})
+    assert nothing_new.json() == []
+    assert nothing_new.headers["X-Chat-After-Cursor"] == since_cursor
+
+    client.post(f"/properties/{property_id}/chat", json={"sender_id": owner_id, "text": "message 5"})
+    new_messages = client.get(f"/properties/{property_id}/chat", params={"after": since_cursor})
+    assert [m["text"] for m in new_messages.json()] == ["message 5"]
+
+    invalid = client.get(f"/properties/{property_id}/chat", params={"after": "not-a-cursor"})
+    assert invalid.status_code == 400
+    tampered = base64.urlsafe_b64encode(b"2026-01-01T00:00:00|not-a-uuid").decode().rstrip("=")
+    assert client.get(f"/properties/{property_id}/chat", params={"before": tampered}).status_code == 400
+
+
+def test_chat_websocket_receives_published_messages_for_members_only():
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={
+            "full_name": "Live Owner",
+            "phone": "900000400",
+            "email": "live-owner@rentory.local",
+            "password": "1234",
+        },
+    )
+    owner_id = owner_signup.json()["user_id"]
+    create_property = client.post(
+        f"/owners/{owner_id}/properties",
+        json={
+            "location": "Aluva",
+            "name": "Live Chat Homes",
+            "unit_type": "1BHK",
+            "capacity": 2,
+            "rent": 9000,
+            "image_url": "https://example.com/live.jpg",
+        },
+    )
+    property_id = create_property.json()["id"]
+
+    owner_headers = {"Authorization": f"Bearer {owner_signup.json()['access_token']}"}
+    with client.websocket_connect(f"/properties/{property_id}/chat/ws", headers=owner_headers) as websocket:
+        posted = client.post(f"/properties/{property_id}/chat", json={"sender_id": owner_id, "text": "Water off at 3pm"})
+        assert posted.status_code == 201
+
+        event = websocket.receive_json()
+        assert event["message"]["id"] == posted.json()["id"]
+        assert event["message"]["text"] == "Water off at 3pm"
+
+        backlog = client.get(f"/properties/{property_id}/chat", params={"after": event["cursor"]})
+        assert backlog.json() == []
+
+    # Browsers cannot set headers on a WebSocket handshake, so the token may come in the query string instead.
+    with client.websocket_connect(f"/properties/{property_id}/chat/ws?access_token={owner_signup.json()['access_token']}") as websocket:
+        posted = client.post(f"/properties/{property_id}/chat", json={"sender_id": owner_id, "text": "Back on"})
+        assert websocket.receive_json()["message"]["id"] == posted.json()["id"]
+
+    outsider = client.post("/auth/owners/signup", json={"full_name": "Live Outsider", "phone": "900000401", "password": "1234"}).json()
+    outsider_token = outsider["access_token"]
+    # Naming a member in user_id is not enough: the subscriber is whoever the token belongs to.
+    for path in (
+        f"/properties/{property_id}/chat/ws?user_id={owner_id}",
+        f"/properties/{property_id}/chat/ws?access_token={outsider_token}",
+        f"/properties/{property_id}/chat/ws?user_id={owner_id}&access_token={outsider_token}",
+    ):
+        with pytest.raises(WebSocketDisconnect) as rejected:
+            with client.websocket_connect(path):
+                pass
+        assert rejected.value.code == 1008
+
+    stream_path = f"/properties/{property_id}/chat/stream"
+    assert client.get(stream_path, params={"user_id": owner_id}).status_code == 401
+    assert client.get(stream_path, headers={"Authorization": f"Bearer {outsider_token}"}).status_code == 403
+    assert client.get(stream_path, params={"user_id": owner_id}, headers={"Authorization": f"Bearer {outsider_token}"}).status_code == 403
+
+
+def test_property_cards_expose_generated_thumbnail_variants():
+    pil_image = pytest.importorskip("PIL.Image")
+    from io import BytesIO
+
+    from app import image_store as image_store_module
+    from app.image_store import image_variant_urls, schedule_variants, wait_for_variants
+
+    buffer = BytesIO()
+    pil_image.new("RGB", (1200, 800), (200, 120, 40)).save(buffer, "JPEG", quality=95)
+    upload = client.post("/images", content=buffer.getvalue(), headers={"Content-Type": "image/jpeg"})
+    assert upload.status_code == 201
+
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Thumb Owner", "phone": "900000500", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+    client.post(
+        f"/owners/{owner_id}/properties",
+        json={
+            "location": "Kakkanad",
+            "name": "Thumbnail Towers",
+            "unit_type": "3BHK",
+            "capacity": 3,
+            "rent": 30000,
+            "image_url": upload.json()["image_url"],
+        },
+    )
+    client.post(
+        f"/owners/{owner_id}/properties",
+        json={
+            "location": "Kakkanad",
+            "name": "External Image Villa",
+            "unit_type": "3BHK",
+            "capacity": 3,
+            "rent": 30000,
+            "image_url": "https://example.com/villa.jpg",
+        },
+    )
+
+    cards = {card["name"]: card for card in client.get(f"/owners/{owner_id}/properties", headers=bearer(owner_id)).json()}
+    assert cards["External Image Villa"]["thumbnail_urls"] == {}
+    thumbnail_urls = cards["Thumbnail Towers"]["thumbnail_urls"]
+    assert set(thumbnail_urls) == {"160", "480"}
+
+    wait_for_variants(timeout=10)
+    thumbnail = client.get(thumbnail_urls["160"])
+    assert thumbnail.status_code == 200
+    assert thumbnail.headers["content-type"] == "image/webp"
+    assert pil_image.open(BytesIO(thumbnail.content)).size == (160, 107)
+    assert len(thumbnail.content) < len(buffer.getvalue()) / 10
+
+    undecodable = client.post("/images", content=b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, headers={"Content-Type": "image/png"}).json()["image_url"]
+    wait_for_variants(timeout=10)
+    assert image_variant_urls(undecodable) == {}
+    # Old clients may still hold variant URLs: they get the original, without the source being decoded again.
+    variant_url = undecodable.replace(".png", "-w160.webp")
+    fallback = client.get(variant_url, follow_redirects=False)
+    assert fallback.status_code == 307
+    assert fallback.headers["location"] == undecodable
+    assert schedule_variants(undecodable.removeprefix("/images/")) is None
+    # Another worker, or this one after a restart, finds the marker blob.
+    image_store_module._undecodable.clear()
+    assert schedule_variants(undecodable.removeprefix("/images/")) is None
+    assert image_variant_urls(undecodable) == {}
+
+
+def test_dashboard_reads_are_cached_and_invalidated_by_writes():
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Cache Owner", "phone": "900000600", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+    create_property = client.post(
+        f"/owners/{owner_id}/properties",
+        json={
+            "location": "Fort Kochi",
+            "name": "Cached Cottage",
+            "unit_type": "1BHK",
+            "capacity": 2,
+            "rent": 11000,
+            "image_url": "https://example.com/cottage.jpg",
+        },
+    )
+    property_data = create_property.json()
+
+    client.get(f"/owners/{owner_id}/properties", headers=bearer(owner_id))
+    with count_queries() as cached_queries:
+        cards = client.get(f"/owners/{owner_id}/properties", headers=bearer(owner_id))
+        client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id))
+        client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id))
+        client.get(f"/properties/{property_data['id']}")
+        client.get(f"/properties/{property_data['id']}")
+    assert cards.json()[0]["occupied_count"] == 0
+    assert len(cached_queries) == 3
+    assert client.get("/cache/stats").json()["hits"] == 3
+
+    client.post(
+        "/auth/tenants/register",
+        json={
+            "qr_code": property_data["qr_code"],
+            "full_name": "Cache Tenant",
+            "age": 30,
+            "phone": "900000601",
+            "documents": "id.png",
+            "password": "1234",
+        },
+    )
+    assert client.get(f"/owners/{owner_id}/properties", headers=bearer(owner_id)).json()[0]["occupied_count"] == 1
+    assert client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id)).json()["total_tenants"] == 1
+    assert len(client.get(f"/properties/{property_data['id']}").json()["tenants"]) == 1
+
+    client.patch(f"/properties/{property_data['id']}/water-bill", json={"status": "paid"})
+    assert client.get(f"/properties/{property_data['id']}").json()["water_bill_status"] == "paid"
+
+    assert client.get("/owners/33333333-3333-4333-8333-333333333333/properties", headers=bearer("33333333-3333-4333-8333-333333333333")).status_code == 404
+
+
+def test_memory_cache_backend_evicts_least_recently_used_and_expired_entries():
+    # Each key holds a generation entry next to its value.
+    cache = ResponseCache(MemoryCacheBackend(max_entries=4), ttl=60)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: 0)
+    cache.get_or_load("c", lambda: 3)
+    assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+    assert cache.stats()["hits"] == 1
+
+    expiring = ResponseCache(MemoryCacheBackend(), ttl=0.01)
+    expiring.get_or_load("a", lambda: 1)
+    time.sleep(0.02)
+    assert expiring.get_or_load("a", lambda: 2) == 2
+
+
+class _RedisStandIn:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, px, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.values) if key.startswith(match.rstrip("*"))]
+
+
+def test_redis_cache_backend_round_trips_json_values():
+    cache = ResponseCache(RedisCacheBackend(_RedisStandIn()), ttl=60)
+    assert cache.get_or_load("owner:1:analytics", lambda: {"total_properties": 2}) == {"total_properties": 2}
+    assert cache.get_or_load("owner:1:analytics", lambda: None) == {"total_properties": 2}
+    cache.invalidate("owner:1:analytics")
+    assert cache.get_or_load("owner:1:analytics", lambda: {"total_properties": 3}) == {"total_properties": 3}
+    assert cache.stats()["entries"] == 2
+
+
+def test_response_cache_drops_loads_that_race_an_invalidation():
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60)
+    loading = threading.Event()
+    invalidated = threading.Event()
+
+    def slow_load():
+        loading.set()
+        assert invalidated.wait(5)
+        return "stale"
+
+    loader = threading.Thread(target=lambda: cache.get_or_load("owner:1:properties", slow_load))
+    loader.start()
+    assert loading.wait(5)
+    cache.invalidate("owner:1:properties")
+    invalidated.set()
+    loader.join(5)
+
+    assert cache.get_or_load("owner:1:properties", lambda: "fresh") == "fresh"
+    assert cache.get_or_load("owner:1:properties", lambda: "reloaded") == "fresh"
+
+
+def test_owner_analytics_summary_is_maintained_and_rebuildable():
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Summary Owner", "phone": "900000700", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+    assert client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id)).json() == {"grouped_by_place": {}, "total_properties": 0, "total_tenants": 0}
+
+    qr_codes = []
+    for name, location in [("North Block", "Kaloor"), ("South Block", "Kaloor"), ("Lake View", "Marine Drive")]:
+        created = client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": location, "name": name, "unit_type": "2BHK", "capacity": 2, "rent": 20000, "image_url": "https://example.com/a.jpg"},
+        )
+        qr_codes.append(created.json()["qr_code"])
+    for index, qr_code in enumerate(qr_codes[:2]):
+        client.post(
+            "/auth/tenants/register",
+            json={"qr_code": qr_code, "full_name": f"Tenant {index}", "age": 30, "phone": f"90000071{index}", "documents": "id.png", "password": "1234"},
+        )
+
+    with count_queries() as analytics_queries:
+        analytics = client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id)).json()
+    assert len(analytics_queries) == 1
+    assert analytics == {"grouped_by_place": {"Kaloor": 2, "Marine Drive": 1}, "total_properties": 3, "total_tenants": 2}
+
+    db = SessionLocal()
+    assert rebuild_owner_analytics(db, check_only=True) == []
+    db.get(OwnerAnalyticsSummary, owner_id).total_tenants = 99
+    db.commit()
+    assert rebuild_owner_analytics(db, check_only=True) == [owner_id]
+    assert rebuild_owner_analytics(db) == [owner_id]
+    assert db.get(OwnerAnalyticsSummary, owner_id).total_tenants == 2
+    db.close()
+
+
+def test_first_analytics_write_survives_a_concurrent_first_write(monkeypatch):
+    owner_id = client.post(
+        "/auth/owners/signup", json={"full_name": "Legacy Owner", "phone": "900000750", "password": "1234"}
+    ).json()["user_id"]
+    db = SessionLocal()
+    db.delete(db.get(OwnerAnalyticsSummary, owner_id))
+    db.commit()
+    db.close()
+
+    # Another request materializes the summary between this write's lookup and its insert.
+    original_compute = analytics.compute_owner_analytics
+
+    def compute_while_another_write_lands(db, owner_id):
+        computed = original_compute(db, owner_id)
+        db.execute(
+            insert(OwnerAnalyticsSummary).values(
+                owner_id=owner_id, total_properties=1, total_tenants=0, properties_by_location={"Aluva": 1}, updated_at=datetime.utcnow()
+            )
+        )
+        monkeypatch.setattr(analytics, "compute_owner_analytics", original_compute)
+        return computed
+
+    monkeypatch.setattr(analytics, "compute_owner_analytics", compute_while_another_write_lands)
+    created = client.post(
+        f"/owners/{owner_id}/properties",
+        json={"location": "Kaloor", "name": "Race Flat", "unit_type": "1BHK", "capacity": 1, "rent": 9000, "image_url": "https://example.com/r.jpg"},
+    )
+    assert created.status_code == 201
+
+    db = SessionLocal()
+    summary = db.get(OwnerAnalyticsSummary, owner_id)
+    assert (summary.total_properties, summary.properties_by_location) == (2, {"Aluva": 1, "Kaloor": 1})
+    db.close()
+
+
+def test_bulk_property_import_streams_per_row_results():
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Bulk Owner", "phone": "900000800", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+
+    csv_body = (
+        "location,name,unit_type,capacity,rent,image_url,description\n"
+        "Kaloor,Unit 1,1BHK,2,9000,https://example.com/1.jpg,\n"
+        "Kaloor,Unit 2,1BHK,0,9000,https://example.com/2.jpg,capacity must be positive\n"
+        'Aluva,Unit 3,2BHK,3,14000,https://example.com/3.jpg,"Corner unit, river side"\n'
+    )
+    imported = client.post(f"/owners/{owner_id}/properties:import", content=csv_body, headers={"Content-Type": "text/csv"})
+    assert imported.status_code == 200
+    lines = [json.loads(line) for line in imported.text.splitlines()]
+    assert [line.get("status") for line in lines[:3]] == ["created", "error", "created"]
+    assert lines[1]["errors"][0]["loc"] == ["capacity"]
+    assert lines[3]["summary"]["created"] == 2 and lines[3]["summary"]["failed"] == 1
+
+    ndjson_body = "\n".join(
+        [
+            json.dumps({"location": "Aluva", "name": "Unit 4", "unit_type": "Studio", "capacity": 1, "rent": 7000, "image_url": "https://example.com/4.jpg"}),
+            "not json",
+        ]
+    )
+    imported = client.post(
+        f"/owners/{owner_id}/properties:import", content=ndjson_body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    lines = [json.loads(line) for line in imported.text.splitlines()]
+    assert [line.get("status") for line in lines[:2]] == ["created", "error"]
+
+    cards = client.get(f"/owners/{owner_id}/properties", headers=bearer(owner_id)).json()
+    assert sorted(card["name"] for card in cards) == ["Unit 1", "Unit 3", "Unit 4"]
+    assert client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id)).json()["grouped_by_place"] == {"Kaloor": 1, "Aluva": 2}
+
+    unit_3 = next(card for card in cards if card["name"] == "Unit 3")
+    details = client.get(f"/properties/{unit_3['id']}").json()
+    assert details["description"] == "Corner unit, river side"
+    assert details["chat_group_name"] == "Unit 3"
+    chat = client.post(f"/properties/{unit_3['id']}/chat", json={"sender_id": owner_id, "text": "Welcome"})
+    assert chat.status_code == 201
+
+    unsupported = client.post(f"/owners/{owner_id}/properties:import", content="x", headers={"Content-Type": "text/plain"})
+    assert unsupported.status_code == 415
+    bad_length = client.post(
+        f"/owners/{owner_id}/properties:import", content=csv_body, headers={"Content-Type": "text/csv", "Content-Length": "-1"}
+    )
+    assert bad_length.status_code == 400
+
+
+def test_broadcast_enqueues_one_job_and_worker_fans_out_in_batches(monkeypatch):
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Broadcast Owner", "phone": "900000900", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+    qr_codes = []
+    for index in range(3):
+        created = client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": "Kaloor", "name": f"Block {index}", "unit_type": "1BHK", "capacity": 2, "rent": 9000, "image_url": "https://example.com/b.jpg"},
+        )
+        qr_codes.append(created.json()["qr_code"])
+    for index, qr_code in enumerate(qr_codes):
+        client.post(
+            "/auth/tenants/register",
+            json={"qr_code": qr_code, "full_name": f"Tenant {index}", "age": 30, "phone": f"90000091{index}", "documents": "id.png", "password": "1234"},
+        )
+
+    notification_worker.run_until_empty()
+    monkeypatch.setattr(notification_worker, "batch_size", 2)
+    monkeypatch.setattr(notification_worker, "retry_delay", 0)
+    original_fan_out = notification_worker._fan_out_batch
+    calls = {"count": 0}
+
+    def flaky_fan_out(db, job, lease_owner):
+        calls["count"] += 1
+        if calls["count"] == 2:
+            raise RuntimeError("database hiccup")
+        return original_fan_out(db, job, lease_owner)
+
+    monkeypatch.setattr(notification_worker, "_fan_out_batch", flaky_fan_out)
+
+    with count_queries() as request_queries:
+        queued = client.post("/notifications/broadcast", json={"owner_id": owner_id, "title": "Water", "body": "Tank cleaning"})
+    assert queued.status_code == 202
+    assert len(request_queries) == 2
+    job_id = queued.json()["job_id"]
+    assert client.get(f"/notifications/jobs/{job_id}").json()["status"] == "queued"
+
+    assert notification_worker.run_until_empty() == 2
+    job = client.get(f"/notifications/jobs/{job_id}").json()
+    assert job["status"] == "done"
+    assert job["attempts"] == 2
+    assert job["notification_count"] == 3
+    assert job["delivery_count"] == 3
+
+    db = SessionLocal()
+    assert db.scalar(select(func.count(Notification.id))) == 3
+    assert db.scalar(select(func.count(NotificationDelivery.id))) == 3
+    db.close()
+
+
+def test_notification_jobs_are_claimed_once_across_workers():
+    owner_id = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Lease Owner", "phone": "900000950", "password": "1234"},
+    ).json()["user_id"]
+    for index in range(2):
+        client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": "Kaloor", "name": f"Lease {index}", "unit_type": "1BHK", "capacity": 2, "rent": 9000, "image_url": "https://example.com/l.jpg"},
+        )
+    job_id = client.post("/notifications/broadcast", json={"owner_id": owner_id, "title": "Lift", "body": "Service"}).json()["job_id"]
+
+    # Another worker holds the job: a restarting worker process neither requeues nor runs it.
+    db = SessionLocal()
+    db.execute(
+        update(NotificationJob)
+        .where(NotificationJob.id == job_id)
+        .values(status="running", lease_owner="other-worker", lease_expires_at=datetime.utcnow() + timedelta(minutes=1))
+    )
+    db.commit()
+    restarted = NotificationWorker(LocalJobQueue())
+    assert restarted.requeue_unfinished() == 0
+    notification_worker.run_until_empty()
+    assert db.scalar(select(func.count(Notification.id)).where(Notification.owner_id == owner_id)) == 0
+
+    # Once its lease runs out the job is recovered, and the worker that lost it can no longer write progress.
+    db.execute(update(NotificationJob).where(NotificationJob.id == job_id).values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    assert restarted.requeue_unfinished() == 1
+    assert restarted.run_until_empty() == 1
+    assert not restarted._update_held(db, job_id, "other-worker", status="queued")
+    db.rollback()
+
+    assert client.get(f"/notifications/jobs/{job_id}").json()["status"] == "done"
+    assert db.scalar(select(func.count(Notification.id)).where(Notification.owner_id == owner_id)) == 2
+    db.close()
+
+
+def test_tenant_inbox_pages_notifications_and_tracks_a_read_cursor():
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Inbox Owner", "phone": "900001000", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+    created = client.post(
+        f"/owners/{owner_id}/properties",
+        json={"location": "Kaloor", "name": "Inbox House", "unit_type": "1BHK", "capacity": 2, "rent": 9000, "image_url": "https://example.com/i.jpg"},
+    )
+    tenant = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": created.json()["qr_code"], "full_name": "Inbox Tenant", "age": 30, "phone": "900001001", "documents": "id.png", "password": "1234"},
+    )
+    tenant_id = tenant.json()["user_id"]
+
+    def broadcast(title):
+        client.post("/notifications/broadcast", json={"owner_id": owner_id, "title": title, "body": "..."})
+        notification_worker.run_until_empty()
+
+    notification_worker.run_until_empty()
+    broadcast("Rent due")
+    broadcast("Water cut")
+
+    inbox = client.get(f"/tenants/{tenant_id}/notifications", headers=bearer(tenant_id, "tenant"), params={"limit": 1}).json()
+    assert [n["title"] for n in inbox["notifications"]] == ["Water cut"]
+    assert inbox["unread_count"] == 2
+    assert inbox["notifications"][0]["read"] is False
+
+    older = client.get(f"/tenants/{tenant_id}/notifications", headers=bearer(tenant_id, "tenant"), params={"limit": 1, "before": inbox["next_cursor"]}).json()
+    assert [n["title"] for n in older["notifications"]] == ["Rent due"]
+    assert older["next_cursor"] is None
+
+    marked = client.post(f"/tenants/{tenant_id}/notifications/read", headers=bearer(tenant_id, "tenant"), json={})
+    assert marked.json()["unread_count"] == 0
+
+    broadcast("Lift maintenance")
+    inbox = client.get(f"/tenants/{tenant_id}/notifications", headers=bearer(tenant_id, "tenant")).json()
+    assert inbox["unread_count"] == 1
+    assert [(n["title"], n["read"]) for n in inbox["notifications"]] == [
+        ("Lift maintenance", False),
+        ("Water cut", True),
+        ("Rent due", True),
+    ]
+
+    stale = client.post(f"/tenants/{tenant_id}/notifications/read", headers=bearer(tenant_id, "tenant"), json={"cursor": inbox["last_read_cursor"]})
+    assert stale.json()["unread_count"] == 1
+    assert client.get(f"/tenants/{owner_id}/notifications", headers=bearer(owner_id, "tenant")).status_code == 404
+
+
+def test_parallel_qr_registrations_never_exceed_capacity(monkeypatch):
+    # Room for the whole burst, so every attempt reaches the capacity check instead of a 503.
+    monkeypatch.setattr(main_module, "password_hasher", PasswordHasher(max_pending=32))
+    owner_signup = client.post(
+        "/auth/owners/signup",
+        json={"full_name": "Burst Owner", "phone": "900002000", "password": "1234"},
+    )
+    owner_id = owner_signup.json()["user_id"]
+    capacity = 25
+    created = client.post(
+        f"/owners/{owner_id}/properties",
+        json={"location": "Vyttila", "name": "Burst Hostel", "unit_type": "Dorm", "capacity": capacity, "rent": 5000, "image_url": "https://example.com/b.jpg"},
+    )
+    qr_code = created.json()["qr_code"]
+    property_id = created.json()["id"]
+
+    def register(index):
+        return client.post(
+            "/auth/tenants/register",
+            json={"qr_code": qr_code, "full_name": f"Burst {index}", "age": 21, "phone": f"91{index:07d}", "documents": "id.png", "password": "1234"},
+        ).status_code
+
+    attempts = 200
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        statuses = list(pool.map(register, range(attempts)))
+
+    assert statuses.count(201) == capacity
+    assert statuses.count(409) == attempts - capacity
+
+    db = SessionLocal()
+    assert db.scalar(select(Property.occupied_count).where(Property.id == property_id)) == capacity
+    assert db.scalar(select(func.count(PropertyTenant.id)).where(PropertyTenant.property_id == property_id)) == capacity
+    assert db.scalar(select(func.count(User.id)).where(User.role == "tenant")) == capacity
+    db.close()
+    assert client.get(f"/owners/{owner_id}/analytics", headers=bearer(owner_id)).json()["total_tenants"] == capacity
+
+
+def test_login_upgrades_legacy_password_hashes():
+    db = SessionLocal()
+    db.add(User(id="66666666-6666-4666-8666-666666666666", role="owner", full_name="Legacy Owner", phone="900003000", password_hash="plain::1234"))
+    db.commit()
+    db.close()
+
+    assert client.post("/auth/login", json={"identifier": "900003000", "password": "wrong", "role": "owner"}).status_code == 401
+    assert client.post("/auth/login", json={"identifier": "900003000", "password": "1234", "role": "owner"}).status_code == 200
+
+    db = SessionLocal()
+    stored = db.scalar(select(User.password_hash).where(User.phone == "900003000"))
+    db.close()
+    assert stored.startswith("scrypt$1024$")
+    assert "1234" not in stored
+    assert client.post("/auth/login", json={"identifier": "900003000", "password": "1234", "role": "owner"}).status_code == 200
+    assert client.post("/auth/login", json={"identifier": "900003000", "password": "12345", "role": "owner"}).status_code == 401
+
+
+def test_placeholder_tenants_get_an_unusable_password():
+    owner = client.post("/auth/owners/signup", json={"full_name": "Placeholder Owner", "phone": "900003100", "password": "1234"}).json()
+    property_id = client.post(
+        f"/owners/{owner['user_id']}/properties",
+        json={"location": "Kochi", "name": "Placeholder Home", "unit_type": "1BHK", "capacity": 2, "rent": 8000, "image_url": "https://example.com/p.jpg"},
+    ).json()["id"]
+    tenant_id = "77777777-7777-4777-8777-777777777777"
+    payment = {"property_id": property_id, "tenant_id": tenant_id, "bill_type": "rent", "amount": 8000}
+    assert client.post("/payments", json=payment).status_code == 201
+
+    db = SessionLocal()
+    stored = db.scalar(select(User.password_hash).where(User.id == tenant_id))
+    db.close()
+    assert stored == "!"
+    login = {"identifier": f"{tenant_id}@rentory.local", "password": "demo", "role": "tenant"}
+    assert client.post("/auth/login", json=login).status_code == 401
+
+
+def test_signed_tokens_authorize_callers_without_database_reads():
+    owner = client.post("/auth/owners/signup", json={"full_name": "Token Owner", "phone": "900004000", "password": "1234"}).json()
+    other = client.post("/auth/owners/signup", json={"full_name": "Other Owner", "phone": "900004001", "password": "1234"}).json()
+    token = owner["access_token"]
+    assert token.count(".") == 2
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get(f"/owners/{owner['user_id']}/properties").status_code == 401
+    client.get(f"/owners/{owner['user_id']}/properties", headers=headers)
+    with count_queries() as queries:
+        assert client.get(f"/owners/{owner['user_id']}/properties", headers=headers).status_code == 200
+        assert client.get(f"/owners/{other['user_id']}/properties", headers=headers).status_code == 403
+    assert len(queries) == 0
+
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    assert client.get(f"/owners/{owner['user_id']}/analytics", headers={"Authorization": f"Bearer {tampered}"}).status_code == 401
+
+    expired = TokenService(secret="expired-test", ttl=-1)
+    expired_token = expired.issue(owner["user_id"], "owner")
+    with pytest.raises(InvalidToken):
+        expired.verify(expired_token)
+    with pytest.raises(InvalidToken):
+        token_service.verify(expired_token)
+
+    # Workers sharing a revocation backend (Redis in production) all reject a token revoked on any of them.
+    shared = MemoryCacheBackend()
+    worker_a, worker_b = (TokenService(secret="shared-test", revocations=shared) for _ in range(2))
+    shared_token = worker_a.issue(owner["user_id"], "owner")
+    worker_a.revoke(worker_b.verify(shared_token))
+    with pytest.raises(InvalidToken):
+        worker_b.verify(shared_token)
+
+    login = client.post("/auth/login", json={"identifier": "900004000", "password": "1234", "role": "owner"}).json()
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert client.get(f"/owners/{owner['user_id']}/analytics", headers=headers).status_code == 401
+    assert client.get(f"/owners/{owner['user_id']}/analytics", headers={"Authorization": f"Bearer {login['access_token']}"}).status_code == 200
+    assert client.post("/auth/logout").status_code == 401
+
+
+def test_ledger_balances_come_from_snapshots_plus_a_short_tail(monkeypatch):
+    monkeypatch.setattr(billing, "LEDGER_SNAPSHOT_INTERVAL", 4)
+    owner_id = client.post("/auth/owners/signup", json={"full_name": "Ledger Owner", "phone": "900005000", "password": "1234"}).json()["user_id"]
+    created = client.post(
+        f"/owners/{owner_id}/properties",
+        json={"location": "Aluva", "name": "Ledger Flat", "unit_type": "2BHK", "capacity": 1, "rent": 10000, "image_url": "https://example.com/l.jpg"},
+    ).json()
+    property_id = created["id"]
+    tenant_id = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": created["qr_code"], "full_name": "Ledger Tenant", "age": 28, "phone": "900005001", "documents": "id.png", "password": "1234"},
+    ).json()["user_id"]
+
+    db = SessionLocal()
+    for _ in range(6):
+        billing.post_entry(db, property_id, tenant_id, "charge", "rent", 10000)
+        db.commit()
+    db.close()
+    for amount in (10000, 10000, 5000):
+        payment = client.post("/payments", json={"property_id": property_id, "tenant_id": tenant_id, "bill_type": "rent", "amount": amount})
+        assert payment.status_code == 201
+
+    db = SessionLocal()
+    assert db.scalars(select(LedgerSnapshot.seq).order_by(LedgerSnapshot.seq)).all() == [4, 8]
+    assert db.scalar(select(func.count(Bill.id))) == 0
+    db.close()
+
+    with count_queries() as queries:
+        balance = client.get(f"/properties/{property_id}/tenants/{tenant_id}/balance", headers=bearer(tenant_id, "tenant")).json()
+    assert len(queries) == 1
+    assert balance == {
+        "property_id": property_id,
+        "tenant_id": tenant_id,
+        "balance": 35000,
+        "charged_total": 60000,
+        "paid_total": 25000,
+        "as_of_seq": 9,
+    }
+
+    page = client.get(f"/properties/{property_id}/tenants/{tenant_id}/statement", headers=bearer(tenant_id, "tenant"), params={"limit": 4}).json()
+    assert [(e["seq"], e["amount"], e["balance_after"]) for e in page["entries"]] == [
+        (9, -5000, 35000),
+        (8, -10000, 40000),
+        (7, -10000, 50000),
+        (6, 10000, 60000),
+    ]
+    older = client.get(f"/properties/{property_id}/tenants/{tenant_id}/statement", headers=bearer(tenant_id, "tenant"), params={"limit": 4, "before": page["next_before"]}).json()
+    assert [(e["seq"], e["balance_after"]) for e in older["entries"]] == [(5, 50000), (4, 40000), (3, 30000), (2, 20000)]
+
+
+def test_owners_only_read_ledgers_of_their_own_tenants():
+    owners = [
+        client.post("/auth/owners/signup", json={"full_name": f"Ledger Access Owner {index}", "phone": f"90000510{index}", "password": "1234"}).json()
+        for index in range(2)
+    ]
+    cards = [
+        client.post(
+            f"/owners/{owner['user_id']}/properties",
+            json={"location": "Aluva", "name": f"Ledger Access {index}", "unit_type": "1BHK", "capacity": 1, "rent": 9000, "image_url": "https://example.com/a.jpg"},
+        ).json()
+        for index, owner in enumerate(owners)
+    ]
+    tenant = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": cards[0]["qr_code"], "full_name": "Ledger Access Tenant", "age": 30, "phone": "900005110", "documents": "id.png", "password": "1234"},
+    ).json()
+
+    def read(property_id: str, token: str) -> list[int]:
+        headers = {"Authorization": f"Bearer {token}"}
+        return [
+            client.get(f"/properties/{property_id}/tenants/{tenant['user_id']}/{view}", headers=headers).status_code
+            for view in ("balance", "statement")
+        ]
+
+    assert read(cards[0]["id"], owners[0]["access_token"]) == [200, 200]
+    assert read(cards[0]["id"], tenant["access_token"]) == [200, 200]
+    assert read(cards[0]["id"], owners[1]["access_token"]) == [403, 403]
+    # Owning some property is not enough: the account has to be on one of the caller's properties.
+    assert read(cards[1]["id"], owners[1]["access_token"]) == [403, 403]
+
+
+def test_owners_only_read_tenant_details_of_their_own_tenants():
+    owners = [
+        client.post("/auth/owners/signup", json={"full_name": f"Details Owner {index}", "phone": f"90000520{index}", "password": "1234"}).json()
+        for index in range(2)
+    ]
+    card = client.post(
+        f"/owners/{owners[0]['user_id']}/properties",
+        json={"location": "Aluva", "name": "Details Flat", "unit_type": "1BHK", "capacity": 1, "rent": 9000, "image_url": "https://example.com/d.jpg"},
+    ).json()
+    tenant = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": card["qr_code"], "full_name": "Details Tenant", "age": 30, "phone": "900005210", "documents": "id.png", "password": "1234"},
+    ).json()
+
+    def status(token: str) -> int:
+        return client.get(f"/tenants/{tenant['user_id']}", headers={"Authorization": f"Bearer {token}"}).status_code
+
+    assert status(owners[0]["access_token"]) == 200
+    assert status(tenant["access_token"]) == 200
+    assert status(owners[1]["access_token"]) == 403
+
+
+def test_monthly_billing_run_is_set_based_idempotent_and_posts_to_the_ledger(monkeypatch):
+    monkeypatch.setattr(billing, "LEDGER_SNAPSHOT_INTERVAL", 2)
+    tenants = []
+    for owner_index in range(3):
+        owner_id = client.post(
+            "/auth/owners/signup", json={"full_name": f"Billing Owner {owner_index}", "phone": f"90000600{owner_index}", "password": "1234"}
+        ).json()["user_id"]
+        created = client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": "Kakkanad", "name": f"Billing Flat {owner_index}", "unit_type": "2BHK", "capacity": 2, "rent": 8000 + owner_index, "image_url": "https://example.com/b.jpg"},
+        ).json()
+        for tenant_index in range(2):
+            tenant = client.post(
+                "/auth/tenants/register",
+                json={"qr_code": created["qr_code"], "full_name": "Billing Tenant", "age": 30, "phone": f"9000061{owner_index}{tenant_index}", "documents": "id.png", "password": "1234"},
+            ).json()
+            tenants.append((created["id"], tenant["user_id"], 8000 + owner_index))
+    property_id, tenant_id, _ = tenants[0]
+    client.post("/payments", json={"property_id": property_id, "tenant_id": tenant_id, "bill_type": "rent", "amount": 8000})
+
+    first = billing.generate_period_bills("2026-10", owner_chunk=2)
+    assert first["bills"] == 6
+    assert first["rows_per_sec"] > 0
+    assert billing.generate_period_bills("2026-10")["bills"] == 0
+
+    db = SessionLocal()
+    # Simulate a crash before the run was marked done: resuming from scratch must not bill anyone twice.
+    run = db.get(BillingRun, "2026-10")
+    run.status, run.last_owner_id, run.last_owner_created_at = "running", None, None
+    db.commit()
+    db.close()
+    assert billing.generate_period_bills("2026-10", owner_chunk=1)["bills"] == 0
+
+    db = SessionLocal()
+    assert db.scalar(select(func.count(Bill.id)).where(Bill.period == "2026-10", Bill.status == "pending")) == 6
+    assert db.scalar(select(func.count(LedgerEntry.id)).where(LedgerEntry.entry_type == "charge")) == 6
+    assert db.scalar(select(LedgerSnapshot.seq).where(LedgerSnapshot.tenant_id == tenant_id)) == 2
+    db.close()
+
+    for property_id, tenant_id, rent in tenants:
+        balance = client.get(f"/properties/{property_id}/tenants/{tenant_id}/balance", headers=bearer(tenant_id, "tenant")).json()
+        assert balance["charged_total"] == rent
+    assert client.get(f"/properties/{tenants[0][0]}/tenants/{tenants[0][1]}/balance", headers=bearer(tenants[0][1], "tenant")).json()["balance"] == 0
+
+    @contextmanager
+    def held_by_another_worker(bind, period):
+        yield False
+
+    with monkeypatch.context() as patch:
+        patch.setattr(billing, "_exclusive_run", held_by_another_worker)
+        assert billing.generate_period_bills("2026-11")["status"] == "locked"
+    db = SessionLocal()
+    assert db.get(BillingRun, "2026-11") is None
+    db.close()
+
+    assert billing.generate_period_bills("2026-11")["bills"] == 6
+    assert client.get(f"/properties/{tenants[1][0]}/tenants/{tenants[1][1]}/balance", headers=bearer(tenants[1][1], "tenant")).json()["balance"] == 16000
+
+
+def test_billing_run_includes_owners_who_sign_up_mid_run(monkeypatch):
+    monkeypatch.setattr(billing, "LEDGER_SNAPSHOT_INTERVAL", 1)
+
+    def owner_with_tenant(owner_id, index):
+        if owner_id is None:
+            owner_id = client.post(
+                "/auth/owners/signup", json={"full_name": f"Run Owner {index}", "phone": f"90000650{index}", "password": "1234"}
+            ).json()["user_id"]
+        created = client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": "Edappally", "name": f"Run Flat {index}", "unit_type": "1BHK", "capacity": 1, "rent": 7000, "image_url": "https://example.com/r.jpg"},
+        ).json()
+        client.post(
+            "/auth/tenants/register",
+            json={"qr_code": created["qr_code"], "full_name": "Run Tenant", "age": 30, "phone": f"90000651{index}", "documents": "id.png", "password": "1234"},
+        )
+
+    for index in range(2):
+        owner_with_tenant(None, index)
+
+    # Signs up an owner whose id sorts before every existing owner once the first chunk has committed.
+    original_chunk = billing._generate_owner_chunk
+    chunks = []
+
+    def chunk_then_signup(db, period, owner_ids, now):
+        chunks.append(owner_ids)
+        count = original_chunk(db, period, owner_ids, now)
+        if len(chunks) == 1:
+            db.commit()
+            late = SessionLocal()
+            late.add(User(id="00000000-0000-4000-8000-000000000001", role="owner", full_name="Late Owner", phone="900006599"))
+            late.commit()
+            late.close()
+            owner_with_tenant("00000000-0000-4000-8000-000000000001", 9)
+        return count
+
+    monkeypatch.setattr(billing, "_generate_owner_chunk", chunk_then_signup)
+    assert billing.generate_period_bills("2027-01", owner_chunk=1)["bills"] == 3
+    assert chunks[-1] == ["00000000-0000-4000-8000-000000000001"]
+
+    db = SessionLocal()
+    assert db.scalar(select(func.count(LedgerEntry.id)).where(LedgerEntry.period == "2027-01")) == 3
+    assert db.scalar(select(func.count()).select_from(LedgerSnapshot)) == 3
+    db.close()
+
+    # Re-running the last chunk posts and snapshots nothing twice.
+    monkeypatch.setattr(billing, "_generate_owner_chunk", original_chunk)
+    db = SessionLocal()
+    assert billing._generate_owner_chunk(db, "2027-01", chunks[-1], datetime.utcnow()) == 0
+    db.commit()
+    assert db.scalar(select(func.count()).select_from(LedgerSnapshot)) == 3
+    db.close()
+
+
+def test_idempotency_key_replays_writes_and_collapses_concurrent_duplicates():
+    owner_id = client.post("/auth/owners/signup", json={"full_name": "Retry Owner", "phone": "900007000", "password": "1234"}).json()["user_id"]
+    created = client.post(
+        f"/owners/{owner_id}/properties",
+        json={"location": "Palarivattom", "name": "Retry House", "unit_type": "1BHK", "capacity": 1, "rent": 9000, "image_url": "https://example.com/r.jpg"},
+    ).json()
+    tenant_id = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": created["qr_code"], "full_name": "Retry Tenant", "age": 26, "phone": "900007001", "documents": "id.png", "password": "1234"},
+    ).json()["user_id"]
+    payment = {"property_id": created["id"], "tenant_id": tenant_id, "bill_type": "rent", "amount": 9000}
+
+    def pay(_):
+        return client.post("/payments", json=payment, headers={"Idempotency-Key": "pay-2026-10"})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(pay, range(8)))
+    assert {r.status_code for r in responses} == {201}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 7
+
+    with count_queries() as queries:
+        replay = pay(0)
+    assert replay.json() == responses[0].json()
+    assert queries == []
+
+    conflicting = client.post("/payments", json={**payment, "amount": 1}, headers={"Idempotency-Key": "pay-2026-10"})
+    assert conflicting.status_code == 422
+    assert client.post("/payments", json=payment, headers={"Idempotency-Key": "pay-2026-11"}).json()["id"] != replay.json()["id"]
+
+    db = SessionLocal()
+    assert db.scalar(select(func.count(Payment.id))) == 2
+    db.close()
+    assert client.get(f"/properties/{created['id']}/tenants/{tenant_id}/balance", headers=bearer(tenant_id, "tenant")).json()["paid_total"] == 18000
+
+    ticket = {"property_id": created["id"], "tenant_id": tenant_id, "issue_title": "Leak", "issue_description": "Kitchen tap"}
+    first = client.post("/maintenance-tickets", json=ticket, headers={"Idempotency-Key": "leak-1"})
+    assert client.post("/maintenance-tickets", json=ticket, headers={"Idempotency-Key": "leak-1"}).json() == first.json()
+
+    message = {"sender_id": tenant_id, "text": "Paid rent"}
+    sent = client.post(f"/properties/{created['id']}/chat", json=message, headers={"Idempotency-Key": "msg-1"})
+    assert client.post(f"/properties/{created['id']}/chat", json=message, headers={"Idempotency-Key": "msg-1"}).json() == sent.json()
+    assert len(client.get(f"/properties/{created['id']}/chat").json()) == 1
+
+    missing = client.post("/maintenance-tickets", json={**ticket, "property_id": tenant_id}, headers={"Idempotency-Key": "leak-2"})
+    assert missing.status_code == 404
+    assert client.post("/maintenance-tickets", json=ticket, headers={"Idempotency-Key": "leak-2"}).status_code == 201
+
+
+def test_memory_cache_backend_add_only_claims_free_keys():
+    backend = MemoryCacheBackend(max_entries=10)
+    assert backend.add("k", "first", ttl=60)
+    assert not backend.add("k", "second", ttl=60)
+    assert backend.get("k") == "first"
+    backend.delete("k")
+    assert backend.add("k", "third", ttl=60)
+
+
+def test_maintenance_queue_lists_by_status_with_counters_and_cas_transitions():
+    owner_id = client.post("/auth/owners/signup", json={"full_name": "Queue Owner", "phone": "900008000", "password": "1234"}).json()["user_id"]
+    property_ids = [
+        client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": "Edakochi", "name": f"Queue Block {index}", "unit_type": "1BHK", "capacity": 1, "rent": 7000, "image_url": "https://example.com/q.jpg"},
+        ).json()["id"]
+        for index in range(2)
+    ]
+    tenant_id = "77777777-7777-4777-8777-777777777777"
+    ticket_ids = []
+    for index in range(5):
+        created = client.post(
+            "/maintenance-tickets",
+            json={"property_id": property_ids[index % 2], "tenant_id": tenant_id, "issue_title": f"Issue {index}"},
+        )
+        ticket_ids.append(created.json()["id"])
+
+    def move(_):
+        return client.patch(
+            f"/maintenance-tickets/{ticket_ids[0]}", headers=bearer(owner_id), json={"status": "in_progress", "expected_status": "open"}
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        statuses = list(pool.map(move, range(6)))
+    assert sorted(statuses) == [200, 409, 409, 409, 409, 409]
+    assert client.patch(f"/maintenance-tickets/{ticket_ids[1]}", json={"status": "closed"}).status_code == 401
+    assert client.patch(f"/maintenance-tickets/{ticket_ids[1]}", headers=bearer(tenant_id, "tenant"), json={"status": "closed"}).status_code == 403
+    assert client.patch(f"/maintenance-tickets/{ticket_ids[1]}", headers=bearer(owner_id), json={"status": "closed"}).json()["status"] == "closed"
+    assert client.patch(f"/maintenance-tickets/{ticket_ids[1]}", headers=bearer(owner_id), json={"status": "resolved"}).status_code == 409
+    missing = client.patch("/maintenance-tickets/88888888-8888-4888-8888-888888888888", headers=bearer(owner_id), json={"status": "closed"})
+    assert missing.status_code == 404
+
+    with count_queries() as queries:
+        page = client.get(f"/owners/{owner_id}/maintenance-tickets", headers=bearer(owner_id), params={"status": "open", "limit": 2}).json()
+    assert len(queries) == 2
+    assert page["counts"] == {"open": 3, "in_progress": 1, "resolved": 0, "closed": 1}
+    assert [t["issue_title"] for t in page["tickets"]] == ["Issue 4", "Issue 3"]
+    rest = client.get(f"/owners/{owner_id}/maintenance-tickets", headers=bearer(owner_id), params={"status": "open", "before": page["next_cursor"]}).json()
+    assert [t["issue_title"] for t in rest["tickets"]] == ["Issue 2"]
+    assert rest["next_cursor"] is None
+
+    everything = client.get(f"/owners/{owner_id}/maintenance-tickets", headers=bearer(owner_id)).json()
+    assert len(everything["tickets"]) == 5
+    assert client.get(f"/properties/{property_ids[0]}/maintenance-tickets").status_code == 401
+    assert client.get(f"/properties/{property_ids[0]}/maintenance-tickets", headers=bearer(tenant_id, "tenant")).status_code == 403
+    by_property = client.get(f"/properties/{property_ids[0]}/maintenance-tickets", headers=bearer(owner_id)).json()
+    assert by_property["counts"] == {"open": 2, "in_progress": 1, "resolved": 0, "closed": 0}
+    assert {t["issue_title"] for t in by_property["tickets"]} == {"Issue 0", "Issue 2", "Issue 4"}
+
+    db = SessionLocal()
+    rebuild_status_counts(db)
+    assert status_counts(db, owner_id=owner_id) == page["counts"]
+
+    # Tickets from before the counters existed: moving one never drives a counter negative, and the startup
+    # migration rebuilds the counters from the tickets.
+    db.execute(delete(MaintenanceStatusCount).where(MaintenanceStatusCount.property_id == property_ids[1]))
+    db.commit()
+    assert client.patch(f"/maintenance-tickets/{ticket_ids[3]}", headers=bearer(owner_id), json={"status": "resolved"}).status_code == 200
+    assert min(status_counts(db, property_id=property_ids[1]).values()) == 0
+    assert backfill_status_counts(engine)
+    assert status_counts(db, property_id=property_ids[1]) == {"open": 0, "in_progress": 0, "resolved": 1, "closed": 1}
+    assert not backfill_status_counts(engine)
+    db.close()
+
+
+def test_search_ranks_properties_tenants_and_chat_within_the_owner():
+    owner_id = client.post("/auth/owners/signup", json={"full_name": "Search Owner", "phone": "900009000", "password": "1234"}).json()["user_id"]
+    other_owner = client.post("/auth/owners/signup", json={"full_name": "Other Owner", "phone": "900009001", "password": "1234"}).json()["user_id"]
+    properties = [
+        client.post(
+            f"/owners/{owner}/properties",
+            json={"location": location, "name": name, "unit_type": "1BHK", "capacity": 2, "rent": 9000, "image_url": "https://example.com/s.jpg"},
+        ).json()
+        for owner, name, location in [
+            (owner_id, "Sunrise Residency", "Kaloor"),
+            (owner_id, "Lakeview Flats", "Edappally"),
+            (other_owner, "Sunrise Towers", "Kakkanad"),
+        ]
+    ]
+    tenant = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": properties[0]["qr_code"], "full_name": "Meera Varghese", "age": 30, "phone": "9847012345", "documents": "id.png", "password": "1234"},
+    ).json()["user_id"]
+    other_tenant = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": properties[2]["qr_code"], "full_name": "Meera Thomas", "age": 31, "phone": "9847099999", "documents": "id.png", "password": "1234"},
+    ).json()["user_id"]
+    for text in ["The water tank is leaking again", "Rent paid for March", "Water pump fixed"]:
+        client.post(f"/properties/{properties[0]['id']}/chat", json={"sender_id": tenant, "text": text})
+    client.post(f"/properties/{properties[2]['id']}/chat", json={"sender_id": other_tenant, "text": "Water everywhere"})
+
+    def search(**params):
+        response = client.get(f"/owners/{owner_id}/search", headers=bearer(owner_id), params=params)
+        assert response.status_code == 200
+        return response.json()
+
+    assert [(hit["kind"], hit["title"]) for hit in search(q="sunr")["results"]] == [("property", "Sunrise Residency")]
+    assert [(hit["kind"], hit["detail"]) for hit in search(q="meera")["results"]] == [("tenant", "9847012345")]
+    assert [hit["title"] for hit in search(q="98470")["results"]] == ["Meera Varghese"]
+    assert [hit["detail"] for hit in search(q="water leak")["results"]] == ["The water tank is leaking again"]
+
+    water = search(q="wat", kind="message")["results"]
+    assert {hit["detail"] for hit in water} == {"The water tank is leaking again", "Water pump fixed"}
+    assert all(hit["property_id"] == properties[0]["id"] for hit in water)
+    assert water[0]["score"] >= water[1]["score"]
+
+    first = search(q="water", limit=1)
+    second = search(q="water", limit=1, offset=first["next_offset"])
+    assert first["next_offset"] == 1 and second["next_offset"] is None
+    assert [first["results"][0]["id"], second["results"][0]["id"]] == [hit["id"] for hit in search(q="water")["results"]]
+
+    assert search(q="water", property_id=properties[1]["id"])["results"] == []
+    assert search(q="water", property_id=properties[2]["id"])["results"] == []
+    assert search(q="!!")["results"] == []
+    assert client.get(f"/owners/{owner_id}/search", headers=bearer(owner_id), params={"q": "water", "limit": 500}).status_code == 422
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE search_messages")
+        connection.exec_driver_sql("DROP TABLE search_refs")
+    Base.metadata.create_all(bind=engine)
+    assert len(search(q="water")["results"]) == 2
+
+
+def test_metrics_report_route_latency_and_sql_per_request():
+    owner_id = client.post("/auth/owners/signup", json={"full_name": "Metrics Owner", "phone": "900010000", "password": "1234"}).json()["user_id"]
+    property_id = client.post(
+        f"/owners/{owner_id}/properties",
+        json={"location": "Vyttila", "name": "Metric Mansion", "unit_type": "1BHK", "capacity": 1, "rent": 8000, "image_url": "https://example.com/m.jpg"},
+    ).json()["id"]
+    metrics.clear()
+    for _ in range(3):
+        assert client.get(f"/properties/{property_id}/chat").status_code == 200
+    assert client.get("/no/such/route").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text.splitlines()
+    route = 'route="/properties/{property_id}/chat"'
+    assert f'rentory_http_request_duration_seconds_count{{method="GET",{route},status="200"}} 3' in body
+    assert 'rentory_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in body
+    assert f"rentory_http_request_db_statements_sum{{{route}}} 6.0" in body
+    assert f'rentory_db_statement_duration_seconds_count{{{route},operation="SELECT"}} 6' in body
+    assert f'rentory_http_request_db_statements_bucket{{{route},le="2"}} 3' in body
+    assert "rentory_http_requests_in_flight 1" in body
+
+
+def test_slow_request_profiler_writes_folded_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "threshold", 1e-6)
+    monkeypatch.setattr(profiler, "interval", 0.001)
+    monkeypatch.setattr(profiler, "directory", tmp_path)
+
+    assert client.post("/auth/owners/signup", json={"full_name": "Slow Owner", "phone": "900010001", "password": "1234"}).status_code == 201
+
+    profiles = list(tmp_path.glob("*-POST-auth_owners_signup-*ms.folded"))
+    assert len(profiles) == 1
+    lines = profiles[0].read_text().splitlines()
+    assert lines and all(";" in line and line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_fast_json_responses_match_the_validated_path_byte_for_byte(monkeypatch):
+    from app import main
+
+    owner = client.post("/auth/owners/signup", json={"full_name": "Fast Owner", "phone": "900009001", "password": "1234"}).json()
+    owner_id = owner["user_id"]
+    property_ids = []
+    for index, image_url in enumerate(["https://example.com/fast.jpg", "data:image/png;base64," + base64.b64encode(b"\x89PNG\r\n\x1a\n").decode()]):
+        card = client.post(
+            f"/owners/{owner_id}/properties",
+            json={
+                "location": "Kochi",
+                "name": f"Fast Home {index} – ദ",
+                "unit_type": "1BHK",
+                "capacity": 3,
+                "rent": 12500.5,
+                "image_url": image_url,
+                "description": 'Quotes " and \\ backslashes',
+            },
+        ).json()
+        property_ids.append(card["id"])
+    client.post(
+        "/auth/tenants/register",
+        json={"qr_code": card["qr_code"], "full_name": "Fast Tenant", "age": 31, "phone": "900009002", "documents": "id.png", "password": "1234"},
+    )
+    client.post(f"/properties/{property_ids[1]}/chat", json={"sender_id": owner_id, "text": "hello\nthere   \U0001f600"})
+    client.post(f"/properties/{property_ids[1]}/chat", json={"sender_id": owner_id, "image_url": "https://example.com/a.jpg"})
+
+    paths = [
+        f"/owners/{owner_id}/properties",
+        f"/properties/{property_ids[0]}",
+        f"/properties/{property_ids[1]}",
+        f"/properties/{property_ids[1]}/chat",
+        f"/properties/{property_ids[1]}/chat?limit=1",
+        f"/owners/{property_ids[0]}/properties",
+        "/properties/missing",
+    ]
+    owner_paths = {paths[0]: bearer(owner_id), paths[5]: bearer(property_ids[0])}
+    results = {}
+    for fast in (False, True):
+        monkeypatch.setattr(main, "FAST_JSON_RESPONSES", fast)
+        response_cache.clear()
+        responses = [client.get(path, headers=owner_paths.get(path)) for path in paths]
+        results[fast] = [
+            (r.status_code, r.headers["content-type"], {k: v for k, v in r.headers.items() if k.startswith("x-chat") or k == "etag"}, r.content)
+            for r in responses
+        ]
+
+    assert results[True] == results[False]
+    assert results[True][4][2]["x-chat-has-more"] == "true"
+
+
+def test_read_endpoints_answer_304_from_revisions_and_compress_large_bodies():
+    owner_id = client.post("/auth/owners/signup", json={"full_name": "Etag Owner", "phone": "900009101", "password": "1234"}).json()["user_id"]
+    cards = [
+        client.post(
+            f"/owners/{owner_id}/properties",
+            json={"location": "Kochi", "name": f"Etag Home {index}", "unit_type": "2BHK", "capacity": 2, "rent": 9000, "image_url": "https://example.com/e.jpg"},
+        ).json()
+        for index in range(3)
+    ]
+    property_id = cards[0]["id"]
+    tenant_id = client.post(
+        "/auth/tenants/register",
+        json={"qr_code": cards[0]["qr_code"], "full_name": "Etag Tenant", "age": 30, "phone": "900009102", "documents": "id.png", "password": "1234"},
+    ).json()["user_id"]
+    client.post(f"/properties/{property_id}/chat", json={"sender_id": owner_id, "text": "first"})
+
+    paths = {
+        "cards": f"/owners/{owner_id}/properties",
+        "details": f"/properties/{property_id}",
+        "dashboard": f"/tenants/{tenant_id}/dashboard",
+        "chat": f"/properties/{property_id}/chat",
+    }
+    tokens = {"cards": bearer(owner_id), "details": {}, "dashboard": bearer(tenant_id, "tenant"), "chat": {}}
+    plain = {"Accept-Encoding": "identity"}
+    etags = {}
+    for name, path in paths.items():
+        first = client.get(path, headers={**plain, **tokens[name]})
+        assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+        etags[name] = first.headers["etag"]
+        with count_queries() as queries:
+            revalidated = client.get(path, headers={**plain, **tokens[name], "If-None-Match": etags[name]})
+        assert revalidated.status_code == 304 and revalidated.content == b""
+        assert revalidated.headers["etag"] == etags[name]
+        assert len(queries) == 1
+
+    # A water bill change moves the property and the dashboard that shows it, not the owner's cards.
+    client.patch(f"/properties/{property_id}/water-bill", json={"status": "paid"})
+    client.post(f"/properties/{property_id}/chat", json={"sender_id": owner_id, "text": "second"})
+    changed = {name: client.get(path, headers={**plain, **tokens[name], "If-None-Match": etags[name]}) for name, path in paths.items()}
+    assert {name: response.status_code for name, response in changed.items()} == {"cards": 304, "details": 200, "dashboard": 200, "chat": 200}
+    assert changed["details"].json()["water_bill_status"] == "paid"
+    assert changed["details"].headers["etag"] != etags["details"]
+    assert len(changed["chat"].json()) == 2
+
+    # Registering another tenant changes the occupied count on the owner's cards.
+    client.post(
+        "/auth/tenants/register",
+        json={"qr_code": cards[0]["qr_code"], "full_name": "Etag Tenant 2", "age": 30, "phone": "900009103", "documents": "id.png", "password": "1234"},
+    )
+    assert client.get(paths["cards"], headers={**plain, **tokens["cards"], "If-None-Match": etags["cards"]}).status_code == 200
+
+    compressed = client.get(paths["cards"], headers={**tokens["cards"], "Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["etag"].endswith('-gzip"')
+    assert len(compressed.json()) == 3
+    assert client.get(paths["cards"], headers={**tokens["cards"], "Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]}).status_code == 304
+    assert "content-encoding" not in client.get(paths["dashboard"], headers={**tokens["dashboard"], "Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get(paths["cards"], headers={**tokens["cards"], "Accept-Encoding": "gzip;q=0"}).headers
+
+
+def test_batch_get_resolves_properties_and_tenants_in_request_order():
+    owner = client.post("/auth/owners/signup", json={"full_name": "Batch Owner", "phone": "900009201", "password": "1234"}).json()
+    cards = [
+        client.post(
+            f"/owners/{owner['user_id']}/properties",
+            json={"location": "Aluva", "name": f"Batch Home {index}", "unit_type": "1BHK", "capacity": 2, "rent": 8000, "image_url": "https://example.com/b.jpg"},
+        ).json()
+        for index in range(2)
+    ]
+    tenants = [
+        client.post(
+            "/auth/tenants/register",
+            json={"qr_code": cards[0]["qr_code"], "full_name": f"Batch Tenant {index}", "age": 28, "phone": f"90000921{index}", "documents": "id.png", "password": "1234"},
+        ).json()
+        for index in range(2)
+    ]
+    missing = "00000000-0000-4000-8000-000000000000"
+
+    ids = [cards[1]["id"], missing, "not-a-uuid", cards[0]["id"].upper(), cards[1]["id"]]
+    with count_queries() as queries:
+        response = client.post("/properties:batchGet", json={"ids": ids})
+    assert response.status_code == 200
+    assert len(queries) == 2
+    results = response.json()["results"]
+    assert [result["id"] for result in results] == ids
+    assert results[0]["property"] == client.get(f"/properties/{cards[1]['id']}").json()
+    assert results[1]["error"] == {"status": 404, "detail": "Property not found"} and results[1]["property"] is None
+    assert results[2]["error"]["status"] == 400
+    assert {tenant["tenant_id"] for tenant in results[3]["property"]["tenants"]} == {tenant["user_id"] for tenant in tenants}
+    assert results[4]["property"]["property"]["id"] == cards[1]["id"]
+
+    tenant_ids = [tenants[1]["user_id"], owner["user_id"], tenants[0]["user_id"]]
+    with count_queries() as queries:
+        as_owner = client.post("/tenants:batchGet", json={"ids": tenant_ids}, headers={"Authorization": f"Bearer {owner['access_token']}"})
+    assert len(queries) == 1
+    assert [result["tenant"]["full_name"] if result["tenant"] else result["error"]["status"] for result in as_owner.json()["results"]] == [
+        "Batch Tenant 1",
+        403,
+        "Batch Tenant 0",
+    ]
+
+    foreign_owner = client.post("/auth/owners/signup", json={"full_name": "Foreign Owner", "phone": "900009202", "password": "1234"}).json()
+    as_foreign_owner = client.post("/tenants:batchGet", json={"ids": tenant_ids}, headers={"Authorization": f"Bearer {foreign_owner['access_token']}"})
+    assert [result["error"]["status"] for result in as_foreign_owner.json()["results"]] == [403, 403, 403]
+    assert all(result["tenant"] is None for result in as_foreign_owner.json()["results"])
+
+    assert client.post("/tenants:batchGet", json={"ids": tenant_ids}).status_code == 401
+
+    as_tenant = client.post("/tenants:batchGet", json={"ids": tenant_ids}, headers={"Authorization": f"Bearer {tenants[0]['access_token']}"})
+    assert [result["error"]["status"] if result["error"] else result["tenant"]["id"] for result in as_tenant.json()["results"]] == [
+        403,
+        403,
+        tenants[0]["user_id"],
+    ]
+
+    assert client.post("/properties:batchGet", json={"ids": []}).status_code == 422
+    assert client.post("/tenants:batchGet", json={"ids": [missing] * 101}, headers=bearer(owner["user_id"])).status_code == 422
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(API_ROOT))
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app.database import run_blocking
+
+
+def test_api_suite_passes_with_async_database_mode():
+    pytest.importorskip("aiosqlite")
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests/test_api.py"],
+        cwd=API_ROOT,
+        env={**os.environ, "DATABASE_ASYNC": "1"},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_run_blocking_keeps_the_event_loop_free_inside_run_sync():
+    async def block_while_ticking() -> int:
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        try:
+            # greenlet_spawn is how AsyncSession.run_sync runs a sync route body.
+            assert await greenlet_spawn(run_blocking, lambda: time.sleep(0.3) or "done") == "done"
+        finally:
+            ticker.cancel()
+        return ticks
+
+    assert asyncio.run(block_while_ticking()) >= 10
+    assert run_blocking(lambda value: value * 2, 21) == 42
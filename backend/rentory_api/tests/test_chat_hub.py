@@ -0,0 +1,35 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.chat_hub import ChatHub
+
+
+def test_hub_fans_out_thread_published_events_to_group_subscribers():
+    async def scenario() -> None:
+        hub = ChatHub(queue_size=2)
+        first = hub.subscribe("group-a")
+        second = hub.subscribe("group-a")
+        other = hub.subscribe("group-b")
+
+        publisher = threading.Thread(target=hub.publish, args=("group-a", {"cursor": "c1"}))
+        publisher.start()
+        publisher.join()
+
+        assert await asyncio.wait_for(first.get(), timeout=1) == {"cursor": "c1"}
+        assert await asyncio.wait_for(second.get(), timeout=1) == {"cursor": "c1"}
+        assert other.queue.empty()
+
+        for index in range(3):
+            hub.publish("group-a", {"cursor": f"n{index}"})
+        await asyncio.sleep(0)
+        assert [first.queue.get_nowait()["cursor"] for _ in range(2)] == ["n1", "n2"]
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        assert hub.subscriber_count("group-a") == 0
+
+    asyncio.run(scenario())
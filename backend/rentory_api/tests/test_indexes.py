@@ -0,0 +1,204 @@
+import base64
+import os
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./rentory_test.db")
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app import image_store
+from app.database import Base, engine
+from app.migrations import ensure_columns, ensure_indexes, externalize_property_images
+from app.models import (
+    Bill,
+    ChatGroupMember,
+    ChatMessage,
+    MaintenanceTicket,
+    Notification,
+    Payment,
+    Property,
+    PropertyTenant,
+    ResourceRevision,
+    User,
+)
+
+OWNER_ID = "11111111-1111-4111-8111-111111111111"
+PROPERTY_ID = "33333333-3333-4333-8333-333333333333"
+GROUP_ID = "44444444-4444-4444-8444-444444444444"
+TENANT_ID = "55555555-5555-4555-8555-555555555555"
+
+# The hot lookups issued by app/main.py, paired with the index each one must be served from.
+HOT_QUERIES = [
+    (
+        select(User.id).where((User.phone == "900000001") | (User.email == "owner@rentory.local")),
+        "ix_users_email",
+    ),
+    (select(Property.id).where(Property.owner_id == OWNER_ID), "ix_properties_owner_location"),
+    (
+        select(Property.location, func.count(Property.id)).where(Property.owner_id == OWNER_ID).group_by(Property.location),
+        "ix_properties_owner_location",
+    ),
+    (
+        select(func.count(PropertyTenant.id))
+        .join(Property, Property.id == PropertyTenant.property_id)
+        .where(Property.owner_id == OWNER_ID)
+        .where(PropertyTenant.status == "active"),
+        "ix_property_tenants_property_status",
+    ),
+    (
+        select(ChatMessage.id)
+        .where(ChatMessage.group_id == GROUP_ID)
+        .where(tuple_(ChatMessage.created_at, ChatMessage.id) < (datetime(2026, 1, 1), TENANT_ID))
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(50),
+        "ix_chat_messages_group_created",
+    ),
+    (select(ChatGroupMember.id).where(ChatGroupMember.user_id == TENANT_ID), "ix_chat_group_members_user_id"),
+    (
+        select(Bill.id).where(Bill.property_id == PROPERTY_ID, Bill.tenant_id == TENANT_ID).order_by(Bill.created_at),
+        "ix_bills_property_tenant_created",
+    ),
+    (
+        select(Payment.id).where(Payment.property_id == PROPERTY_ID, Payment.tenant_id == TENANT_ID).order_by(Payment.paid_at),
+        "ix_payments_property_tenant_paid",
+    ),
+    (
+        select(Notification.id).where(Notification.owner_id == OWNER_ID).order_by(Notification.created_at.desc()),
+        "ix_notifications_owner_created",
+    ),
+    (
+        select(Notification.id)
+        .where(Notification.property_id == PROPERTY_ID)
+        .where(tuple_(Notification.created_at, Notification.id) < (datetime(2026, 1, 1), TENANT_ID))
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(20),
+        "ix_notifications_property_created",
+    ),
+    (
+        select(MaintenanceTicket.id).where(MaintenanceTicket.property_id == PROPERTY_ID, MaintenanceTicket.status == "open"),
+        "ix_maintenance_tickets_property_status",
+    ),
+    (
+        select(MaintenanceTicket.id)
+        .where(MaintenanceTicket.owner_id == OWNER_ID, MaintenanceTicket.status == "open")
+        .where(tuple_(MaintenanceTicket.created_at, MaintenanceTicket.id) < (datetime(2026, 1, 1), TENANT_ID))
+        .order_by(MaintenanceTicket.created_at.desc(), MaintenanceTicket.id.desc())
+        .limit(50),
+        "ix_maintenance_tickets_owner_status",
+    ),
+    (
+        select(MaintenanceTicket.id)
+        .where(MaintenanceTicket.owner_id == OWNER_ID)
+        .order_by(MaintenanceTicket.created_at.desc(), MaintenanceTicket.id.desc())
+        .limit(50),
+        "ix_maintenance_tickets_owner_created",
+    ),
+]
+
+
+def _plan(bind, explain: str, statement) -> str:
+    sql = str(statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True}))
+    with bind.connect() as connection:
+        if bind.dialect.name == "postgresql":
+            # Empty test tables make a sequential scan look cheapest; force the planner to show its index choice.
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        rows = connection.exec_driver_sql(f"{explain} {sql}").all()
+    return "\n".join(str(value) for row in rows for value in row)
+
+
+def _check_externalize_property_images(bind, monkeypatch, tmp_path):
+    monkeypatch.setattr(image_store, "image_store", image_store.LocalBlobStore(tmp_path))
+    owner_id = str(uuid.uuid4())
+    data_uri = "data:image/png;base64," + base64.b64encode(b"\x89PNG\r\n\x1a\n" + owner_id.encode()).decode()
+    property_ids = sorted(str(uuid.uuid4()) for _ in range(3))
+    with Session(bind) as db:
+        db.add(User(id=owner_id, role="owner", full_name="Migration Owner", phone=owner_id[:20]))
+        db.flush()
+        for index, property_id in enumerate(property_ids):
+            db.add(
+                Property(
+                    id=property_id,
+                    owner_id=owner_id,
+                    location="Kochi",
+                    name=f"Inline {index}",
+                    unit_type="1BHK",
+                    image_url="data:broken" if index == 1 else data_uri,
+                    qr_code=property_id,
+                    capacity=1,
+                    rent=1000,
+                )
+            )
+        db.commit()
+    try:
+        # batch_size=1 walks every row through the keyset, starting from the unbounded first batch.
+        assert externalize_property_images(bind, batch_size=1) == 2
+        with Session(bind) as db:
+            image_urls = db.scalars(select(Property.image_url).where(Property.owner_id == owner_id).order_by(Property.id)).all()
+        assert image_urls[1] == "data:broken"
+        assert image_urls[0] == image_urls[2] and image_urls[0].startswith(image_store.IMAGE_URL_PREFIX)
+    finally:
+        with Session(bind) as db:
+            db.execute(delete(ResourceRevision).where(ResourceRevision.resource_id.in_([owner_id, *property_ids])))
+            db.execute(delete(Property).where(Property.owner_id == owner_id))
+            db.execute(delete(User).where(User.id == owner_id))
+            db.commit()
+
+
+def setup_function():
+    # SQLite answers the PRAGMA-based reflection from a connection's cached schema, so pooled connections
+    # left over from other test modules could report indexes these tests just dropped.
+    engine.dispose()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def test_ensure_indexes_backfills_indexes_missing_from_existing_tables():
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_chat_messages_group_created")
+        connection.exec_driver_sql("DROP INDEX ix_users_email")
+
+    assert sorted(ensure_indexes(engine)) == ["ix_chat_messages_group_created", "ix_users_email"]
+    assert ensure_indexes(engine) == []
+
+
+def test_ensure_columns_adds_nullable_columns_missing_from_existing_tables():
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX uq_bills_account_period")
+        connection.exec_driver_sql("ALTER TABLE bills DROP COLUMN period")
+
+    assert ensure_columns(engine) == ["bills.period"]
+    assert ensure_indexes(engine) == ["uq_bills_account_period"]
+    assert ensure_columns(engine) == []
+
+
+@pytest.mark.parametrize(("statement", "index_name"), HOT_QUERIES)
+def test_sqlite_query_plans_use_declared_indexes(statement, index_name):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite plan check")
+    assert index_name in _plan(engine, "EXPLAIN QUERY PLAN", statement)
+
+
+@pytest.mark.skipif("RENTORY_TEST_POSTGRES_URL" not in os.environ, reason="set RENTORY_TEST_POSTGRES_URL to check PostgreSQL plans")
+@pytest.mark.parametrize(("statement", "index_name"), HOT_QUERIES)
+def test_postgres_query_plans_use_declared_indexes(statement, index_name):
+    postgres = create_engine(os.environ["RENTORY_TEST_POSTGRES_URL"], future=True)
+    Base.metadata.create_all(bind=postgres)
+    ensure_indexes(postgres)
+    assert index_name in _plan(postgres, "EXPLAIN", statement)
+
+
+def test_externalize_property_images_moves_inline_images_in_batches(monkeypatch, tmp_path):
+    _check_externalize_property_images(engine, monkeypatch, tmp_path)
+
+
+@pytest.mark.skipif("RENTORY_TEST_POSTGRES_URL" not in os.environ, reason="set RENTORY_TEST_POSTGRES_URL to run against PostgreSQL")
+def test_postgres_externalize_property_images_moves_inline_images(monkeypatch, tmp_path):
+    postgres = create_engine(os.environ["RENTORY_TEST_POSTGRES_URL"], future=True)
+    Base.metadata.create_all(bind=postgres)
+    _check_externalize_property_images(postgres, monkeypatch, tmp_path)
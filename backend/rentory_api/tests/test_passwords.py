@@ -0,0 +1,133 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app import passwords
+from app.passwords import PasswordHasher, PasswordHasherBusy, check_hash, compute_hash
+
+
+def test_hash_formats_are_salted_versioned_and_verifiable(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_SCRYPT_N", 1024)
+    monkeypatch.setattr(passwords, "PASSWORD_PBKDF2_ITERATIONS", 1000)
+
+    scrypt_hash = compute_hash("s3cret", "scrypt")
+    assert scrypt_hash.startswith("scrypt$1024$8$1$")
+    assert scrypt_hash != compute_hash("s3cret", "scrypt")
+    assert check_hash("s3cret", scrypt_hash)
+    assert not check_hash("s3cret!", scrypt_hash)
+
+    pbkdf2_hash = compute_hash("s3cret", "pbkdf2_sha256")
+    assert pbkdf2_hash.startswith("pbkdf2_sha256$1000$")
+    assert check_hash("s3cret", pbkdf2_hash)
+    assert check_hash("s3cret", "plain::s3cret")
+    assert not check_hash("s3cret", "md5$garbage")
+    assert not check_hash("s3cret", None)
+    assert not check_hash("", passwords.UNUSABLE_PASSWORD_HASH)
+
+    monkeypatch.setattr(passwords, "PASSWORD_SCRYPT_N", 2048)
+    assert passwords.needs_rehash(scrypt_hash)
+    assert passwords.needs_rehash(pbkdf2_hash)
+    assert passwords.needs_rehash("plain::s3cret")
+    assert not passwords.needs_rehash(compute_hash("s3cret", "scrypt"))
+
+
+def test_hasher_rejects_work_beyond_its_pending_limit(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash(password):
+        started.set()
+        release.wait(5)
+        return "done"
+
+    monkeypatch.setattr(passwords, "compute_hash", slow_hash)
+    hasher = PasswordHasher(workers=1, max_pending=1, wait_seconds=30)
+
+    first = threading.Thread(target=hasher.hash, args=("one",))
+    first.start()
+    assert started.wait(5)
+    try:
+        # Request threads are refused straight away rather than parked for wait_seconds.
+        began = time.monotonic()
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("two")
+        assert time.monotonic() - began < 5
+    finally:
+        release.set()
+        first.join()
+    assert hasher.hash("three") == "done"
+
+
+def test_hasher_waits_for_a_slot_without_blocking_the_event_loop(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash(password):
+        started.set()
+        release.wait(5)
+        return "done"
+
+    monkeypatch.setattr(passwords, "compute_hash", slow_hash)
+    hasher = PasswordHasher(workers=1, max_pending=1, wait_seconds=0.3)
+
+    async def hash_while_ticking() -> int:
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        try:
+            with pytest.raises(PasswordHasherBusy):
+                await greenlet_spawn(hasher.hash, "two")
+        finally:
+            ticker.cancel()
+        return ticks
+
+    first = threading.Thread(target=hasher.hash, args=("one",))
+    first.start()
+    assert started.wait(5)
+    try:
+        assert asyncio.run(hash_while_ticking()) >= 10
+    finally:
+        release.set()
+        first.join()
+
+
+def test_unusable_hashes_are_rejected_without_using_the_pool(monkeypatch):
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    monkeypatch.setattr(hasher, "_run", lambda *args: pytest.fail("unusable hashes must not reach the pool"))
+    assert not hasher.verify("demo", passwords.UNUSABLE_PASSWORD_HASH)
+    assert not hasher.verify("demo", None)
+
+
+def test_hasher_wakes_event_loop_waiters_when_a_slot_frees(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash(password):
+        if password == "one":
+            started.set()
+            release.wait(5)
+        return password
+
+    monkeypatch.setattr(passwords, "compute_hash", slow_hash)
+    hasher = PasswordHasher(workers=2, max_pending=1, wait_seconds=5)
+
+    first = threading.Thread(target=hasher.hash, args=("one",))
+    first.start()
+    assert started.wait(5)
+    threading.Timer(0.1, release.set).start()
+
+    async def hash_on_loop() -> str:
+        return await greenlet_spawn(hasher.hash, "two")
+
+    assert asyncio.run(hash_on_loop()) == "two"
+    first.join()
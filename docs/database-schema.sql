@@ -76,6 +76,7 @@ CREATE TABLE bills (
   bill_type VARCHAR(20) NOT NULL CHECK (bill_type IN ('rent', 'electricity', 'water')),
   amount NUMERIC(12, 2) NOT NULL,
   status VARCHAR(20) NOT NULL CHECK (status IN ('pending', 'paid', 'overdue')),
+  period VARCHAR(7),
   created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
@@ -100,9 +101,141 @@ CREATE TABLE notifications (
 CREATE TABLE maintenance_tickets (
   id UUID PRIMARY KEY,
   property_id UUID NOT NULL REFERENCES properties(id),
+  owner_id UUID REFERENCES users(id),
   tenant_id UUID NOT NULL REFERENCES users(id),
   issue_title VARCHAR(160) NOT NULL,
   issue_description TEXT,
-  status VARCHAR(20) NOT NULL CHECK (status IN ('open', 'closed')),
+  status VARCHAR(20) NOT NULL CHECK (status IN ('open', 'in_progress', 'resolved', 'closed')),
   created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
+
+-- Per-owner analytics, maintained in the same transaction as property and tenant writes
+CREATE TABLE owner_analytics_summaries (
+  owner_id UUID PRIMARY KEY REFERENCES users(id),
+  total_properties INT NOT NULL DEFAULT 0,
+  total_tenants INT NOT NULL DEFAULT 0,
+  properties_by_location JSON NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Broadcast jobs and the per-tenant deliveries they expand into
+CREATE TABLE notification_jobs (
+  id UUID PRIMARY KEY,
+  owner_id UUID NOT NULL REFERENCES users(id),
+  title VARCHAR(160) NOT NULL,
+  body TEXT NOT NULL,
+  property_ids JSON,
+  status VARCHAR(20) NOT NULL CHECK (status IN ('queued', 'running', 'done', 'failed')),
+  attempts INT NOT NULL DEFAULT 0,
+  last_property_id UUID,
+  notification_count INT NOT NULL DEFAULT 0,
+  delivery_count INT NOT NULL DEFAULT 0,
+  error TEXT,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE notification_deliveries (
+  id UUID PRIMARY KEY,
+  notification_id UUID NOT NULL REFERENCES notifications(id),
+  user_id UUID NOT NULL REFERENCES users(id),
+  channel VARCHAR(20) NOT NULL DEFAULT 'push',
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  CONSTRAINT uq_notification_delivery UNIQUE (notification_id, user_id)
+);
+
+-- One read position per user; everything newer than it in the user's feed is unread
+CREATE TABLE notification_read_cursors (
+  user_id UUID PRIMARY KEY REFERENCES users(id),
+  last_read_at TIMESTAMP NOT NULL,
+  last_read_id UUID NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Append-only billing ledger per (property, tenant): charges are positive, payments negative.
+-- ledger_accounts.last_seq numbers each account's entries; snapshots freeze the running totals
+-- every LEDGER_SNAPSHOT_INTERVAL entries so balances read one snapshot plus a short tail.
+CREATE TABLE ledger_accounts (
+  property_id UUID NOT NULL REFERENCES properties(id),
+  tenant_id UUID NOT NULL REFERENCES users(id),
+  last_seq INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (property_id, tenant_id)
+);
+
+CREATE TABLE ledger_entries (
+  id UUID PRIMARY KEY,
+  property_id UUID NOT NULL REFERENCES properties(id),
+  tenant_id UUID NOT NULL REFERENCES users(id),
+  seq INT NOT NULL,
+  entry_type VARCHAR(20) NOT NULL CHECK (entry_type IN ('charge', 'payment')),
+  bill_type VARCHAR(20) NOT NULL CHECK (bill_type IN ('rent', 'electricity', 'water')),
+  amount NUMERIC(12, 2) NOT NULL,
+  reference_id UUID,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  CONSTRAINT uq_ledger_entries_account_seq UNIQUE (property_id, tenant_id, seq)
+);
+
+CREATE TABLE ledger_snapshots (
+  property_id UUID NOT NULL REFERENCES properties(id),
+  tenant_id UUID NOT NULL REFERENCES users(id),
+  seq INT NOT NULL,
+  balance NUMERIC(12, 2) NOT NULL,
+  charged_total NUMERIC(12, 2) NOT NULL,
+  paid_total NUMERIC(12, 2) NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (property_id, tenant_id, seq)
+);
+
+-- Progress of each monthly billing run; last_owner_id is the resume point after a crash
+CREATE TABLE billing_runs (
+  period VARCHAR(7) PRIMARY KEY,
+  status VARCHAR(20) NOT NULL CHECK (status IN ('running', 'done')),
+  last_owner_id UUID,
+  bill_count INT NOT NULL DEFAULT 0,
+  started_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  finished_at TIMESTAMP
+);
+
+-- Ticket counts per property and status, kept in step with every ticket insert and status change
+CREATE TABLE maintenance_status_counts (
+  property_id UUID NOT NULL REFERENCES properties(id),
+  status VARCHAR(20) NOT NULL,
+  owner_id UUID NOT NULL REFERENCES users(id),
+  count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (property_id, status)
+);
+
+-- Revision counters behind the ETags of owner property cards ('owner') and property details ('property')
+CREATE TABLE resource_revisions (
+  scope VARCHAR(20) NOT NULL,
+  resource_id UUID NOT NULL,
+  revision INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (scope, resource_id)
+);
+
+-- Secondary indexes for the API's hot lookup paths (kept in sync with app/models.py;
+-- `python -m app.migrations` backfills any that are missing on an existing database)
+CREATE INDEX ix_users_email ON users (email);
+CREATE INDEX ix_properties_owner_location ON properties (owner_id, location);
+CREATE INDEX ix_property_tenants_property_status ON property_tenants (property_id, status);
+CREATE INDEX ix_property_tenants_tenant_id ON property_tenants (tenant_id);
+CREATE INDEX ix_chat_group_members_user_id ON chat_group_members (user_id);
+CREATE INDEX ix_chat_messages_group_created ON chat_messages (group_id, created_at, id);
+CREATE INDEX ix_bills_property_tenant_created ON bills (property_id, tenant_id, created_at);
+CREATE UNIQUE INDEX uq_bills_account_period ON bills (property_id, tenant_id, bill_type, period);
+CREATE INDEX ix_ledger_entries_reference ON ledger_entries (reference_id);
+CREATE INDEX ix_payments_property_tenant_paid ON payments (property_id, tenant_id, paid_at);
+CREATE INDEX ix_notifications_owner_created ON notifications (owner_id, created_at);
+CREATE INDEX ix_notifications_property_created ON notifications (property_id, created_at, id);
+CREATE INDEX ix_notification_jobs_status ON notification_jobs (status);
+CREATE INDEX ix_notification_deliveries_status ON notification_deliveries (status, created_at);
+CREATE INDEX ix_maintenance_tickets_property_status ON maintenance_tickets (property_id, status, created_at);
+CREATE INDEX ix_maintenance_tickets_owner_status ON maintenance_tickets (owner_id, status, created_at, id);
+CREATE INDEX ix_maintenance_tickets_owner_created ON maintenance_tickets (owner_id, created_at, id);
+CREATE INDEX ix_maintenance_status_counts_owner ON maintenance_status_counts (owner_id, status);
+
+-- Search (see app/search.py). PostgreSQL uses expression indexes; SQLite builds FTS5 tables plus triggers instead.
+CREATE INDEX ix_properties_search ON properties USING gin ((to_tsvector('simple', name || ' ' || location)));
+CREATE INDEX ix_users_search ON users USING gin ((to_tsvector('simple', full_name || ' ' || phone)));
+CREATE INDEX ix_chat_messages_search ON chat_messages USING gin ((to_tsvector('simple', coalesce(text, ''))));
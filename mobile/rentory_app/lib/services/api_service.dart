@@ -12,6 +12,8 @@ class ApiService {
     defaultValue: 'http://10.0.2.2:8000',
   );
 
+  static String? _accessToken;
+
   final http.Client _httpClient;
   String get baseUrl => _defaultBaseUrl;
 
@@ -35,7 +37,7 @@ class ApiService {
     if (response.statusCode != 201) {
       throw Exception('Owner signup failed (${response.statusCode}): ${response.body}');
     }
-    return jsonDecode(response.body) as Map<String, dynamic>;
+    return _storeSession(jsonDecode(response.body) as Map<String, dynamic>);
   }
 
   Future<Map<String, dynamic>> tenantRegister({
@@ -59,7 +61,7 @@ class ApiService {
     if (response.statusCode != 201) {
       throw Exception('Tenant registration failed (${response.statusCode}): ${response.body}');
     }
-    return jsonDecode(response.body) as Map<String, dynamic>;
+    return _storeSession(jsonDecode(response.body) as Map<String, dynamic>);
   }
 
   Future<Map<String, dynamic>> login({
@@ -76,7 +78,7 @@ class ApiService {
     if (response.statusCode != 200) {
       throw Exception('Login failed (${response.statusCode}): ${response.body}');
     }
-    return jsonDecode(response.body) as Map<String, dynamic>;
+    return _storeSession(jsonDecode(response.body) as Map<String, dynamic>);
   }
 
   Future<List<Property>> listOwnerProperties(String ownerId) async {
@@ -182,15 +184,28 @@ class ApiService {
     return jsonDecode(response.body) as Map<String, dynamic>;
   }
 
+  Map<String, dynamic> _storeSession(Map<String, dynamic> session) {
+    _accessToken = session['access_token'] as String?;
+    return session;
+  }
+
+  Map<String, String> _headers({bool json = false}) {
+    final token = _accessToken;
+    return {
+      if (json) 'Content-Type': 'application/json',
+      if (token != null) 'Authorization': 'Bearer $token',
+    };
+  }
+
   Future<_ApiResponse> _get(String path) async {
-    final response = await _httpClient.get(Uri.parse('$baseUrl$path'));
+    final response = await _httpClient.get(Uri.parse('$baseUrl$path'), headers: _headers());
     return _ApiResponse(statusCode: response.statusCode, body: response.body);
   }
 
   Future<_ApiResponse> _post(String path, Map<String, Object?> payload) async {
     final response = await _httpClient.post(
       Uri.parse('$baseUrl$path'),
-      headers: const {'Content-Type': 'application/json'},
+      headers: _headers(json: true),
       body: jsonEncode(payload),
     );
     return _ApiResponse(statusCode: response.statusCode, body: response.body);
@@ -199,7 +214,7 @@ class ApiService {
   Future<_ApiResponse> _patch(String path, Map<String, Object?> payload) async {
     final response = await _httpClient.patch(
       Uri.parse('$baseUrl$path'),
-      headers: const {'Content-Type': 'application/json'},
+      headers: _headers(json: true),
       body: jsonEncode(payload),
     );
     return _ApiResponse(statusCode: response.statusCode, body: response.body);